@@ -1,9 +1,12 @@
 import tkinter as tk
 from tkinter import Frame, Label
+import heapq
 import json
 import sys
 import os
 
+from scheduling.task_stream import iter_json_records
+
 class TaskManagerApp:
     def __init__(self, root, json_file=None):
         self.root = root
@@ -14,14 +17,8 @@ class TaskManagerApp:
         # Use provided JSON file path or default
         self.json_file = json_file or "suggestion/suggestion.json"
         
-        # Load task data
-        self.tasks = self.load_tasks(self.json_file)
-        
-        # Sort tasks by urgency (highest first)
-        self.tasks.sort(key=lambda x: x["urgency"], reverse=True)
-        
-        # Get top 3 urgent tasks
-        self.top_tasks = self.tasks[:3]
+        # Stream the task file and keep only the top 3 urgent tasks (highest first)
+        self.top_tasks = heapq.nlargest(3, self.load_tasks(self.json_file), key=lambda x: x["urgency"])
         
         # Create main frames (only the top left tasks section)
         self.create_layout()
@@ -30,10 +27,10 @@ class TaskManagerApp:
         self.populate_data()
         
     def load_tasks(self, filename):
+        # Yields tasks one at a time; JSON arrays and JSONL files are both accepted
         try:
-            with open(filename, 'r') as file:
-                print(f"Successfully loaded data from {filename}")
-                return json.load(file)
+            yield from iter_json_records(filename)
+            print(f"Successfully loaded data from {filename}")
         except (FileNotFoundError, json.JSONDecodeError) as e:
             print(f"Error loading JSON file {filename}: {e}")
             raise
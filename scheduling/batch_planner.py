@@ -0,0 +1,204 @@
+"""
+Batch planner: headless scheduler runs for a whole cohort of students
+
+Each student's task list is planned in a worker process of a process pool.
+Every student gets an own output directory (snapshots and output.json), so
+runs never share files, and the per-student summaries are collected into one
+consolidated results file.
+
+Input is either a directory of task JSON files (one per student, the file name
+is the student id) or a JSONL file with one student per line:
+    {"student": "s001", "tasks": [...]}
+
+Usage (from the project root):
+    python -m scheduling.batch_planner --input students/ --output-dir batch_output
+"""
+import argparse
+import hashlib
+import json
+import os
+import re
+import time
+from datetime import datetime
+
+from scheduling.pool import ENGINE_HELP, ENGINES, check_engine, run_engine, run_pool, worker_state
+from scorer import TaskScheduler
+
+
+def load_students(path):
+    """
+    Load per-student task sets from a directory of JSON files or a JSONL file
+
+    Parameters:
+    path (str): Directory or JSONL file
+
+    Returns:
+    list: (student id, task list) tuples
+    """
+    students = []
+    if os.path.isdir(path):
+        for name in sorted(os.listdir(path)):
+            if not name.endswith('.json'):
+                continue
+            with open(os.path.join(path, name), 'r') as f:
+                students.append((name[:-len('.json')], json.load(f)))
+        return students
+
+    with open(path, 'r') as f:
+        for line_number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            if isinstance(record, list):
+                # Bare task list: the line number is the student id
+                students.append((str(line_number), record))
+            else:
+                students.append((str(record.get('student', line_number)), record['tasks']))
+    return students
+
+
+def student_dir(output_dir, student_id):
+    """
+    Get the output directory of one student
+
+    Parameters:
+    output_dir (str): Root output directory of the batch
+    student_id (str): Student id
+
+    Returns:
+    str: Directory path (the id is sanitized so it can't escape output_dir; a
+         sanitized id gets a short hash of the raw id, so "a/b", "a b" and
+         "a_b" don't share a directory)
+    """
+    safe_id = re.sub(r'[^A-Za-z0-9_.-]', '_', student_id).lstrip('.') or '_'
+    if safe_id != student_id:
+        safe_id += '-' + hashlib.sha1(student_id.encode('utf-8')).hexdigest()[:8]
+    return os.path.join(output_dir, safe_id)
+
+
+def _run_student(job):
+    """
+    Plan one student's tasks in a worker process
+    """
+    student_id, tasks_data = job
+    settings = worker_state['settings']
+    started = time.process_time()
+
+    output_dir = student_dir(settings['output_dir'], student_id)
+    os.makedirs(output_dir, exist_ok=True)
+    summary = {'student': student_id, 'output_dir': output_dir}
+    try:
+        scheduler = TaskScheduler(
+            tasks_data=tasks_data,
+            start_date=settings['start_date'],
+            output_dir=output_dir,
+            urgency_weight=settings['weights'][0],
+            importance_weight=settings['weights'][1],
+            mood_weight=settings['weights'][2],
+            snapshot_mode=settings['snapshot_mode']
+        )
+        results_file = os.path.join(output_dir, 'output.json')
+        run_engine(scheduler, settings['engine'], save_snapshots=settings['save_snapshots'],
+                   results_file=results_file)
+        summary.update(scheduler.get_run_summary())
+    except Exception as e:
+        # One bad task file must not take down the rest of the cohort
+        summary['error'] = f"{type(e).__name__}: {e}"
+
+    summary['cpu_seconds'] = time.process_time() - started
+    return summary
+
+
+def run_batch(students, output_dir='batch_output', workers=None, start_date=None,
+              weights=(0.5, 0.3, 0.2), engine='ticks', save_snapshots=False,
+              snapshot_mode='log'):
+    """
+    Plan every student's tasks over a process pool
+
+    Parameters:
+    students (list): (student id, task list) tuples, see load_students
+    output_dir (str): Root output directory; each student writes to its own subdirectory
+    workers (int): Number of worker processes (default: one per student, at most the CPU count)
+    start_date (datetime): Simulation start (default: 2025-01-01 09:00)
+    weights (tuple): (urgency, importance, mood) weights
+    engine (str): 'ticks' for run_headless, 'events' for run_event_driven
+    save_snapshots (bool): Save a task snapshot before every session (ticks engine only)
+    snapshot_mode (str): 'files' or 'log', see TaskScheduler
+
+    Returns:
+    tuple: (per-student summaries in input order, run statistics)
+
+    Raises:
+    ValueError: If two students have the same id (they would overwrite each other's output),
+                or if the engine is unknown
+    """
+    check_engine(engine)
+    seen = set()
+    for student_id, _ in students:
+        if student_id in seen:
+            raise ValueError(f"Duplicate student id {student_id!r}")
+        seen.add(student_id)
+
+    settings = {
+        'output_dir': output_dir,
+        'start_date': start_date or datetime(2025, 1, 1, 9, 0),
+        'weights': tuple(weights),
+        'engine': engine,
+        'save_snapshots': save_snapshots,
+        'snapshot_mode': snapshot_mode
+    }
+    os.makedirs(output_dir, exist_ok=True)
+    # Students differ a lot in size, so keep chunks small enough to balance the load
+    summaries, pool_stats = run_pool(_run_student, students, {'settings': settings},
+                                     workers=workers, chunks_per_worker=8)
+    workers, elapsed = pool_stats['workers'], pool_stats['seconds']
+
+    cpu_seconds = sum(summary['cpu_seconds'] for summary in summaries)
+    stats = {
+        'students': len(summaries),
+        'failed': sum(1 for summary in summaries if 'error' in summary),
+        'workers': workers,
+        'seconds': elapsed,
+        'cpu_seconds': cpu_seconds,
+        'students_per_second': len(summaries) / elapsed if elapsed else None,
+        # Wall-clock throughput divided by the pool size, and the throughput of one
+        # fully busy core (independent of how well the pool was utilized)
+        'students_per_second_per_worker': len(summaries) / elapsed / workers if elapsed else None,
+        'students_per_cpu_second': len(summaries) / cpu_seconds if cpu_seconds else None
+    }
+    return summaries, stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Plan the tasks of many students over a process pool")
+    parser.add_argument('--input', required=True, help="Directory of task JSON files or a JSONL file")
+    parser.add_argument('--output-dir', default='batch_output', help="Root directory for per-student output")
+    parser.add_argument('--results', default=None,
+                        help="Consolidated results file (default: <output-dir>/batch_results.json)")
+    parser.add_argument('--workers', type=int, default=None, help="Worker processes (default: CPU count, at most one per student)")
+    parser.add_argument('--weights', type=float, nargs=3, default=(0.5, 0.3, 0.2),
+                        metavar=('URGENCY', 'IMPORTANCE', 'MOOD'), help="Scoring weights")
+    parser.add_argument('--engine', choices=ENGINES, default='ticks', help=ENGINE_HELP)
+    parser.add_argument('--snapshots', action='store_true', help="Save task snapshots for every session")
+    args = parser.parse_args()
+
+    students = load_students(args.input)
+    summaries, stats = run_batch(students, output_dir=args.output_dir, workers=args.workers,
+                                 weights=args.weights, engine=args.engine,
+                                 save_snapshots=args.snapshots)
+
+    results_file = args.results or os.path.join(args.output_dir, 'batch_results.json')
+    with open(results_file, 'w') as f:
+        json.dump({'stats': stats, 'students': summaries}, f, indent=4)
+
+    print(f"{stats['students']} students on {stats['workers']} workers in {stats['seconds']:.2f}s "
+          f"({stats['students_per_second']:.1f} students/s, "
+          f"{stats['students_per_second_per_worker']:.1f} per worker, "
+          f"{stats['students_per_cpu_second']:.1f} per CPU-second)")
+    if stats['failed']:
+        print(f"{stats['failed']} students failed, see 'error' in the results")
+    print(f"Results saved to {results_file}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,416 @@
+"""
+Scheduler benchmark suite with a seeded synthetic workload generator
+
+For every task count, a synthetic task list is generated and the scheduler's
+hot paths are timed (best of several runs):
+    load                     build a scheduler from the task list
+    available_hours_cold     calculate_available_working_hours for every task, memo cleared
+    available_hours_warm     the same with the memo filled
+    check_time_sufficiency   deadline sweep over the deadline index, memo cleared
+    recalculate_all_tasks    one recalculation after a 2-hour step
+    get_top_urgent_tasks     top 3 after a recalculation
+    policy[U/R]_scalar       urgency and weighted score of every task, one scalar
+                             call per task, for every registered urgency policy U
+                             and ranking policy R (scheduling.scoring)
+    policy[U/R]_batch        the same in one vectorized evaluate_batch call
+                             (only if NumPy is installed)
+    headless                 run_headless for up to --max-steps work sessions (or
+                             until the time budget is used up), timed per session
+A second pass under tracemalloc records peak and retained memory for the
+same workload. Results can be saved as a baseline and compared against later.
+
+Usage (from the project root):
+    python -m scheduling.benchmark --sizes 10,1000,100000 --save-baseline bench_baseline.json
+    python -m scheduling.benchmark --sizes 10,1000,100000 --baseline bench_baseline.json
+"""
+import argparse
+import json
+import platform
+import random
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+from scheduling import scoring
+from scorer import TaskScheduler
+
+
+DEFAULT_SIZES = (10, 100, 1000, 10000, 100000, 1000000)
+START_DATE = datetime(2025, 1, 1, 9, 0)
+
+# Mood ranges of the mood mix: (low, neutral, high) share of the tasks
+MOOD_RANGES = ((1, 4), (4, 7), (7, 10))
+
+
+def generate_tasks(count, seed=0, deadline_spread_days=60, duration_range=(1, 12),
+                   mood_mix=(0.3, 0.4, 0.3), start_date=START_DATE):
+    """
+    Generate a synthetic task list in the scheduler's input format
+
+    Parameters:
+    count (int): Number of tasks
+    seed (int): Random seed (same seed, same tasks)
+    deadline_spread_days (int): Deadlines fall uniformly on the days 1..spread after start_date
+    duration_range (tuple): Minimum and maximum duration in hours (rounded to 0.5)
+    mood_mix (tuple): Share of low, neutral and high mood tasks
+    start_date (datetime): Scheduler start date (deadlines stay within its year)
+
+    Returns:
+    list: Task dictionaries with assignment_name, DDL, duration, difficulty, importance and mood
+    """
+    rng = random.Random(seed)
+    last_day = datetime(start_date.year, 12, 31).toordinal() - start_date.toordinal()
+    spread = max(1, min(deadline_spread_days, last_day))
+    # DDL strings of the possible deadline days
+    ddls = []
+    for offset in range(1, spread + 1):
+        day = start_date + timedelta(days=offset)
+        ddls.append(f"{day.month}/{day.day}")
+    low, high = duration_range
+
+    tasks = []
+    for i in range(count):
+        mood_low, mood_high = rng.choices(MOOD_RANGES, weights=mood_mix)[0]
+        tasks.append({
+            'assignment_name': f"task_{i:07d}",
+            'DDL': rng.choice(ddls),
+            'duration': round(rng.uniform(low, high) * 2) / 2,
+            'difficulty': rng.randint(1, 10),
+            'importance': rng.randint(1, 10),
+            'mood': rng.randint(mood_low, mood_high)
+        })
+    return tasks
+
+
+def _best_time(run, setup=None, repeat=5, budget=10.0):
+    """
+    Time run() and return (best seconds, number of runs); stops early once the
+    time budget is used up. setup() is called untimed before every run.
+    """
+    best = None
+    runs = 0
+    started = time.perf_counter()
+    while runs < repeat:
+        if setup is not None:
+            setup()
+        run_started = time.perf_counter()
+        run()
+        elapsed = time.perf_counter() - run_started
+        best = elapsed if best is None or elapsed < best else best
+        runs += 1
+        if time.perf_counter() - started > budget:
+            break
+    return best, runs
+
+
+def _new_scheduler(tasks_data, use_task_table):
+    return TaskScheduler(tasks_data=tasks_data, start_date=START_DATE, output_dir=None,
+                         use_task_table=use_task_table)
+
+
+def _run_headless(scheduler, max_steps, budget):
+    """
+    Run the scheduler headless for up to max_steps sessions, stopping early once
+    the time budget is used up (large task lists), and return the session count
+    """
+    sessions = [0]
+    started = time.perf_counter()
+
+    def stop(_):
+        # Called after every session
+        sessions[0] += 1
+        return time.perf_counter() - started > budget
+
+    scheduler.run_headless(max_steps=max_steps, stop_condition=stop)
+    return sessions[0]
+
+
+def benchmark_size(tasks_data, repeat=5, budget=10.0, max_steps=500, use_task_table=False):
+    """
+    Time the scheduler's hot paths on one task list
+
+    Parameters:
+    tasks_data (list): Task dictionaries (see generate_tasks)
+    repeat (int): Maximum runs per benchmark (the best one counts)
+    budget (float): Time budget per benchmark in seconds
+    max_steps (int): Work sessions of the headless run (None to run until done or out of budget)
+    use_task_table (bool): Use the NumPy task table backend
+
+    Returns:
+    dict: Benchmark name -> {'seconds', 'runs', 'items', 'us_per_item'}
+    """
+    count = len(tasks_data)
+    results = {}
+
+    def record(name, timing, items=count):
+        seconds, runs = timing
+        results[name] = {
+            'seconds': seconds,
+            'runs': runs,
+            'items': items,
+            'us_per_item': seconds / items * 1e6 if items else None
+        }
+
+    record('load', _best_time(lambda: _new_scheduler(tasks_data, use_task_table),
+                              repeat=min(repeat, 3), budget=budget))
+
+    scheduler = _new_scheduler(tasks_data, use_task_table)
+    deadlines = [task.deadline for task in scheduler.tasks]
+    now = scheduler.current_date
+
+    def available_hours():
+        for deadline in deadlines:
+            scheduler.calculate_available_working_hours(now, deadline)
+
+    record('available_hours_cold', _best_time(available_hours, scheduler._available_hours_cache.clear,
+                                              repeat, budget))
+    record('available_hours_warm', _best_time(available_hours, repeat=repeat, budget=budget))
+    record('check_time_sufficiency',
+           _best_time(lambda: scheduler.check_time_sufficiency(None, now),
+                      scheduler._available_hours_cache.clear, repeat, budget))
+
+    # Fill the priority index once, then time the steady-state step of the loop
+    scheduler.recalculate_all_tasks(scheduler.current_date)
+
+    def next_step():
+        scheduler.current_date = scheduler.get_next_working_time(scheduler.current_date + timedelta(hours=2))
+
+    record('recalculate_all_tasks',
+           _best_time(lambda: scheduler.recalculate_all_tasks(scheduler.current_date), next_step,
+                      repeat, budget))
+    record('get_top_urgent_tasks', _best_time(lambda: scheduler.get_top_urgent_tasks(3),
+                                              repeat=repeat, budget=budget))
+
+    # Every registered policy pair on the same (recalculated) tasks
+    tasks = scheduler.tasks
+    columns = ([task.duration_left for task in tasks], [task.time_to_deadline for task in tasks],
+               [task.importance for task in tasks], [task.mood for task in tasks])
+    weights = scheduler._score_weights()
+    for urgency_name in scoring.urgency_policies():
+        for ranking_name in scoring.ranking_policies():
+            urgency_policy = scoring.get_urgency_policy(urgency_name)
+            ranking_policy = scoring.get_ranking_policy(ranking_name)
+            name = f"policy[{urgency_name}/{ranking_name}]"
+
+            def score_scalar(urgency_of=urgency_policy.scalar, score_of=ranking_policy.scalar):
+                for left, hours, importance, mood in zip(*columns):
+                    score_of(urgency_of(left, hours), importance, mood, weights)
+
+            record(f"{name}_scalar", _best_time(score_scalar, repeat=repeat, budget=budget))
+            if scoring.np is not None:
+                record(f"{name}_batch",
+                       _best_time(lambda: scoring.evaluate_batch(*columns, weights, urgency_policy, ranking_policy),
+                                  repeat=repeat, budget=budget))
+
+    # Headless runs may stop on the time budget, so the best run is the one
+    # with the lowest time per session
+    best = None
+    runs = 0
+    while runs < min(repeat, 3):
+        shadow = _new_scheduler(tasks_data, use_task_table)
+        run_started = time.perf_counter()
+        sessions = _run_headless(shadow, max_steps, budget)
+        elapsed = time.perf_counter() - run_started
+        runs += 1
+        if best is None or elapsed * best[1] < best[0] * sessions:
+            best = (elapsed, sessions)
+        if elapsed > budget:
+            break
+    record('headless', (best[0], runs), items=best[1])
+    return results
+
+
+def measure_memory(tasks_data, max_steps=500, budget=10.0, use_task_table=False):
+    """
+    Measure Python memory of building a scheduler and running it headless
+
+    Parameters:
+    tasks_data (list): Task dictionaries (not counted)
+    max_steps (int): Work sessions of the headless run
+    budget (float): Time budget of the headless run in seconds
+    use_task_table (bool): Use the NumPy task table backend
+
+    Returns:
+    dict: 'retained_mb' (scheduler after loading) and 'peak_mb' (whole run)
+    """
+    tracemalloc.start()
+    try:
+        scheduler = _new_scheduler(tasks_data, use_task_table)
+        retained, _ = tracemalloc.get_traced_memory()
+        _run_headless(scheduler, max_steps, budget)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {'retained_mb': retained / 2**20, 'peak_mb': peak / 2**20}
+
+
+def run_benchmarks(sizes=DEFAULT_SIZES, seed=0, deadline_spread_days=60, duration_range=(1, 12),
+                   mood_mix=(0.3, 0.4, 0.3), repeat=5, budget=10.0, max_steps=500,
+                   use_task_table=False, memory=True, log=print):
+    """
+    Run the benchmark suite for several task counts
+
+    Parameters:
+    sizes (tuple): Task counts
+    seed (int): Random seed of the generator
+    deadline_spread_days, duration_range, mood_mix: See generate_tasks
+    repeat (int): Maximum runs per benchmark
+    budget (float): Time budget per benchmark in seconds
+    max_steps (int): Work sessions of the headless run
+    use_task_table (bool): Use the NumPy task table backend
+    memory (bool): Also measure memory (a second, traced pass)
+    log (callable): Progress output (None for silent)
+
+    Returns:
+    dict: 'settings' and 'results' (task count as a string -> benchmark results,
+          plus 'memory' if measured)
+    """
+    settings = {
+        'seed': seed,
+        'deadline_spread_days': deadline_spread_days,
+        'duration_range': list(duration_range),
+        'mood_mix': list(mood_mix),
+        'max_steps': max_steps,
+        'use_task_table': use_task_table,
+        'python': platform.python_version(),
+        'machine': platform.machine()
+    }
+    results = {}
+    for size in sizes:
+        tasks_data = generate_tasks(size, seed, deadline_spread_days, duration_range, mood_mix)
+        size_results = benchmark_size(tasks_data, repeat, budget, max_steps, use_task_table)
+        if memory:
+            size_results['memory'] = measure_memory(tasks_data, max_steps, budget, use_task_table)
+        results[str(size)] = size_results
+        if log:
+            log(format_results({str(size): size_results}))
+    return {'settings': settings, 'results': results}
+
+
+def format_results(results):
+    """
+    Format benchmark results as a table
+
+    Parameters:
+    results (dict): Task count -> benchmark results (see run_benchmarks)
+
+    Returns:
+    str: One line per task count and benchmark
+    """
+    lines = []
+    for size, size_results in results.items():
+        lines.append(f"{size} tasks")
+        width = max(24, max(map(len, size_results)))
+        for name, timing in size_results.items():
+            if name == 'memory':
+                lines.append(f"  {'memory':<{width}} retained {timing['retained_mb']:9.1f} MB"
+                             f"   peak {timing['peak_mb']:9.1f} MB")
+                continue
+            per_item = f"{timing['us_per_item']:10.3f} us/item" if timing['us_per_item'] is not None else ""
+            lines.append(f"  {name:<{width}} {timing['seconds'] * 1000:12.3f} ms  {per_item}")
+    return "\n".join(lines)
+
+
+def compare(results, baseline, tolerance=0.2):
+    """
+    Compare benchmark results against a baseline
+
+    Parameters:
+    results (dict): Current results (the 'results' part of run_benchmarks)
+    baseline (dict): Baseline results in the same format
+    tolerance (float): Allowed slowdown (or memory growth) before a row counts as a regression
+
+    Returns:
+    list: Dictionaries with size, benchmark, baseline, current, ratio and regression,
+          for every measurement present in both
+    """
+    rows = []
+    for size, size_results in results.items():
+        baseline_size = baseline.get(size)
+        if not baseline_size:
+            continue
+        for name, timing in size_results.items():
+            base = baseline_size.get(name)
+            if base is None:
+                continue
+            if name == 'memory':
+                pairs = [('memory.peak_mb', base['peak_mb'], timing['peak_mb'])]
+            elif base.get('us_per_item') and timing.get('us_per_item'):
+                # Per item, so runs cut short by the time budget stay comparable
+                pairs = [(name, base['us_per_item'], timing['us_per_item'])]
+            else:
+                pairs = [(name, base['seconds'], timing['seconds'])]
+            for label, before, after in pairs:
+                ratio = after / before if before else None
+                rows.append({
+                    'size': size,
+                    'benchmark': label,
+                    'baseline': before,
+                    'current': after,
+                    'ratio': ratio,
+                    'regression': ratio is not None and ratio > 1 + tolerance
+                })
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the scheduler on synthetic task lists")
+    parser.add_argument('--sizes', default=','.join(map(str, DEFAULT_SIZES)),
+                        help="Comma-separated task counts")
+    parser.add_argument('--seed', type=int, default=0, help="Random seed of the generator")
+    parser.add_argument('--deadline-spread', type=int, default=60, help="Deadline spread in days")
+    parser.add_argument('--min-duration', type=float, default=1, help="Minimum task duration (hours)")
+    parser.add_argument('--max-duration', type=float, default=12, help="Maximum task duration (hours)")
+    parser.add_argument('--mood-mix', default='0.3,0.4,0.3', help="Share of low,neutral,high mood tasks")
+    parser.add_argument('--repeat', type=int, default=5, help="Maximum runs per benchmark")
+    parser.add_argument('--budget', type=float, default=10.0, help="Time budget per benchmark (seconds)")
+    parser.add_argument('--max-steps', type=int, default=500, help="Work sessions of the headless run")
+    parser.add_argument('--task-table', action='store_true', help="Use the NumPy task table backend")
+    parser.add_argument('--no-memory', action='store_true', help="Skip the memory pass")
+    parser.add_argument('--output', default='benchmark_results.json', help="Results JSON file")
+    parser.add_argument('--save-baseline', default=None, help="Also save the results as a baseline")
+    parser.add_argument('--baseline', default=None, help="Compare against this baseline file")
+    parser.add_argument('--tolerance', type=float, default=0.2, help="Allowed slowdown before a regression")
+    args = parser.parse_args()
+
+    report = run_benchmarks(
+        sizes=[int(size) for size in args.sizes.split(',')],
+        seed=args.seed,
+        deadline_spread_days=args.deadline_spread,
+        duration_range=(args.min_duration, args.max_duration),
+        mood_mix=tuple(float(share) for share in args.mood_mix.split(',')),
+        repeat=args.repeat,
+        budget=args.budget,
+        max_steps=args.max_steps,
+        use_task_table=args.task_table,
+        memory=not args.no_memory
+    )
+
+    regressions = []
+    if args.baseline:
+        with open(args.baseline, 'r') as f:
+            baseline = json.load(f)
+        report['comparison'] = compare(report['results'], baseline['results'], args.tolerance)
+        print(f"\nComparison with {args.baseline}:")
+        for row in report['comparison']:
+            ratio = f"{row['ratio']:.2f}x" if row['ratio'] is not None else "n/a"
+            flag = "  REGRESSION" if row['regression'] else ""
+            print(f"  {row['size']:>8} {row['benchmark']:<24} {ratio:>8}{flag}")
+        regressions = [row for row in report['comparison'] if row['regression']]
+
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=4)
+    print(f"Results saved to {args.output}")
+    if args.save_baseline:
+        with open(args.save_baseline, 'w') as f:
+            json.dump(report, f, indent=4)
+        print(f"Baseline saved to {args.save_baseline}")
+
+    if regressions:
+        print(f"{len(regressions)} regression(s) over {args.tolerance:.0%}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,239 @@
+"""
+Calendar of busy hours (lectures, labs, other fixed commitments)
+
+Busy time is kept in whole-hour slots, the granularity the scheduler works in;
+an interval that covers any part of an hour blocks that hour. For every hour
+of the day there is a sorted list of the days on which that hour is busy, so
+the number of busy hours inside a daily window over a range of days costs one
+pair of binary searches per hour of the window: O(24 log n) regardless of how
+many entries the calendar has.
+
+Slots are stored as (date ordinal, hour), independent of any scheduler: a
+calendar is shared between forks and written to state files and session
+logs. The availability query (busy_between) takes its start and deadline on
+the caller's SlotAxis (see scheduling.slots), like the scheduler's other
+integer hot paths.
+
+JSON format (list of entries):
+    {"start": "2025-01-02 10:00", "end": "2025-01-02 12:00"}
+    {"weekday": 0, "start_hour": 14, "end_hour": 16, "from": "2025-01-06", "until": "2025-03-28"}
+(weekday: 0 = Monday; "from"/"until" are inclusive)
+"""
+import bisect
+import json
+from datetime import datetime, timedelta
+
+
+class BusyCalendar:
+    """
+    Busy hour slots indexed per hour of the day
+    """
+
+    def __init__(self, entries=None):
+        """
+        Parameters:
+        entries (list): Optional calendar entries, see load
+        """
+        self._days = [[] for _ in range(24)]
+        self._slots = set()
+        # Bumped on every change, so callers can key caches on it
+        self.version = 0
+        if entries:
+            self.load(entries)
+
+    def __len__(self):
+        return len(self._slots)
+
+    @classmethod
+    def from_json(cls, filename):
+        """
+        Load a calendar from a JSON file
+
+        Parameters:
+        filename (str): Path to the JSON file
+
+        Returns:
+        BusyCalendar: Calendar with the file's entries
+        """
+        with open(filename, 'r') as f:
+            return cls(json.load(f))
+
+    @classmethod
+    def from_slots(cls, slots):
+        """
+        Build a calendar from busy slots (see slots)
+
+        Parameters:
+        slots (iterable): (day ordinal, hour) pairs
+
+        Returns:
+        BusyCalendar: Calendar with those slots
+        """
+        calendar = cls()
+        for day, hour in slots:
+            calendar._add_slot(day, hour)
+        calendar.version += 1
+        return calendar
+
+    def copy(self):
+        """
+        Get an independent copy of the calendar (with the same version)
+        """
+        calendar = BusyCalendar()
+        calendar._days = [list(days) for days in self._days]
+        calendar._slots = set(self._slots)
+        calendar.version = self.version
+        return calendar
+
+    def slots(self):
+        """
+        Get every busy slot
+
+        Returns:
+        list: Sorted (day ordinal, hour) pairs
+        """
+        return sorted(self._slots)
+
+    def load(self, entries):
+        """
+        Add calendar entries (one-off intervals and weekly recurring blocks)
+
+        Parameters:
+        entries (list): Entry dictionaries, see the module docstring
+        """
+        for entry in entries:
+            if 'weekday' in entry:
+                self.add_weekly(entry['weekday'], entry['start_hour'], entry['end_hour'],
+                                datetime.strptime(entry['from'], "%Y-%m-%d"),
+                                datetime.strptime(entry['until'], "%Y-%m-%d"))
+            else:
+                self.add(datetime.strptime(entry['start'], "%Y-%m-%d %H:%M"),
+                         datetime.strptime(entry['end'], "%Y-%m-%d %H:%M"))
+
+    def add(self, start, end):
+        """
+        Block every hour slot that overlaps [start, end)
+
+        Parameters:
+        start (datetime): Start of the busy interval
+        end (datetime): End of the busy interval
+        """
+        slot = start.replace(minute=0, second=0, microsecond=0)
+        while slot < end:
+            self._add_slot(slot.toordinal(), slot.hour)
+            slot += timedelta(hours=1)
+        self.version += 1
+
+    def add_weekly(self, weekday, start_hour, end_hour, first_date, last_date):
+        """
+        Block the same hours every week, e.g. a lecture over a term
+
+        Parameters:
+        weekday (int): Day of the week (0 = Monday)
+        start_hour (int): First busy hour
+        end_hour (int): End hour (exclusive)
+        first_date (datetime or date): First day of the recurrence
+        last_date (datetime or date): Last day of the recurrence (inclusive)
+        """
+        day = first_date.toordinal()
+        # date.weekday() of an ordinal is (ordinal - 1) % 7
+        day += (weekday - (day - 1) % 7) % 7
+        while day <= last_date.toordinal():
+            for hour in range(start_hour, end_hour):
+                self._add_slot(day, hour)
+            day += 7
+        self.version += 1
+
+    def clear(self):
+        """
+        Remove all busy slots
+        """
+        self._days = [[] for _ in range(24)]
+        self._slots = set()
+        self.version += 1
+
+    def is_busy(self, dt):
+        """
+        Check if the hour slot containing dt is busy
+        """
+        return (dt.toordinal(), dt.hour) in self._slots
+
+    def busy_hours(self, first_day, last_day, start_hour, end_hour):
+        """
+        Count busy slots with hour in [start_hour, end_hour) on days first_day..last_day
+
+        Parameters:
+        first_day (int): First day ordinal
+        last_day (int): Last day ordinal (inclusive)
+        start_hour (int): Start of the daily window
+        end_hour (int): End of the daily window (exclusive)
+
+        Returns:
+        int: Number of busy hours
+        """
+        if first_day > last_day or not self._slots:
+            return 0
+        total = 0
+        for hour in range(max(start_hour, 0), min(end_hour, 24)):
+            days = self._days[hour]
+            if days:
+                total += bisect.bisect_right(days, last_day) - bisect.bisect_left(days, first_day)
+        return total
+
+    def busy_between(self, axis, start_slot, deadline_day, work_start_hour, work_end_hour, deadline_hour):
+        """
+        Count busy hours inside the working time between a start slot and a
+        deadline, using the same windows as TaskScheduler.calculate_available_working_hours
+
+        Parameters:
+        axis (SlotAxis): Time axis the start slot and the deadline day are on
+        start_slot (int): Hour slot of the start
+        deadline_day (int): Day of the deadline
+        work_start_hour (int): Work start hour
+        work_end_hour (int): Work end hour
+        deadline_hour (int): Hour at which deadlines fall
+
+        Returns:
+        int: Busy hours to subtract from the available working hours
+        """
+        if not self._slots:
+            return 0
+        start_day, hour = divmod(start_slot, 24)
+        if start_day > deadline_day:
+            return 0
+        today = axis.ordinal(start_day)
+        deadline_day = axis.ordinal(deadline_day)
+        start_hour = max(hour, work_start_hour)
+        if today == deadline_day:
+            return self.busy_hours(today, today, start_hour, min(deadline_hour, work_end_hour))
+        return (self.busy_hours(today, today, start_hour, work_end_hour) +
+                self.busy_hours(today + 1, deadline_day - 1, work_start_hour, work_end_hour) +
+                self.busy_hours(deadline_day, deadline_day, work_start_hour, deadline_hour))
+
+    def next_busy(self, dt):
+        """
+        Get the start of the first busy slot at or after dt's hour
+
+        Parameters:
+        dt (datetime): Datetime to search from
+
+        Returns:
+        datetime: Start of the next busy slot, or None if there is none
+        """
+        today = dt.toordinal()
+        best = None
+        for hour, days in enumerate(self._days):
+            first_day = today if hour >= dt.hour else today + 1
+            position = bisect.bisect_left(days, first_day)
+            if position < len(days):
+                slot = (days[position], hour)
+                if best is None or slot < best:
+                    best = slot
+        if best is None:
+            return None
+        return datetime.fromordinal(best[0]) + timedelta(hours=best[1])
+
+    def _add_slot(self, day, hour):
+        if (day, hour) not in self._slots:
+            self._slots.add((day, hour))
+            bisect.insort(self._days[hour], day)
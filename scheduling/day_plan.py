@@ -0,0 +1,163 @@
+"""
+Precomputed plan of 2-hour work blocks with suffix repair
+
+Instead of ranking the tasks from scratch at every step, the scheduler can
+simulate the rest of the day (or several days) up front on a look-ahead copy
+of its state (see TaskScheduler.lookahead), kept for the life of the plan, assuming the suggested task is always chosen, and store the ranking
+of every block. Recommendations are then served from the plan. When the user
+works on a different task, or moods, weights or the working window change,
+only the blocks after the current one are dropped and re-simulated from the
+actual state.
+"""
+from collections import namedtuple
+from datetime import timedelta
+
+
+# start: block start time, ranking: suggested task indices (best first),
+# work_end_hour: working window the block was planned with
+PlanBlock = namedtuple('PlanBlock', ['start', 'ranking', 'work_end_hour'])
+
+
+class DayPlan:
+    """
+    Plan of upcoming work blocks for a TaskScheduler
+    """
+
+    def __init__(self, horizon_days=1):
+        """
+        Parameters:
+        horizon_days (int): Number of days (starting today) covered by one planning pass
+        """
+        self.horizon_days = max(1, horizon_days)
+        self.blocks = []
+        self.cursor = 0
+        # Planning passes over a fresh horizon, and re-plans after a deviation
+        self.builds = 0
+        self.repairs = 0
+        self._settings = None
+        self._dropped = False
+        # Look-ahead copy of the scheduler, re-synced for every planning pass
+        self._shadow = None
+
+    def __getstate__(self):
+        # The look-ahead copy is scratch space, rebuilt on the next planning pass
+        state = dict(self.__dict__)
+        state['_shadow'] = None
+        return state
+
+    def invalidate(self):
+        """
+        Drop the remaining blocks, e.g. after moods were updated
+        """
+        if self.cursor < len(self.blocks):
+            self._dropped = True
+            del self.blocks[self.cursor:]
+
+    def upcoming(self):
+        """
+        Get the blocks that have not been worked yet
+
+        Returns:
+        list: PlanBlock tuples in time order
+        """
+        return self.blocks[self.cursor:]
+
+    def recommend(self, scheduler, top_n=3, session_hours=2):
+        """
+        Get the suggested tasks for the scheduler's current time, repairing the
+        plan first if it no longer matches the scheduler's state
+
+        Parameters:
+        scheduler (TaskScheduler): Scheduler whose current state is planned
+        top_n (int): Number of suggested tasks per block
+        session_hours (int): Length of one work block
+
+        Returns:
+        list: Task indices, best first (empty if there is nothing left to do)
+        """
+        settings = (top_n, session_hours, scheduler._score_weights())
+        if settings != self._settings:
+            self._settings = settings
+            self.invalidate()
+
+        block = self._current_block(scheduler)
+        if block is None:
+            self._repair(scheduler, top_n, session_hours)
+            block = self._current_block(scheduler)
+        return list(block.ranking) if block is not None else []
+
+    def record(self, current_date, task_index):
+        """
+        Record which task was worked on in the current block
+
+        Parameters:
+        current_date (datetime): Start of the block
+        task_index (int): Task that was worked on
+        """
+        if self.cursor >= len(self.blocks) or self.blocks[self.cursor].start != current_date:
+            return
+        block = self.blocks[self.cursor]
+        self.cursor += 1
+        if not block.ranking or block.ranking[0] != task_index:
+            # The rest of the plan assumed the suggested task; re-plan from the next block
+            self.invalidate()
+
+    def _current_block(self, scheduler):
+        # Skip blocks the clock has already moved past
+        while self.cursor < len(self.blocks) and self.blocks[self.cursor].start < scheduler.current_date:
+            self.cursor += 1
+        if self.cursor >= len(self.blocks):
+            return None
+        block = self.blocks[self.cursor]
+        if block.start != scheduler.current_date or block.work_end_hour != scheduler.work_end_hour:
+            self.invalidate()
+            return None
+        return block
+
+    def _repair(self, scheduler, top_n, session_hours):
+        """
+        Re-simulate the plan from the scheduler's current state to the end of the horizon
+        """
+        if self._dropped:
+            self.repairs += 1
+        else:
+            self.builds += 1
+        self._dropped = False
+        # Blocks already worked are not needed any more
+        del self.blocks[:self.cursor]
+        self.cursor = 0
+        self._shadow = scheduler.lookahead(self._shadow)
+        self.blocks.extend(simulate_blocks(self._shadow, self.horizon_days, top_n, session_hours))
+
+
+def simulate_blocks(shadow, horizon_days=1, top_n=3, session_hours=2):
+    """
+    Simulate greedy work blocks from a scheduler's current state, always
+    choosing the most urgent task, until the end of the horizon
+
+    The blocks are run with the scheduler's own headless loop, so the shadow
+    ends up at the end of the horizon; pass a look-ahead copy to plan for a
+    scheduler without changing it.
+
+    Parameters:
+    shadow (TaskScheduler): Scheduler to simulate on (a look-ahead copy, see
+                            TaskScheduler.lookahead)
+    horizon_days (int): Number of days (starting today) to plan
+    top_n (int): Number of suggested tasks per block
+    session_hours (int): Length of one work block
+
+    Returns:
+    list: PlanBlock tuples in time order
+    """
+    midnight = shadow.current_date.replace(hour=0, minute=0, second=0, microsecond=0)
+    end = midnight + timedelta(days=horizon_days)
+
+    blocks = []
+
+    def record(scheduler, top_tasks):
+        blocks.append(PlanBlock(scheduler.current_date, [i for i, _ in top_tasks], scheduler.work_end_hour))
+        return 0
+
+    # The current day has been started already
+    shadow._run_sessions(policy=record, top_n=top_n, session_hours=session_hours, until=end, day_started=True)
+    return blocks
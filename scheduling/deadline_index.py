@@ -0,0 +1,220 @@
+import bisect
+
+
+class DeadlineIndex:
+    """
+    Deadline-ordered index of the remaining work of a task list
+
+    Tasks are grouped by deadline day, with the remaining work and the number
+    of unfinished tasks of every group. The unfinished counts are also kept in
+    a Fenwick tree, so the next group with work left is found in O(log G) and
+    the work due on or before each deadline ("cumulative demand") only visits
+    the groups that still have work instead of a sort of every task. Working
+    on a task is an O(1) update, O(log G) when the task is finished or
+    reopened; advancing the clock needs no update at all.
+    """
+
+    def __init__(self, tasks):
+        """
+        Build the index
+
+        Parameters:
+        tasks (list): List of Task records
+        """
+        self.rebuild(tasks)
+
+    def copy(self):
+        """
+        Get an independent copy of the index
+
+        Returns:
+        DeadlineIndex: Copy; the day layout, which is replaced but never changed
+                       in place, is shared
+        """
+        index = DeadlineIndex([])
+        index.group_days = self.group_days
+        index.group_deadlines = self.group_deadlines
+        index._group_of_day = self._group_of_day
+        index._task_day = list(self._task_day)
+        index._task_remaining = list(self._task_remaining)
+        index._group_remaining = list(self._group_remaining)
+        index._active_counts = list(self._active_counts)
+        index._active_total = self._active_total
+        index._fenwick = list(self._fenwick)
+        return index
+
+    def rebuild(self, tasks):
+        """
+        Rebuild the whole index from a task list
+
+        Parameters:
+        tasks (list): List of Task records
+        """
+        days = sorted({task.deadline.toordinal() for task in tasks})
+        group_of_day = {day: g for g, day in enumerate(days)}
+
+        self.group_days = days
+        self.group_deadlines = [None] * len(days)
+        self._group_of_day = group_of_day
+        self._task_day = []
+        self._task_remaining = []
+        self._group_remaining = [0] * len(days)
+        self._active_counts = [0] * len(days)
+
+        for task in tasks:
+            day = task.deadline.toordinal()
+            g = group_of_day[day]
+            if self.group_deadlines[g] is None or task.deadline < self.group_deadlines[g]:
+                self.group_deadlines[g] = task.deadline
+            remaining = task.duration - task.completed_work
+            if remaining > 0:
+                self._group_remaining[g] += remaining
+                self._active_counts[g] += 1
+            else:
+                remaining = 0
+            self._task_day.append(day)
+            self._task_remaining.append(remaining)
+
+        self._build_fenwick()
+
+    def add_task(self, task):
+        """
+        Add a task at the end of the task list the index was built from
+
+        O(log G) for a known deadline day; a new day inserts a group, O(G).
+
+        Parameters:
+        task (Task): Task record
+        """
+        day = task.deadline.toordinal()
+        g = self._group_of_day.get(day)
+        if g is None:
+            # New lists rather than inserts: the day layout may be shared with copies
+            g = bisect.bisect_left(self.group_days, day)
+            self.group_days = self.group_days[:g] + [day] + self.group_days[g:]
+            self.group_deadlines = self.group_deadlines[:g] + [task.deadline] + self.group_deadlines[g:]
+            self._group_of_day = {group_day: position for position, group_day in enumerate(self.group_days)}
+            self._group_remaining.insert(g, 0)
+            self._active_counts.insert(g, 0)
+            self._build_fenwick()
+        elif task.deadline < self.group_deadlines[g]:
+            self.group_deadlines = list(self.group_deadlines)
+            self.group_deadlines[g] = task.deadline
+        self._task_day.append(day)
+        self._task_remaining.append(0)
+        self.update_remaining(len(self._task_remaining) - 1, task.duration - task.completed_work)
+
+    def update_remaining(self, task_index, remaining):
+        """
+        Update the remaining work of one task
+
+        Parameters:
+        task_index (int): Index of the task in the task list used to build the index
+        remaining (float): New remaining work (duration - completed_work)
+        """
+        remaining = remaining if remaining > 0 else 0
+        old_remaining = self._task_remaining[task_index]
+        if remaining == old_remaining:
+            return
+
+        g = self._group_of_day[self._task_day[task_index]]
+        delta = remaining - old_remaining
+        self._task_remaining[task_index] = remaining
+        self._group_remaining[g] += delta
+
+        was_active = old_remaining > 0
+        is_active = remaining > 0
+        if was_active != is_active:
+            step = 1 if is_active else -1
+            self._active_counts[g] += step
+            self._active_total += step
+            self._fenwick_add(g, step)
+
+    def first_group_after(self, current_date):
+        """
+        Get the first group whose deadline is later than current_date
+
+        Parameters:
+        current_date (datetime): Current datetime
+
+        Returns:
+        int: Group position (len(group_days) if none)
+        """
+        return bisect.bisect_right(self.group_deadlines, current_date)
+
+    def has_active_from(self, start_group):
+        """
+        Check if any group from start_group onwards still has unfinished tasks
+        """
+        return self._active_total > self._active_before(start_group)
+
+    def next_active(self, start_group):
+        """
+        Get the first group from start_group onwards that still has unfinished tasks
+
+        Parameters:
+        start_group (int): First group position to look at
+
+        Returns:
+        int: Group position (len(group_days) if none)
+        """
+        # Largest prefix with no more unfinished tasks than the groups before start_group
+        target = self._active_before(start_group)
+        fenwick = self._fenwick
+        position = 0
+        step = 1 << (len(fenwick) - 1).bit_length()
+        while step:
+            i = position + step
+            if i < len(fenwick) and fenwick[i] <= target:
+                position = i
+                target -= fenwick[i]
+            step >>= 1
+        return position
+
+    def cumulative_remaining(self, start_group):
+        """
+        Get the work due on or before every active group from start_group onwards
+
+        Parameters:
+        start_group (int): First group position; work of earlier groups is not counted
+
+        Returns:
+        list: (group position, remaining work of groups start_group..g) tuples in deadline order
+        """
+        demands = []
+        required = 0
+        size = len(self.group_days)
+        g = self.next_active(start_group)
+        # Groups without unfinished tasks have no remaining work: only active ones are visited
+        while g < size:
+            required += self._group_remaining[g]
+            demands.append((g, required))
+            g = self.next_active(g + 1)
+        return demands
+
+    def _build_fenwick(self):
+        # Fenwick tree over the unfinished counts, built in O(G)
+        self._active_total = sum(self._active_counts)
+        fenwick = [0] + self._active_counts
+        for i in range(1, len(fenwick)):
+            parent = i + (i & -i)
+            if parent < len(fenwick):
+                fenwick[parent] += fenwick[i]
+        self._fenwick = fenwick
+
+    def _active_before(self, group):
+        # Unfinished tasks in the groups before group
+        total = 0
+        i = group
+        fenwick = self._fenwick
+        while i > 0:
+            total += fenwick[i]
+            i -= i & -i
+        return total
+
+    def _fenwick_add(self, g, delta):
+        i = g + 1
+        fenwick = self._fenwick
+        while i < len(fenwick):
+            fenwick[i] += delta
+            i += i & -i
@@ -0,0 +1,117 @@
+class DirtyTracker:
+    """
+    Bookkeeping for incremental recalculation of task urgency
+
+    time_to_deadline only depends on the current time and the deadline day, so
+    a full recalculation groups the live tasks (see scheduling.expiry_wheel)
+    by deadline day. Until the window it was computed for changes (a new day, the
+    work end hour, the busy calendar, the weights or the scoring policies),
+    advancing the clock is applied per group: the available hours are
+    calculated once per deadline day, and only the tasks of groups whose hours
+    changed, plus the tasks marked dirty (work done on them), are rescored.
+
+    Groups (days and slots on the scheduler's time axis, see scheduling.slots):
+        today     tasks due later today, checked one by one since they expire
+                  at their own deadline
+        active    later deadline day -> live tasks
+    Archived tasks leave their group (remove).
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        """
+        Forget everything, e.g. after the task list was replaced
+        """
+        self.window = None
+        self.last_slot = None
+        self.dirty = set()
+        self.today = []
+        self.active = {}
+        self.group_hours = {}
+
+    def copy(self):
+        """
+        Get an independent copy of the groups and dirty marks
+        """
+        tracker = DirtyTracker()
+        tracker.window = self.window
+        tracker.last_slot = self.last_slot
+        tracker.dirty = set(self.dirty)
+        tracker.today = list(self.today)
+        tracker.active = {day: set(group) for day, group in self.active.items()}
+        tracker.group_hours = dict(self.group_hours)
+        return tracker
+
+    def invalidate(self):
+        """
+        Make the next recalculation a full one (e.g. after moods changed)
+        """
+        self.window = None
+
+    def mark(self, task_index):
+        """
+        Mark a task whose own fields (completed work) changed since the last recalculation
+        """
+        self.dirty.add(task_index)
+
+    def take_dirty(self):
+        """
+        Get and clear the dirty tasks
+        """
+        dirty = self.dirty
+        self.dirty = set()
+        return dirty
+
+    def is_current(self, window, current_slot):
+        """
+        Check if the groups can be updated incrementally
+
+        Parameters:
+        window (tuple): Day, work end hour, calendar version, weights and policies
+        current_slot (int): Current hour slot (the clock must not have gone back)
+
+        Returns:
+        bool: True if the groups were built for this window
+        """
+        return self.window is not None and self.window == window and self.last_slot <= current_slot
+
+    def start(self, window, current_slot):
+        """
+        Start a full recalculation with empty groups
+
+        Parameters:
+        window (tuple): See is_current
+        current_slot (int): Current hour slot
+        """
+        self.reset()
+        self.window = window
+        self.last_slot = current_slot
+
+    def add(self, task_index, deadline_day, today, hours):
+        """
+        Add a task recalculated by a full recalculation to its group
+
+        Parameters:
+        task_index (int): Index of the task in the tasks list
+        deadline_day (int): Day of the live task's deadline
+        today (int): Current day
+        hours (int): The task's new time_to_deadline
+        """
+        if deadline_day == today:
+            self.today.append(task_index)
+            return
+        group = self.active.get(deadline_day)
+        if group is None:
+            group = self.active[deadline_day] = set()
+            self.group_hours[deadline_day] = hours
+        group.add(task_index)
+
+    def remove(self, task_index, deadline_day):
+        """
+        Drop an archived task from its group (tasks due today are dropped by the next recalculation)
+        """
+        group = self.active.get(deadline_day)
+        if group is not None:
+            group.discard(task_index)
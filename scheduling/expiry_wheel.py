@@ -0,0 +1,211 @@
+"""
+Timing wheel of task deadlines and the archive of tasks that left the live set
+
+A task is live while it is before its deadline and has work left. Live tasks
+sit in an ExpiryWheel bucket for the hour slot of their deadline (see
+scheduling.slots); turning the wheel to the current slot hands back every task
+whose deadline has passed, so
+expiry costs O(hours elapsed + tasks expired) instead of a scan of all tasks.
+Deadlines beyond the wheel wait in an overflow heap and drop into their
+bucket once the wheel gets close enough.
+
+Completed and expired tasks move to the TaskArchive. Their fields no longer
+change, so their snapshot dict and status dict are built once and handed out
+as copies: the scheduler's hot loops only touch live tasks, while reports and
+snapshots still list every task. A completed task keeps the time_to_deadline
+it had when it was finished (it is not refreshed until its deadline).
+"""
+import heapq
+
+
+COMPLETED = 'completed'
+EXPIRED = 'expired'
+
+
+class ExpiryWheel:
+    """
+    Hashed timing wheel with one bucket per hour
+    """
+
+    def __init__(self, current_slot, size=1024):
+        """
+        Parameters:
+        current_slot (int): Hour slot the wheel starts at
+        size (int): Number of hourly buckets (deadlines further out wait in the overflow)
+        """
+        self.size = size
+        # First slot whose deadlines have not expired yet
+        self.tick = current_slot + 1
+        self._buckets = [[] for _ in range(size)]
+        self._overflow = {}
+        self._overflow_ticks = []
+        # Tasks added with a deadline the wheel had already passed
+        self._late = []
+
+    def copy(self):
+        """
+        Get an independent copy of the wheel
+        """
+        wheel = ExpiryWheel(self.tick - 1, self.size)
+        wheel._buckets = [list(bucket) for bucket in self._buckets]
+        wheel._overflow = {tick: list(entries) for tick, entries in self._overflow.items()}
+        wheel._overflow_ticks = list(self._overflow_ticks)
+        wheel._late = list(self._late)
+        return wheel
+
+    def add(self, task_index, deadline_slot):
+        """
+        Schedule a task's expiry
+
+        Parameters:
+        task_index (int): Index of the task in the scheduler's task list
+        deadline_slot (int): Hour slot of the task's deadline
+        """
+        tick = deadline_slot
+        if tick < self.tick:
+            # Deadlines already behind the wheel expire at the next advance
+            self._late.append(task_index)
+        elif tick - self.tick < self.size:
+            self._buckets[tick % self.size].append(task_index)
+        elif tick in self._overflow:
+            self._overflow[tick].append(task_index)
+        else:
+            self._overflow[tick] = [task_index]
+            heapq.heappush(self._overflow_ticks, tick)
+
+    def expiring_before(self, until_slot):
+        """
+        Iterate over the deadlines from the wheel's tick up to until_slot
+
+        Only the hourly buckets are looked at, one per slot, so this is meant
+        for short look-aheads (the rest of a working day).
+
+        Parameters:
+        until_slot (int): First slot not looked at
+
+        Yields:
+        tuple: (slot, indices of the tasks due at that slot); the tasks may have
+               been completed since they were scheduled
+        """
+        for slot in range(self.tick, min(until_slot, self.tick + self.size)):
+            bucket = self._buckets[slot % self.size]
+            if bucket:
+                yield slot, bucket
+
+    def advance(self, current_slot):
+        """
+        Turn the wheel to current_slot
+
+        Parameters:
+        current_slot (int): Current hour slot (turning back does nothing)
+
+        Returns:
+        list: Indices of the tasks whose deadline slot is at or before current_slot
+        """
+        expired = self._late
+        self._late = []
+        if current_slot < self.tick:
+            return expired
+
+        # Deadlines fall on the hour, so every bucket up to the current one has expired
+        buckets = self._buckets
+        for tick in range(self.tick, self.tick + min(current_slot + 1 - self.tick, self.size)):
+            bucket = buckets[tick % self.size]
+            if bucket:
+                expired.extend(bucket)
+                bucket.clear()
+        self.tick = current_slot + 1
+
+        overflow_ticks = self._overflow_ticks
+        while overflow_ticks and overflow_ticks[0] < self.tick + self.size:
+            tick = heapq.heappop(overflow_ticks)
+            entries = self._overflow.pop(tick)
+            if tick < self.tick:
+                expired.extend(entries)
+            else:
+                buckets[tick % self.size].extend(entries)
+        return expired
+
+
+class TaskArchive:
+    """
+    Tasks that are completed or past their deadline, with their output frozen
+    """
+
+    def __init__(self):
+        # Task index -> COMPLETED or EXPIRED, in archive order
+        self.reasons = {}
+        self.order = []
+        # Bumped whenever the cached output is dropped (see clear_cache)
+        self.epoch = 0
+        self._dicts = {}
+        self._statuses = {}
+
+    def __contains__(self, task_index):
+        return task_index in self.reasons
+
+    def __len__(self):
+        return len(self.reasons)
+
+    def add(self, task_index, reason):
+        """
+        Archive a task
+
+        Parameters:
+        task_index (int): Index of the task in the scheduler's task list
+        reason (str): COMPLETED or EXPIRED
+        """
+        self.reasons[task_index] = reason
+        self.order.append(task_index)
+
+    def copy(self):
+        """
+        Get a copy of the archive; the cached dicts of archived tasks are shared
+        (they are only handed out as copies)
+        """
+        archive = TaskArchive()
+        archive.reasons = dict(self.reasons)
+        archive.order = list(self.order)
+        archive.epoch = self.epoch
+        archive._dicts = dict(self._dicts)
+        archive._statuses = dict(self._statuses)
+        return archive
+
+    def counts(self):
+        """
+        Get the number of archived tasks per reason
+        """
+        counts = {COMPLETED: 0, EXPIRED: 0}
+        for reason in self.reasons.values():
+            counts[reason] += 1
+        return counts
+
+    def to_dict(self, task_index, task):
+        """
+        Get a copy of the snapshot dict of an archived task, built on first use
+        """
+        task_dict = self._dicts.get(task_index)
+        if task_dict is None:
+            task_dict = self._dicts[task_index] = task.to_dict()
+        return dict(task_dict)
+
+    def status(self, task_index, build_status):
+        """
+        Get a copy of the status dict of an archived task, built on first use
+
+        Parameters:
+        task_index (int): Index of the task
+        build_status (callable): build_status(task_index) -> status dict
+        """
+        status = self._statuses.get(task_index)
+        if status is None:
+            status = self._statuses[task_index] = build_status(task_index)
+        return dict(status)
+
+    def clear_cache(self):
+        """
+        Drop the cached output, e.g. after the moods of archived tasks changed
+        """
+        self._dicts = {}
+        self._statuses = {}
+        self.epoch += 1
@@ -0,0 +1,64 @@
+"""
+Minimum-overtime work end hour
+
+Finds the earliest work end hour for which every future deadline can be met
+when all tasks are worked on in earliest-deadline-first order. EDF is optimal
+for a single worker, so a deadline is reachable at a given end hour exactly
+when the work due on or before it fits in the working hours left until it:
+
+    cumulative_required(d) <= available_hours(now, d, end_hour)
+
+The available hours only grow with the end hour, so feasibility is monotone
+and the smallest feasible end hour is found with a binary search over the
+candidate hours; each probe is one O(G) sweep over the G deadline days.
+
+The available hours themselves come from the caller (the scheduler's
+memoized TaskScheduler._available_hours), so the solver and the scheduler
+can't disagree on them.
+"""
+
+
+# Extensions stay a multiple of 2 hours (the session length), capped at midnight
+END_HOUR_CANDIDATES = (19, 21, 23, 24)
+
+
+def edf_feasible(demands, hours_until, end_hour):
+    """
+    Check if every deadline is met under EDF with a given work end hour
+
+    Parameters:
+    demands (list): (deadline day, work due on or before that day) tuples, in
+                    deadline order, for deadline days after the current day
+    hours_until (callable): hours_until(deadline day, end hour) -> working hours
+                            available from now until that deadline
+    end_hour (int): Work end hour to test
+
+    Returns:
+    bool: True if no deadline is short of time
+    """
+    for deadline_day, required in demands:
+        if required > hours_until(deadline_day, end_hour):
+            return False
+    return True
+
+
+def minimal_work_end_hour(demands, hours_until, candidates=END_HOUR_CANDIDATES):
+    """
+    Find the earliest candidate work end hour that meets every deadline
+
+    Parameters:
+    demands (list): See edf_feasible
+    hours_until (callable): See edf_feasible
+    candidates (tuple): Allowed end hours in increasing order
+
+    Returns:
+    int: Earliest feasible end hour, or the latest candidate if none is feasible
+    """
+    lo, hi = 0, len(candidates) - 1
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if edf_feasible(demands, hours_until, candidates[mid]):
+            hi = mid
+        else:
+            lo = mid + 1
+    return candidates[lo]
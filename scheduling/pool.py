@@ -0,0 +1,105 @@
+"""
+Process pool and engine plumbing shared by the batch tools (weight_sweep,
+batch_planner, what_if)
+
+Data every job of a run needs (task lists, a restored scheduler, run settings)
+is sent to each worker process once through the pool initializer and kept in
+worker_state, so only the small per-job arguments are pickled with every job.
+"""
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+
+# Simulation engines: fixed sessions (run_headless) or event-driven (run_event_driven)
+ENGINES = ('ticks', 'events')
+ENGINE_HELP = "Fixed 2-hour sessions, or work on a task until the next event"
+
+# Data shared by every job of a worker process (see run_pool)
+worker_state = {}
+
+
+def check_engine(engine):
+    """
+    Check an engine name before any work is started
+
+    Parameters:
+    engine (str): Engine name, one of ENGINES
+
+    Raises:
+    ValueError: If the engine is unknown
+    """
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown engine {engine!r}, expected one of {', '.join(ENGINES)}")
+
+
+def run_engine(scheduler, engine='ticks', max_steps=None, save_snapshots=False, results_file=None):
+    """
+    Run a scheduler to the end with one of the engines
+
+    Parameters:
+    scheduler (TaskScheduler): Scheduler to run
+    engine (str): 'ticks' for run_headless, 'events' for run_event_driven
+    max_steps (int): Maximum number of work sessions or events (None for no limit)
+    save_snapshots (bool): Save a task snapshot before every session (ticks engine only)
+    results_file (str): Save final results to this file if given
+
+    Raises:
+    ValueError: If the engine is unknown
+    """
+    check_engine(engine)
+    if engine == 'events':
+        scheduler.run_event_driven(max_events=max_steps)
+        if results_file:
+            scheduler.save_results(results_file)
+    else:
+        scheduler.run_headless(max_steps=max_steps, save_snapshots=save_snapshots, results_file=results_file)
+
+
+def pool_workers(workers, job_count):
+    """
+    Get the number of workers for a run
+
+    Parameters:
+    workers (int): Requested number of workers (None for one per job, at most the CPU count)
+    job_count (int): Number of jobs
+
+    Returns:
+    int: Number of workers
+    """
+    return workers or max(1, min(job_count, os.cpu_count() or 1))
+
+
+def _init_worker(shared, setup):
+    worker_state.clear()
+    worker_state.update(setup(shared) if setup is not None else shared)
+
+
+def run_pool(run_job, jobs, shared, workers=None, chunks_per_worker=4, setup=None):
+    """
+    Run a job function over a process pool
+
+    Parameters:
+    run_job (callable): Module-level function run_job(job) -> result; it reads
+                        the shared data from worker_state
+    jobs (list): Job arguments
+    shared (dict): Data for every job, sent to each worker once
+    workers (int): Number of worker processes (see pool_workers)
+    chunks_per_worker (int): Jobs are sent in about this many chunks per worker;
+                             fewer, larger chunks mean less inter-process traffic,
+                             more, smaller chunks balance jobs of uneven size
+    setup (callable): Module-level function setup(shared) -> dict run once per
+                      worker to build its worker_state (default: shared as is)
+
+    Returns:
+    tuple: (results in job order, run statistics with 'workers' and 'seconds')
+    """
+    workers = pool_workers(workers, len(jobs))
+    chunksize = max(1, len(jobs) // (workers * chunks_per_worker))
+
+    started = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(shared, setup)) as executor:
+        results = list(executor.map(run_job, jobs, chunksize=chunksize))
+    elapsed = time.perf_counter() - started
+    return results, {'workers': workers, 'seconds': elapsed}
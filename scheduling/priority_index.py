@@ -0,0 +1,186 @@
+import heapq
+
+
+class TaskPriorityIndex:
+    """
+    Indexed binary max-heap of task weighted scores
+
+    Entries are ordered by (-weighted_score, task_index), which matches a stable
+    descending sort of the task list, so ties go to the task that comes first.
+    Scores can be changed in place in O(log n), and finished or expired tasks
+    are dropped lazily the first time a top-k query runs into them.
+    """
+
+    def __init__(self):
+        self._heap = []
+        self._positions = {}
+        self._keys = {}
+
+    def __len__(self):
+        return len(self._heap)
+
+    def __contains__(self, task_index):
+        return task_index in self._positions
+
+    def __iter__(self):
+        return iter(self._positions)
+
+    def clear(self):
+        """
+        Remove all entries
+        """
+        self._heap = []
+        self._positions = {}
+        self._keys = {}
+
+    def copy(self):
+        """
+        Get an independent copy of the index
+        """
+        index = TaskPriorityIndex()
+        index._heap = list(self._heap)
+        index._positions = dict(self._positions)
+        index._keys = dict(self._keys)
+        return index
+
+    def rebuild(self, scores):
+        """
+        Replace all entries in one pass
+
+        Parameters:
+        scores (iterable): (task_index, score) pairs
+        """
+        self._keys = {task_index: (-score, task_index) for task_index, score in scores}
+        # A sorted array is a valid heap
+        self._heap = sorted(self._keys, key=self._keys.__getitem__)
+        self._positions = {task_index: position for position, task_index in enumerate(self._heap)}
+
+    def update(self, task_index, score):
+        """
+        Insert a task or change its score
+
+        Parameters:
+        task_index (int): Index of the task in the scheduler's task list
+        score (float): Weighted score of the task
+        """
+        key = (-score, task_index)
+        position = self._positions.get(task_index)
+        if position is None:
+            self._keys[task_index] = key
+            self._heap.append(task_index)
+            self._positions[task_index] = len(self._heap) - 1
+            self._sift_up(len(self._heap) - 1)
+            return
+
+        old_key = self._keys[task_index]
+        self._keys[task_index] = key
+        if key < old_key:
+            self._sift_up(position)
+        elif key > old_key:
+            self._sift_down(position)
+
+    def update_many(self, scores):
+        """
+        Change the scores of many tasks at once (tasks not in the index are inserted)
+
+        When a large share of the entries changes, e.g. after the clock advanced
+        for every task, re-sorting the whole heap once is cheaper than sifting
+        each entry.
+
+        Parameters:
+        scores (list): (task_index, score) pairs
+        """
+        if len(scores) * 4 < len(self._heap):
+            for task_index, score in scores:
+                self.update(task_index, score)
+            return
+        keys = self._keys
+        for task_index, score in scores:
+            keys[task_index] = (-score, task_index)
+        # A sorted array is a valid heap
+        self._heap = sorted(keys, key=keys.__getitem__)
+        self._positions = {task_index: position for position, task_index in enumerate(self._heap)}
+
+    def remove(self, task_index):
+        """
+        Remove a task if it is in the index
+
+        Parameters:
+        task_index (int): Index of the task in the scheduler's task list
+        """
+        position = self._positions.pop(task_index, None)
+        if position is None:
+            return
+        del self._keys[task_index]
+
+        last = self._heap.pop()
+        if position < len(self._heap):
+            self._heap[position] = last
+            self._positions[last] = position
+            self._sift_up(position)
+            self._sift_down(self._positions[last])
+
+    def top_k(self, k, is_active):
+        """
+        Get the k highest scored active tasks in O(k log k) heap visits
+
+        Parameters:
+        k (int): Number of tasks to return
+        is_active (callable): Returns False for tasks that should be dropped
+
+        Returns:
+        list: Task indices, best first
+        """
+        result = []
+        inactive = []
+        heap = self._heap
+        if k <= 0 or not heap:
+            return result
+
+        # Best-first walk of the heap: a node can only be better than its subtree
+        frontier = [(self._keys[heap[0]], 0)]
+        while frontier and len(result) < k:
+            _, position = heapq.heappop(frontier)
+            task_index = heap[position]
+            if is_active(task_index):
+                result.append(task_index)
+            else:
+                inactive.append(task_index)
+            for child in (2 * position + 1, 2 * position + 2):
+                if child < len(heap):
+                    heapq.heappush(frontier, (self._keys[heap[child]], child))
+
+        for task_index in inactive:
+            self.remove(task_index)
+        return result
+
+    def _swap(self, i, j):
+        heap = self._heap
+        heap[i], heap[j] = heap[j], heap[i]
+        self._positions[heap[i]] = i
+        self._positions[heap[j]] = j
+
+    def _sift_up(self, position):
+        keys = self._keys
+        heap = self._heap
+        while position > 0:
+            parent = (position - 1) // 2
+            if keys[heap[position]] < keys[heap[parent]]:
+                self._swap(position, parent)
+                position = parent
+            else:
+                break
+
+    def _sift_down(self, position):
+        keys = self._keys
+        heap = self._heap
+        size = len(heap)
+        while True:
+            best = position
+            for child in (2 * position + 1, 2 * position + 2):
+                if child < size and keys[heap[child]] < keys[heap[best]]:
+                    best = child
+            if best == position:
+                break
+            self._swap(position, best)
+            position = best
@@ -0,0 +1,200 @@
+"""
+Per-phase wall-time profiler for the scheduler loop
+
+Records call counts and wall time for named phases of a run
+(recalculate_all_tasks, save_tasks_snapshot, console output, ...). Phases may
+nest: "total" is the inclusive time of a phase, "self" excludes the time
+spent in phases started inside it, so the self times of all phases add up to
+the profiled time without double counting.
+
+The profiler is switched on and off at runtime with enable()/disable(); while
+it is off, a profiled call costs one attribute check.
+"""
+import functools
+import json
+import time
+
+
+class PhaseProfiler:
+    """
+    Call counts and wall time per phase
+    """
+
+    def __init__(self, enabled=False, clock=time.perf_counter):
+        """
+        Parameters:
+        enabled (bool): Start recording right away
+        clock (callable): Time source in seconds
+        """
+        self.enabled = enabled
+        self._clock = clock
+        # name -> [calls, total seconds, self seconds, max seconds]
+        self._stats = {}
+        # Open phases: [name, start time, time spent in child phases]
+        self._stack = []
+
+    def enable(self):
+        """
+        Start recording phases
+        """
+        self.enabled = True
+
+    def disable(self):
+        """
+        Stop recording phases (phases already open are still closed normally)
+        """
+        self.enabled = False
+
+    def reset(self):
+        """
+        Drop all recorded statistics
+        """
+        self._stats = {}
+
+    def start(self, name):
+        """
+        Open a phase; every start must be matched by a stop
+        """
+        self._stack.append([name, self._clock(), 0.0])
+
+    def stop(self):
+        """
+        Close the innermost open phase and record its time
+        """
+        name, started, child_time = self._stack.pop()
+        elapsed = self._clock() - started
+        if self._stack:
+            self._stack[-1][2] += elapsed
+        stats = self._stats.get(name)
+        if stats is None:
+            stats = self._stats[name] = [0, 0.0, 0.0, 0.0]
+        stats[0] += 1
+        # A phase nested in itself (recursion) only counts once in the total
+        if not any(frame[0] == name for frame in self._stack):
+            stats[1] += elapsed
+        stats[2] += elapsed - child_time
+        if elapsed > stats[3]:
+            stats[3] = elapsed
+
+    def phase(self, name):
+        """
+        Context manager timing a block as a phase
+
+        Parameters:
+        name (str): Phase name
+
+        Returns:
+        context manager: Records the block if the profiler is enabled
+        """
+        if not self.enabled:
+            return _NO_PHASE
+        return _Phase(self, name)
+
+    def stats(self):
+        """
+        Get the recorded statistics
+
+        Returns:
+        dict: Phase name -> {'calls', 'total_s', 'self_s', 'mean_ms', 'max_ms'},
+              slowest phase (by self time) first
+        """
+        result = {}
+        for name, (calls, total, self_time, longest) in sorted(
+                self._stats.items(), key=lambda item: -item[1][2]):
+            result[name] = {
+                'calls': calls,
+                'total_s': total,
+                'self_s': self_time,
+                'mean_ms': total / calls * 1000,
+                'max_ms': longest * 1000
+            }
+        return result
+
+    def report(self):
+        """
+        Format the statistics as a table
+
+        Returns:
+        str: One line per phase with calls, total/self seconds, share of the
+             profiled time, and mean/max milliseconds per call
+        """
+        stats = self.stats()
+        profiled = sum(phase['self_s'] for phase in stats.values())
+        width = max([len(name) for name in stats] + [len('phase')])
+        lines = [f"{'phase':<{width}} {'calls':>8} {'total s':>10} {'self s':>10} {'self %':>7} "
+                 f"{'mean ms':>10} {'max ms':>10}"]
+        for name, phase in stats.items():
+            share = phase['self_s'] / profiled * 100 if profiled else 0.0
+            lines.append(f"{name:<{width}} {phase['calls']:>8} {phase['total_s']:>10.4f} "
+                         f"{phase['self_s']:>10.4f} {share:>6.1f}% {phase['mean_ms']:>10.3f} "
+                         f"{phase['max_ms']:>10.3f}")
+        lines.append(f"{'profiled':<{width}} {'':>8} {'':>10} {profiled:>10.4f}")
+        return "\n".join(lines)
+
+    def save(self, filename):
+        """
+        Save the statistics to a JSON file
+
+        Parameters:
+        filename (str): Output path
+
+        Returns:
+        str: Path to the saved file
+        """
+        with open(filename, 'w', encoding='utf-8') as f:
+            json.dump({'phases': self.stats()}, f, indent=2)
+        return filename
+
+
+class _Phase:
+    __slots__ = ('profiler', 'name')
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.profiler.start(self.name)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.profiler.stop()
+        return False
+
+
+class _NoPhase:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NO_PHASE = _NoPhase()
+
+
+def profiled(name=None):
+    """
+    Decorator recording a method as a phase of its object's profiler
+    (the object must have a `profiler` attribute)
+
+    Parameters:
+    name (str): Phase name (defaults to the method name)
+    """
+    def decorate(method):
+        phase_name = name or method.__name__
+
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            profiler = self.profiler
+            if not profiler.enabled:
+                return method(self, *args, **kwargs)
+            profiler.start(phase_name)
+            try:
+                return method(self, *args, **kwargs)
+            finally:
+                profiler.stop()
+        return wrapper
+    return decorate
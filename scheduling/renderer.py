@@ -0,0 +1,181 @@
+"""
+Console renderer for run_simulation
+
+Output goes through three levels:
+    quiet    only what is needed to answer the prompts (time, suggested tasks, prompts)
+    summary  adds one-line summaries (day start, task counts, explanations, work done)
+    verbose  the full task listing, diffed: after the first step, a task only
+             shows the fields whose printed value changed since the previous step
+Lines are collected in a buffer and written with a single write and flush per
+step (and before every prompt), instead of one terminal write per print.
+"""
+import sys
+
+
+# 添加颜色常量定义
+# ANSI颜色代码
+class Colors:
+    RESET = "\033[0m"
+    BLACK = "\033[30m"
+    RED = "\033[31m"
+    GREEN = "\033[32m"
+    YELLOW = "\033[33m"
+    BLUE = "\033[34m"
+    MAGENTA = "\033[35m"
+    CYAN = "\033[36m"
+    WHITE = "\033[37m"
+    BOLD = "\033[1m"
+    UNDERLINE = "\033[4m"
+    BACKGROUND_BLACK = "\033[40m"
+    BACKGROUND_RED = "\033[41m"
+    BACKGROUND_GREEN = "\033[42m"
+    BACKGROUND_YELLOW = "\033[43m"
+    BACKGROUND_BLUE = "\033[44m"
+    BACKGROUND_MAGENTA = "\033[45m"
+    BACKGROUND_CYAN = "\033[46m"
+    BACKGROUND_WHITE = "\033[47m"
+
+
+QUIET = 0
+SUMMARY = 1
+VERBOSE = 2
+LEVELS = {'quiet': QUIET, 'summary': SUMMARY, 'verbose': VERBOSE}
+
+
+def task_name(task):
+    return task.get('name', task.get('assignment_name', 'Unnamed Task'))
+
+
+def urgency_color(urgency):
+    # 根据紧急程度使用不同颜色
+    if urgency > 70:
+        return Colors.RED
+    if urgency > 40:
+        return Colors.YELLOW
+    return Colors.GREEN
+
+
+class ConsoleRenderer:
+    """
+    Buffered, level-filtered console output with a diffed task listing
+    """
+
+    def __init__(self, level='verbose', stream=None):
+        """
+        Parameters:
+        level (str or int): 'quiet', 'summary' or 'verbose'
+        stream (file): Output stream (None for the sys.stdout of the time of writing)
+        """
+        self.level = LEVELS[level] if isinstance(level, str) else level
+        self.stream = stream
+        self._buffer = []
+        # Task index -> printed field lines of the previous listing
+        self._last_status = {}
+
+    def shows(self, level):
+        """
+        Check if output of a level is shown
+        """
+        return self.level >= level
+
+    def write(self, text, level=SUMMARY):
+        """
+        Buffer a line of output if its level is shown
+
+        Parameters:
+        text (str): Line without the trailing newline
+        level (int): QUIET, SUMMARY or VERBOSE
+        """
+        if self.level >= level:
+            self._buffer.append(text)
+
+    def flush(self):
+        """
+        Write the buffered lines with a single write
+        """
+        if not self._buffer:
+            return
+        stream = self.stream if self.stream is not None else sys.stdout
+        self._buffer.append('')
+        stream.write('\n'.join(self._buffer))
+        stream.flush()
+        self._buffer = []
+
+    def reset(self):
+        """
+        Forget the previous listing, so the next one is printed in full
+        """
+        self._last_status = {}
+
+    def task_status(self, statuses, tasks):
+        """
+        Render the status of the uncompleted tasks: a one-line total in summary
+        mode, the fields that changed since the previous listing in verbose mode
+
+        Parameters:
+        statuses (list): Task status dictionaries (TaskScheduler.get_task_status)
+        tasks (list): Task records, for the effective work time before the deadline
+        """
+        if self.level < SUMMARY:
+            return
+        active = [status for status in statuses if not status['is_completed']]
+        if self.level == SUMMARY:
+            work_left = sum(status['duration_left'] for status in active)
+            self.write(f"{Colors.MAGENTA}{len(active)} active tasks, {work_left:g} hours of work left{Colors.RESET}")
+            return
+
+        self.write(f"\n{Colors.BOLD}{Colors.MAGENTA}Current task status:{Colors.RESET}", VERBOSE)
+        unchanged = 0
+        last_status = {}
+        for status in active:
+            i = status['index']
+            fields = (
+                f"  Accumulated work time: {status['completed_work']} hours",
+                f"  Remaining work time: {Colors.YELLOW}{status['duration_left']} hours{Colors.RESET}",
+                f"  Effective work time before deadline: {tasks[i].get('time_to_deadline', 0):.2f} hours",
+                f"  Urgency: {urgency_color(status['urgency'])}{status['urgency']:.2f}%{Colors.RESET}"
+            )
+            last_status[i] = fields
+            previous = self._last_status.get(i)
+            if previous is None:
+                changed = fields
+            else:
+                changed = [line for line, previous_line in zip(fields, previous) if line != previous_line]
+            if not changed:
+                unchanged += 1
+                continue
+            self.write(f"{Colors.CYAN}Task {i+1}: {status['name']}{Colors.RESET}", VERBOSE)
+            self._buffer.extend(changed)
+        # Completed tasks drop out of the listing
+        self._last_status = last_status
+        if unchanged:
+            self.write(f"  ({unchanged} tasks unchanged)", VERBOSE)
+
+    def suggestions(self, top_tasks):
+        """
+        Render the suggested tasks: names only when quiet, one line per task in
+        summary mode, all fields in verbose mode
+
+        Parameters:
+        top_tasks (list): (task_index, task) tuples, best first
+        """
+        if self.level == VERBOSE:
+            self.write(f"\n{Colors.BOLD}{Colors.GREEN}Top 3 suggested tasks based on weighted score:{Colors.RESET}",
+                       VERBOSE)
+        else:
+            self.write(f"{Colors.BOLD}{Colors.GREEN}Suggested tasks:{Colors.RESET}", QUIET)
+        for i, (task_idx, task) in enumerate(top_tasks):
+            self.write(f"{Colors.BOLD}{i+1}. Task {task_idx+1}: {task_name(task)}{Colors.RESET}", QUIET)
+            if self.level == SUMMARY:
+                self._buffer[-1] += (f"  score {task['weighted_score']:.2f}, urgency {task['urgency']:.2f}%, "
+                                     f"{task.get('duration_left', 0)}h left, "
+                                     f"due {task['deadline'].strftime('%m-%d %H:%M')}")
+            elif self.level == VERBOSE:
+                self._buffer.extend((
+                    f"   Weighted Score: {Colors.CYAN}{task['weighted_score']:.2f}{Colors.RESET}",
+                    f"   Urgency: {Colors.YELLOW}{task['urgency']:.2f}%{Colors.RESET}",
+                    f"   Importance: {task.get('importance', 5)}",
+                    f"   Mood: {Colors.MAGENTA}{task.get('mood', 5)}{Colors.RESET}",
+                    f"   Remaining work: {task.get('duration_left', 0)} hours",
+                    f"   Deadline: {task['deadline'].strftime('%Y-%m-%d %H:%M')}"
+                ))
@@ -0,0 +1,220 @@
+"""
+Registry of urgency and ranking policies
+
+An urgency policy turns a task's remaining work and the working hours left
+before its deadline into an urgency; a ranking policy combines urgency,
+importance and mood into the weighted score tasks are suggested by. Each
+policy is registered once under a name with two implementations that must
+agree:
+
+    scalar(...)  one task, plain floats (per-task updates in the scheduler)
+    batch(...)   NumPy arrays, one vectorized call over many tasks (TaskTable,
+                 evaluate_batch, benchmarks)
+
+If no batch implementation is given, the scalar one is applied element-wise.
+
+Signatures:
+    urgency:  scalar(duration_left, time_to_deadline) -> float
+    ranking:  scalar(urgency, importance, mood, weights) -> float
+              weights = (urgency_weight, importance_weight, mood_weight)
+
+Built-in policies:
+    urgency "deadline_pressure"  100 * left / (hours + left) * (1 + 1/left)  (scheduler default)
+    urgency "remaining_ratio"    100 * left / hours                          (tj_simulator/score.py)
+    ranking "weighted"           uw * urgency / 10 + iw * importance + mw * mood  (scheduler default)
+    ranking "weighted_raw"       uw * urgency + iw * importance + mw * mood       (tj_simulator/scorer.py)
+Every urgency policy gives 100 once no working time is left before the
+deadline and 0 once the task is done.
+"""
+from collections import namedtuple
+
+try:
+    import numpy as np
+except ImportError:  # Only the batch implementations need NumPy
+    np = None
+
+
+UrgencyPolicy = namedtuple('UrgencyPolicy', ['name', 'scalar', 'batch'])
+RankingPolicy = namedtuple('RankingPolicy', ['name', 'scalar', 'batch'])
+
+DEFAULT_URGENCY = 'deadline_pressure'
+DEFAULT_RANKING = 'weighted'
+
+_urgency_policies = {}
+_ranking_policies = {}
+
+
+def register_urgency(name, scalar, batch=None):
+    """
+    Register an urgency policy
+
+    Parameters:
+    name (str): Policy name
+    scalar (callable): scalar(duration_left, time_to_deadline) -> float
+    batch (callable): Same over NumPy arrays (optional)
+
+    Returns:
+    UrgencyPolicy: The registered policy
+    """
+    if batch is None:
+        batch = _elementwise(scalar)
+    policy = _urgency_policies[name] = UrgencyPolicy(name, scalar, batch)
+    return policy
+
+
+def register_ranking(name, scalar, batch=None):
+    """
+    Register a ranking policy
+
+    Parameters:
+    name (str): Policy name
+    scalar (callable): scalar(urgency, importance, mood, weights) -> float
+    batch (callable): Same over NumPy arrays, weights stay a tuple (optional)
+
+    Returns:
+    RankingPolicy: The registered policy
+    """
+    if batch is None:
+        scalar_score = scalar
+
+        def batch(urgency, importance, mood, weights):
+            return np.array([scalar_score(u, i, m, weights) for u, i, m in
+                             zip(urgency.tolist(), importance.tolist(), mood.tolist())], dtype=np.float64)
+    policy = _ranking_policies[name] = RankingPolicy(name, scalar, batch)
+    return policy
+
+
+def get_urgency_policy(policy=None):
+    """
+    Look up an urgency policy
+
+    Parameters:
+    policy (str or UrgencyPolicy): Name, policy object or None for the default
+
+    Returns:
+    UrgencyPolicy: The policy
+    """
+    if isinstance(policy, UrgencyPolicy):
+        return policy
+    name = DEFAULT_URGENCY if policy is None else policy
+    if name not in _urgency_policies:
+        raise ValueError(f"Unknown urgency policy {name!r} (registered: {', '.join(_urgency_policies)})")
+    return _urgency_policies[name]
+
+
+def get_ranking_policy(policy=None):
+    """
+    Look up a ranking policy
+
+    Parameters:
+    policy (str or RankingPolicy): Name, policy object or None for the default
+
+    Returns:
+    RankingPolicy: The policy
+    """
+    if isinstance(policy, RankingPolicy):
+        return policy
+    name = DEFAULT_RANKING if policy is None else policy
+    if name not in _ranking_policies:
+        raise ValueError(f"Unknown ranking policy {name!r} (registered: {', '.join(_ranking_policies)})")
+    return _ranking_policies[name]
+
+
+def urgency_policies():
+    """
+    Get the names of the registered urgency policies
+    """
+    return list(_urgency_policies)
+
+
+def ranking_policies():
+    """
+    Get the names of the registered ranking policies
+    """
+    return list(_ranking_policies)
+
+
+def evaluate_batch(duration_left, time_to_deadline, importance, mood, weights,
+                   urgency_policy=None, ranking_policy=None):
+    """
+    Compute urgency and weighted score of a batch of tasks in one vectorized call
+
+    Parameters:
+    duration_left (array): Remaining work per task
+    time_to_deadline (array): Working hours left before each deadline
+    importance (array): Importance per task
+    mood (array): Mood per task
+    weights (tuple): (urgency_weight, importance_weight, mood_weight)
+    urgency_policy (str or UrgencyPolicy): Urgency policy (default: deadline_pressure)
+    ranking_policy (str or RankingPolicy): Ranking policy (default: weighted)
+
+    Returns:
+    tuple: (urgency array, weighted score array)
+    """
+    if np is None:
+        raise ImportError("Batch scoring requires NumPy (pip install numpy)")
+    duration_left = np.asarray(duration_left, dtype=np.float64)
+    time_to_deadline = np.asarray(time_to_deadline, dtype=np.float64)
+    urgency = get_urgency_policy(urgency_policy).batch(duration_left, time_to_deadline)
+    score = get_ranking_policy(ranking_policy).batch(urgency, np.asarray(importance, dtype=np.float64),
+                                                     np.asarray(mood, dtype=np.float64), weights)
+    return urgency, score
+
+
+def _elementwise(scalar):
+    def batch(duration_left, time_to_deadline):
+        return np.array([scalar(left, hours) for left, hours in
+                         zip(duration_left.tolist(), time_to_deadline.tolist())], dtype=np.float64)
+    return batch
+
+
+def _batch_guards(duration_left, time_to_deadline, urgency):
+    # 100 when the deadline has no working time left, 0 once the task is done
+    urgency = np.where(duration_left <= 0, 0.0, urgency)
+    return np.where(time_to_deadline <= 0, 100.0, urgency)
+
+
+def deadline_pressure(duration_left, time_to_deadline):
+    if time_to_deadline <= 0:
+        return 100  # Past deadline
+    if duration_left <= 0:
+        return 0    # Task completed
+    # New urgency formula: 100 * (duration_left / (time_to_deadline + duration_left)) * (1 + 1/duration_left)
+    return 100 * (duration_left / (time_to_deadline + duration_left)) * (1 + 1/duration_left)
+
+
+def deadline_pressure_batch(duration_left, time_to_deadline):
+    safe_left = np.where(duration_left > 0, duration_left, 1)
+    urgency = 100 * (safe_left / (time_to_deadline + safe_left)) * (1 + 1 / safe_left)
+    return _batch_guards(duration_left, time_to_deadline, urgency)
+
+
+def remaining_ratio(duration_left, time_to_deadline):
+    if time_to_deadline <= 0:
+        return 100  # Past deadline
+    if duration_left <= 0:
+        return 0    # Task completed
+    # Remaining work time / remaining available time
+    return 100 * (duration_left / time_to_deadline)
+
+
+def remaining_ratio_batch(duration_left, time_to_deadline):
+    safe_hours = np.where(time_to_deadline > 0, time_to_deadline, 1)
+    return _batch_guards(duration_left, time_to_deadline, 100 * (duration_left / safe_hours))
+
+
+def weighted(urgency, importance, mood, weights):
+    urgency_weight, importance_weight, mood_weight = weights
+    return urgency_weight * urgency/10 + importance_weight * importance + mood_weight * mood
+
+
+def weighted_raw(urgency, importance, mood, weights):
+    urgency_weight, importance_weight, mood_weight = weights
+    return urgency_weight * urgency + importance_weight * importance + mood_weight * mood
+
+
+register_urgency('deadline_pressure', deadline_pressure, deadline_pressure_batch)
+register_urgency('remaining_ratio', remaining_ratio, remaining_ratio_batch)
+# The formulas are plain arithmetic, so they work on arrays unchanged
+register_ranking('weighted', weighted, weighted)
+register_ranking('weighted_raw', weighted_raw, weighted_raw)
@@ -0,0 +1,155 @@
+"""
+Record and replay of interactive scheduler sessions
+
+An interactive run_simulation depends on three kinds of external input: the
+user's answers to the prompts, the moods captured by update_mood_values and
+the LLM explanations. While recording, every one of them is appended to a
+session log in the order it was consumed, after a header with the state the
+session started from. Replaying feeds the same inputs back, so a session is
+re-run deterministically at full speed without a terminal, audio devices or
+network access.
+
+Log format (JSON lines, flushed after every event):
+    header  {"version": 1, "start_date": ..., "current_date": ..., "work_end_hour": ...,
+             "weights": [...], "use_task_table": ..., "plan_horizon_days": ...,
+             "urgency_policy": ..., "ranking_policy": ...,
+             "busy_slots": [[day ordinal, hour], ...],
+             "tasks": [[raw fields, deadline, completed work, mood], ...]}
+    events  ["input", line]
+            ["mood", {task index: mood} of the changed tasks, {"error": message} if the
+                     capture failed, or null if no mood data was available]
+            ["explain", text, or {"error": message} if the explanation failed]
+"""
+import json
+from datetime import datetime
+
+from scheduling.task import Task
+
+
+VERSION = 1
+DATE_FORMAT = "%Y-%m-%d %H:%M"
+
+
+def encode_tasks(tasks):
+    """
+    Encode tasks for a session header
+
+    Parameters:
+    tasks (list): List of Task records
+
+    Returns:
+    list: [raw fields, deadline string, completed work, mood] per task
+    """
+    return [[task.fields, task.deadline.strftime(DATE_FORMAT), task.completed_work, task.mood]
+            for task in tasks]
+
+
+def decode_tasks(rows):
+    """
+    Rebuild the tasks of a session header
+
+    Parameters:
+    rows (list): Rows written by encode_tasks
+
+    Returns:
+    list: List of Task records (derived fields are recomputed by the scheduler)
+    """
+    tasks = []
+    for fields, deadline, completed_work, mood in rows:
+        task = Task(fields, datetime.strptime(deadline, DATE_FORMAT), completed_work)
+        # Mood can differ from the raw fields if it was merged into a task without one
+        task.mood = mood
+        tasks.append(task)
+    return tasks
+
+
+class SessionLog:
+    """
+    Session log file, open for recording or for replaying
+    """
+
+    def __init__(self, filename, header, replaying, file):
+        self.filename = filename
+        self.header = header
+        self.replaying = replaying
+        self.events = 0
+        self._file = file
+
+    @classmethod
+    def record(cls, filename, header):
+        """
+        Start recording a session
+
+        Parameters:
+        filename (str): Path of the log (overwritten)
+        header (dict): State the session starts from
+
+        Returns:
+        SessionLog: Log open for appending events
+        """
+        f = open(filename, 'w', encoding='utf-8')
+        f.write(json.dumps(dict(header, version=VERSION), ensure_ascii=False) + "\n")
+        f.flush()
+        return cls(filename, header, False, f)
+
+    @classmethod
+    def replay(cls, filename):
+        """
+        Open a recorded session for replay
+
+        Parameters:
+        filename (str): Path of the log
+
+        Returns:
+        SessionLog: Log positioned at its first event
+        """
+        f = open(filename, 'r', encoding='utf-8')
+        header = json.loads(f.readline())
+        if header.get('version') != VERSION:
+            f.close()
+            raise ValueError(f"Unsupported session log version {header.get('version')}")
+        return cls(filename, header, True, f)
+
+    def append(self, kind, value):
+        """
+        Record an external input
+
+        Parameters:
+        kind (str): 'input', 'mood' or 'explain'
+        value: JSON-serializable input value
+        """
+        self._file.write(json.dumps([kind, value], ensure_ascii=False, separators=(',', ':')) + "\n")
+        # Flushed right away, so a crashed session can still be replayed up to the crash
+        self._file.flush()
+        self.events += 1
+
+    def next_event(self, kind):
+        """
+        Get the next recorded input, which must be of the given kind
+
+        Parameters:
+        kind (str): Expected kind
+
+        Returns:
+        object: Recorded value
+
+        Raises:
+        EOFError: If the log has no more events (like input() at end of file)
+        ValueError: If the next event is of another kind (the replay went out of sync)
+        """
+        line = self._file.readline()
+        if not line:
+            raise EOFError(f"Session log {self.filename} ended after {self.events} events")
+        recorded_kind, value = json.loads(line)
+        self.events += 1
+        if recorded_kind != kind:
+            raise ValueError(f"Session log out of sync at event #{self.events}: "
+                             f"expected {kind}, got {recorded_kind}")
+        return value
+
+    def close(self):
+        """
+        Close the log file
+        """
+        if not self._file.closed:
+            self._file.close()
@@ -0,0 +1,62 @@
+"""
+Integer time axis of the scheduler
+
+The scheduler works in whole hours, so inside its hot loops a point in time is
+an integer hour slot counted from a term epoch (midnight of the start day):
+
+    slot = (day ordinal - epoch day) * 24 + hour
+    day  = slot // 24       (days since the epoch)
+    hour = slot % 24
+
+Deadlines, available hours and expiry are computed on these integers, and so
+are the task table's columns, the overtime solver's probes (through the
+scheduler's available hours) and the busy calendar's availability query. The
+busy calendar and the deadline index store date ordinals, because a calendar
+outlives any one axis (it is shared with forks and written to state files);
+the scheduler converts between the two with epoch_day. The public API,
+snapshots and the GUI keep using datetimes, converted with to_slot/to_datetime
+at the edges. Slots count every hour of the day, not only
+working ones, so a slot stays valid when the working window changes: whether
+a slot is working time is a check on its hour. Minutes are dropped (deadlines
+fall on the hour, see scheduling.task_table). Slots before the epoch are
+negative and floor division keeps day and hour correct for them.
+"""
+from datetime import datetime, timedelta
+
+
+class SlotAxis:
+    """
+    Conversions between datetimes and integer hour slots
+    """
+
+    def __init__(self, epoch):
+        """
+        Parameters:
+        epoch (datetime or date): Any time on the day the axis starts at
+        """
+        self.epoch_day = epoch.toordinal()
+        self.epoch = datetime.fromordinal(self.epoch_day)
+
+    def to_slot(self, dt):
+        """
+        Get the slot of the hour containing dt
+        """
+        return (dt.toordinal() - self.epoch_day) * 24 + dt.hour
+
+    def to_day(self, dt):
+        """
+        Get the number of days from the epoch to dt's day
+        """
+        return dt.toordinal() - self.epoch_day
+
+    def to_datetime(self, slot):
+        """
+        Get the datetime at the start of a slot
+        """
+        return self.epoch + timedelta(hours=slot)
+
+    def ordinal(self, day):
+        """
+        Get the date ordinal of a day on the axis (see BusyCalendar.busy_between)
+        """
+        return self.epoch_day + day
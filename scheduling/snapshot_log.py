@@ -0,0 +1,221 @@
+"""
+Append-only change log of task snapshots
+
+Instead of one full JSON file per simulation step, each step appends one JSON
+line to a log: a full checkpoint every `checkpoint_every` steps and, in
+between, only the task fields that changed since the previous step. The byte
+offset of every checkpoint is also appended to a small `<log>.idx` file so a
+reader can jump to the nearest checkpoint and replay at most
+`checkpoint_every - 1` deltas to rebuild the state at any timestamp.
+
+Timestamps in a log only ever increase, which the reader's bisect relies on:
+a writer continues an existing log only if its first snapshot is later than
+the log's last one (e.g. the same scheduler running on), and otherwise
+replaces the log and its index (a new run into the same output directory).
+
+Record layout (one per line):
+    {"t": "20250101_0900", "kind": "checkpoint", "tasks": [...]}
+    {"t": "20250101_1100", "kind": "delta", "changes": {"3": {"completed_work": 4}}, "removed": {}}
+"""
+import bisect
+import json
+import os
+
+
+TIMESTAMP_FORMAT = "%Y%m%d_%H%M"
+
+
+def _timestamp(value):
+    # Accept datetimes as well as the "YYYYMMDD_HHMM" strings used in file names
+    return value if isinstance(value, str) else value.strftime(TIMESTAMP_FORMAT)
+
+
+def _last_timestamp(path):
+    """
+    Get the timestamp of the last record of a log (None if there is none or it is unreadable)
+    """
+    if not os.path.exists(path):
+        return None
+    with open(path, 'rb') as f:
+        position = f.seek(0, os.SEEK_END)
+        tail = b''
+        # Read backwards until the tail holds the whole last line
+        while position > 0:
+            step = min(4096, position)
+            position -= step
+            f.seek(position)
+            tail = f.read(step) + tail
+            if tail.rstrip(b'\n').count(b'\n'):
+                break
+    lines = tail.rstrip(b'\n').split(b'\n')
+    try:
+        return json.loads(lines[-1])['t'] if lines[-1] else None
+    except (ValueError, KeyError):
+        return None
+
+
+class SnapshotLogWriter:
+    """
+    Writes task snapshots as checkpoints plus per-step field deltas
+    """
+
+    def __init__(self, path, checkpoint_every=50):
+        """
+        Parameters:
+        path (str): Path of the log file (JSONL); it is opened at the first
+                    append, continued or replaced (see the module docstring)
+        checkpoint_every (int): Write a full checkpoint every N snapshots
+        """
+        self.path = path
+        self.index_path = path + ".idx"
+        self.checkpoint_every = max(1, checkpoint_every)
+        self._previous = None
+        self._since_checkpoint = 0
+        self._file = None
+        self._index_file = None
+
+    def append(self, timestamp, tasks, unchanged=()):
+        """
+        Append the state of all tasks at a timestamp
+
+        Parameters:
+        timestamp (datetime or str): Snapshot time
+        tasks (list): JSON-serializable task dictionaries
+        unchanged (iterable): Indices of tasks known to be unchanged since the
+                              previous append (e.g. archived tasks), not diffed
+
+        Returns:
+        str: Path of the log file
+        """
+        timestamp = _timestamp(timestamp)
+        if self._file is None:
+            self._open(timestamp)
+        if (self._previous is None or len(tasks) != len(self._previous) or
+                self._since_checkpoint >= self.checkpoint_every - 1):
+            record = {'t': timestamp, 'kind': 'checkpoint', 'tasks': tasks}
+            offset = self._file.tell()
+            self._write(record)
+            self._index_file.write(f"{timestamp} {offset}\n")
+            self._index_file.flush()
+            self._since_checkpoint = 0
+        else:
+            changes = {}
+            removed = {}
+            unchanged = set(unchanged)
+            for i, (old_task, new_task) in enumerate(zip(self._previous, tasks)):
+                if i in unchanged:
+                    continue
+                changed_fields = {key: value for key, value in new_task.items()
+                                  if key not in old_task or old_task[key] != value}
+                if changed_fields:
+                    changes[str(i)] = changed_fields
+                missing_fields = [key for key in old_task if key not in new_task]
+                if missing_fields:
+                    removed[str(i)] = missing_fields
+            record = {'t': timestamp, 'kind': 'delta', 'changes': changes}
+            if removed:
+                record['removed'] = removed
+            self._write(record)
+            self._since_checkpoint += 1
+
+        # Keep our own copy; callers may keep mutating their dicts
+        if record['kind'] == 'delta' and unchanged:
+            previous = self._previous
+            self._previous = [previous[i] if i in unchanged else dict(task) for i, task in enumerate(tasks)]
+        else:
+            self._previous = [dict(task) for task in tasks]
+        return self.path
+
+    def close(self):
+        """
+        Flush and close the log
+        """
+        if self._file is not None and not self._file.closed:
+            self._file.close()
+            self._index_file.close()
+
+    def _open(self, first_timestamp):
+        last_timestamp = _last_timestamp(self.path)
+        mode = 'a' if last_timestamp is not None and last_timestamp < first_timestamp else 'w'
+        self._file = open(self.path, mode)
+        self._index_file = open(self.index_path, mode)
+
+    def _write(self, record):
+        self._file.write(json.dumps(record, separators=(',', ':')) + "\n")
+        self._file.flush()
+
+
+class SnapshotLogReader:
+    """
+    Rebuilds task snapshots from a log written by SnapshotLogWriter
+    """
+
+    def __init__(self, path):
+        """
+        Parameters:
+        path (str): Path of the log file
+        """
+        self.path = path
+        self._checkpoint_times = []
+        self._checkpoint_offsets = []
+        index_path = path + ".idx"
+        if os.path.exists(index_path):
+            with open(index_path, 'r') as f:
+                for line in f:
+                    timestamp, offset = line.split()
+                    self._checkpoint_times.append(timestamp)
+                    self._checkpoint_offsets.append(int(offset))
+        else:
+            self._scan_checkpoints()
+
+    def timestamps(self):
+        """
+        Get all snapshot timestamps in the log
+
+        Returns:
+        list: Timestamps as "YYYYMMDD_HHMM" strings
+        """
+        with open(self.path, 'r') as f:
+            return [json.loads(line)['t'] for line in f if line.strip()]
+
+    def state_at(self, timestamp):
+        """
+        Rebuild the task list as of the latest snapshot at or before a timestamp
+
+        Parameters:
+        timestamp (datetime or str): Requested time
+
+        Returns:
+        list: Task dictionaries, or None if the log starts after the timestamp
+        """
+        timestamp = _timestamp(timestamp)
+        position = bisect.bisect_right(self._checkpoint_times, timestamp) - 1
+        if position < 0:
+            return None
+
+        with open(self.path, 'rb') as f:
+            f.seek(self._checkpoint_offsets[position])
+            tasks = None
+            for line in f:
+                record = json.loads(line)
+                if record['t'] > timestamp:
+                    break
+                if record['kind'] == 'checkpoint':
+                    tasks = record['tasks']
+                    continue
+                for i, changed_fields in record['changes'].items():
+                    tasks[int(i)].update(changed_fields)
+                for i, missing_fields in record.get('removed', {}).items():
+                    for key in missing_fields:
+                        tasks[int(i)].pop(key, None)
+        return tasks
+
+    def _scan_checkpoints(self):
+        # No index file: find the checkpoints with one pass over the log
+        with open(self.path, 'rb') as f:
+            offset = 0
+            for line in f:
+                if b'"kind":"checkpoint"' in line:
+                    self._checkpoint_times.append(json.loads(line)['t'])
+                    self._checkpoint_offsets.append(offset)
+                offset += len(line)
@@ -0,0 +1,121 @@
+"""
+Background writer so the scheduling loop never waits on disk
+
+Snapshot writes are queued and performed by a single writer thread. The queue
+is bounded (submit blocks when it is full, which applies back-pressure to a
+producer that outruns the disk), pending writes with the same key are
+coalesced so only the latest state is written, and every pending write is
+flushed before the interpreter exits.
+"""
+import atexit
+import threading
+from collections import OrderedDict
+
+
+class SnapshotWriter:
+    """
+    Single background thread draining a bounded, coalescing queue of writes
+    """
+
+    def __init__(self, max_pending=8):
+        """
+        Start the writer thread
+
+        Parameters:
+        max_pending (int): Maximum number of queued writes before submit blocks
+        """
+        self.max_pending = max(1, max_pending)
+        self._pending = OrderedDict()
+        self._condition = threading.Condition()
+        self._busy = False
+        self._closed = False
+        self._error = None
+        self._sequence = 0
+        self.coalesced = 0
+
+        self._thread = threading.Thread(target=self._run, name="snapshot-writer", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def submit(self, write, key=None):
+        """
+        Queue a write
+
+        Parameters:
+        write (callable): Function performing the write; runs on the writer thread
+        key (hashable): Writes with the same key replace each other while still
+                        queued (None: never coalesce, e.g. for append-only logs)
+        """
+        with self._condition:
+            self._raise_error()
+            if self._closed:
+                raise RuntimeError("SnapshotWriter is closed")
+
+            if key is not None and key in self._pending:
+                # Only the latest state for this target needs to reach the disk
+                self._pending[key] = write
+                self.coalesced += 1
+                return
+
+            while len(self._pending) >= self.max_pending:
+                self._condition.wait()
+                self._raise_error()
+
+            if key is None:
+                self._sequence += 1
+                key = ("__sequence__", self._sequence)
+            self._pending[key] = write
+            self._condition.notify_all()
+
+    def flush(self):
+        """
+        Block until every queued write has been performed
+        """
+        with self._condition:
+            while self._pending or self._busy:
+                self._condition.wait()
+            self._raise_error()
+
+    def close(self):
+        """
+        Flush pending writes and stop the writer thread
+        """
+        with self._condition:
+            if self._closed:
+                return
+            self._closed = True
+            self._condition.notify_all()
+        self._thread.join()
+        atexit.unregister(self.close)
+        with self._condition:
+            self._raise_error()
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while not self._pending and not self._closed:
+                    self._condition.wait()
+                if not self._pending:
+                    # Closed and drained
+                    return
+                _, write = self._pending.popitem(last=False)
+                self._busy = True
+                # Room in the queue for a blocked producer
+                self._condition.notify_all()
+
+            try:
+                write()
+            except Exception as e:
+                with self._condition:
+                    if self._error is None:
+                        self._error = e
+            finally:
+                with self._condition:
+                    self._busy = False
+                    self._condition.notify_all()
+
+    def _raise_error(self):
+        # Surface a failed background write in the producer thread
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise error
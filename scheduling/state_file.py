@@ -0,0 +1,215 @@
+"""
+Compact binary state file for TaskScheduler
+
+Stores the task table and the scheduler state (current_date, start_date,
+work_end_hour, weights and run statistics) as fixed-size columns, so a large
+task set or a paused run is restored by memory-mapping the file and copying
+each column into an array: no JSON parsing of numbers and no DDL re-parsing.
+Only the raw input fields (names, modules, ...), the scoring policy names and
+the busy calendar are kept as one JSON blob, decoded in a single call.
+
+Layout (little-endian, every section 8-byte aligned):
+    header            see HEADER
+    deadline          int64[n]   minutes since 0001-01-01 00:00
+    duration          float64[n]
+    importance        float64[n]
+    mood              float64[n]
+    completed_work    float64[n]
+    time_to_deadline  float64[n] NaN if not computed yet
+    urgency           float64[n] NaN if not computed yet
+    duration_left     float64[n] NaN if not computed yet
+    weighted_score    float64[n] NaN if not computed yet
+    layout            int32[n]   index into the field layouts of the blob
+    int_flags         uint8[n]   bit i: VALUE_FIELDS[i] was an int (JSON output stays identical)
+    completion_task   int64[m]   task index of every finished task
+    completion_time   int64[m]   finish time in minutes
+    fields blob       UTF-8 JSON {"layouts": [[key, ...], ...], "values": [[value, ...], ...],
+                                  "urgency_policy": name, "ranking_policy": name,
+                                  "busy_slots": [[day ordinal, hour], ...]}
+
+Version 1 files have no policies or busy slots in the blob; they read as the
+default policies and an empty calendar.
+"""
+import json
+import math
+import mmap
+import struct
+import sys
+from array import array
+from datetime import datetime, timedelta
+
+from scheduling.task import Task
+
+
+MAGIC = b'TSST'
+VERSION = 2
+
+# magic, version, task count, completion count, start, current (minutes),
+# work_end_hour, urgency/importance/mood weights, overtime hours, blob size
+HEADER = struct.Struct('<4sIqqqqqddddq')
+
+FLOAT_FIELDS = ('duration', 'importance', 'mood')
+VALUE_FIELDS = ('completed_work', 'time_to_deadline', 'urgency', 'duration_left', 'weighted_score')
+
+_MINUTES_PER_DAY = 24 * 60
+_BIG_ENDIAN = sys.byteorder == 'big'
+
+
+def _to_minutes(dt):
+    return dt.toordinal() * _MINUTES_PER_DAY + dt.hour * 60 + dt.minute
+
+
+def _from_minutes(minutes):
+    days, minutes = divmod(minutes, _MINUTES_PER_DAY)
+    return datetime.fromordinal(days) + timedelta(minutes=minutes)
+
+
+def _pad(size):
+    return -size % 8
+
+
+def _column_bytes(typecode, values):
+    column = array(typecode, values)
+    if _BIG_ENDIAN:
+        column.byteswap()
+    data = column.tobytes()
+    return data + b'\0' * _pad(len(data))
+
+
+def _read_column(view, offset, typecode, count):
+    column = array(typecode)
+    size = column.itemsize * count
+    column.frombytes(view[offset:offset + size])
+    if _BIG_ENDIAN:
+        column.byteswap()
+    return column, offset + size + _pad(size)
+
+
+def write_state_file(filename, tasks, start_date, current_date, work_end_hour, weights,
+                     overtime_hours=0, completion_times=None, urgency_policy=None,
+                     ranking_policy=None, busy_slots=()):
+    """
+    Write scheduler state to a binary state file
+
+    Parameters:
+    filename (str): Output path
+    tasks (list): List of Task records
+    start_date (datetime): Scheduler start date
+    current_date (datetime): Current simulation time
+    work_end_hour (int): Current work end hour
+    weights (tuple): (urgency_weight, importance_weight, mood_weight)
+    overtime_hours (float): Overtime worked so far
+    completion_times (dict): Task index -> finish datetime
+    urgency_policy (str): Urgency policy name (None for the default)
+    ranking_policy (str): Ranking policy name (None for the default)
+    busy_slots (list): Busy (day ordinal, hour) slots, see BusyCalendar.slots
+    """
+    completion_times = completion_times or {}
+    nan = math.nan
+
+    layouts = {}
+    layout_ids = []
+    values = []
+    int_flags = []
+    derived = {name: [] for name in VALUE_FIELDS}
+    for task in tasks:
+        keys, task_values = task.raw_fields()
+        layout_ids.append(layouts.setdefault(keys, len(layouts)))
+        values.append(task_values)
+        flags = 0
+        for bit, name in enumerate(VALUE_FIELDS):
+            value = task.get(name)
+            if isinstance(value, int):
+                flags |= 1 << bit
+            derived[name].append(nan if value is None else value)
+        int_flags.append(flags)
+
+    blob = json.dumps({'layouts': list(layouts), 'values': values,
+                       'urgency_policy': urgency_policy, 'ranking_policy': ranking_policy,
+                       'busy_slots': [list(slot) for slot in busy_slots]},
+                      separators=(',', ':')).encode('utf-8')
+    header = HEADER.pack(MAGIC, VERSION, len(tasks), len(completion_times),
+                         _to_minutes(start_date), _to_minutes(current_date), work_end_hour,
+                         weights[0], weights[1], weights[2], overtime_hours, len(blob))
+
+    with open(filename, 'wb') as f:
+        f.write(header + b'\0' * _pad(len(header)))
+        f.write(_column_bytes('q', [_to_minutes(task.deadline) for task in tasks]))
+        for name in FLOAT_FIELDS:
+            f.write(_column_bytes('d', [getattr(task, name) for task in tasks]))
+        for name in VALUE_FIELDS:
+            f.write(_column_bytes('d', derived[name]))
+        f.write(_column_bytes('i', layout_ids))
+        f.write(_column_bytes('B', int_flags))
+        f.write(_column_bytes('q', list(completion_times)))
+        f.write(_column_bytes('q', [_to_minutes(dt) for dt in completion_times.values()]))
+        f.write(blob)
+
+
+def read_state_file(filename):
+    """
+    Read a binary state file
+
+    Parameters:
+    filename (str): Path written by write_state_file
+
+    Returns:
+    dict: 'tasks' (Task records), 'start_date', 'current_date', 'work_end_hour',
+          'weights', 'overtime_hours', 'completion_times', 'urgency_policy',
+          'ranking_policy' and 'busy_slots'
+    """
+    with open(filename, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        view = memoryview(mapped)
+        try:
+            (magic, version, count, completion_count, start_minutes, current_minutes, work_end_hour,
+             urgency_weight, importance_weight, mood_weight, overtime_hours,
+             blob_size) = HEADER.unpack_from(view, 0)
+            if magic != MAGIC:
+                raise ValueError(f"{filename} is not a scheduler state file")
+            if version not in (1, VERSION):
+                raise ValueError(f"Unsupported state file version {version}")
+
+            offset = HEADER.size + _pad(HEADER.size)
+            deadlines, offset = _read_column(view, offset, 'q', count)
+            columns = {}
+            for name in FLOAT_FIELDS + VALUE_FIELDS:
+                columns[name], offset = _read_column(view, offset, 'd', count)
+            layout_ids, offset = _read_column(view, offset, 'i', count)
+            int_flags, offset = _read_column(view, offset, 'B', count)
+            completion_tasks, offset = _read_column(view, offset, 'q', completion_count)
+            completion_minutes, offset = _read_column(view, offset, 'q', completion_count)
+            blob = json.loads(bytes(view[offset:offset + blob_size]))
+        finally:
+            view.release()
+
+    layouts = [tuple(keys) for keys in blob['layouts']]
+    # Deadlines repeat a lot; convert each distinct value once
+    deadline_cache = {}
+    tasks = []
+    restore = Task.restore
+    for values, minutes, layout_id, flags, duration, importance, mood, *derived in zip(
+            blob['values'], deadlines, layout_ids, int_flags,
+            *(columns[name] for name in FLOAT_FIELDS + VALUE_FIELDS)):
+        deadline = deadline_cache.get(minutes)
+        if deadline is None:
+            deadline = deadline_cache[minutes] = _from_minutes(minutes)
+        if flags:
+            derived = [int(value) if flags & (1 << bit) and value == value else value
+                       for bit, value in enumerate(derived)]
+        # NaN (value != value): not computed yet
+        tasks.append(restore(layouts[layout_id], values, deadline, duration, importance, mood,
+                             *[value if value == value else None for value in derived]))
+
+    return {
+        'tasks': tasks,
+        'start_date': _from_minutes(start_minutes),
+        'current_date': _from_minutes(current_minutes),
+        'work_end_hour': work_end_hour,
+        'weights': (urgency_weight, importance_weight, mood_weight),
+        'overtime_hours': overtime_hours,
+        'completion_times': {task_index: _from_minutes(minutes)
+                             for task_index, minutes in zip(completion_tasks, completion_minutes)},
+        'urgency_policy': blob.get('urgency_policy'),
+        'ranking_policy': blob.get('ranking_policy'),
+        'busy_slots': [tuple(slot) for slot in blob.get('busy_slots', ())]
+    }
@@ -0,0 +1,257 @@
+"""
+Compact task record used by TaskScheduler
+
+Numeric fields are parsed once at load time and kept in slots, so hot loops can
+read `task.duration`, `task.importance` or `task.mood` without calling float()
+on the JSON strings again. The raw input fields are stored as a tuple of values
+plus a key layout shared by every task with the same input keys, which is much
+smaller than a dict per task. Item access (`task['duration']`, `task.get(...)`)
+still returns the values exactly as they appeared in the input, so existing
+dict-based code (merge_mood_json, snapshots, the GUI files) keeps working and
+`to_dict` reproduces the JSON layout of the snapshots.
+"""
+from datetime import datetime
+
+
+_MISSING = object()
+
+# Input fields that also have a parsed float in a slot
+NUMERIC_FIELDS = ('duration', 'importance', 'mood')
+
+# Fields set by the scheduler, in the order they appear in snapshots
+STATE_FIELDS = ('deadline', 'completed_work')
+DERIVED_FIELDS = ('time_to_deadline', 'urgency', 'duration_left', 'weighted_score')
+
+DEFAULT_IMPORTANCE = 5
+DEFAULT_MOOD = 5
+
+
+class _FieldLayout:
+    """
+    Ordered input field names and their positions, shared between tasks
+    """
+
+    __slots__ = ('keys', 'positions')
+
+    def __init__(self, keys):
+        self.keys = keys
+        self.positions = {key: i for i, key in enumerate(keys)}
+
+
+_layouts = {}
+
+
+def _layout_for(keys):
+    keys = tuple(keys)
+    layout = _layouts.get(keys)
+    if layout is None:
+        layout = _layouts[keys] = _FieldLayout(keys)
+    return layout
+
+
+class Task:
+    """
+    One task: raw input fields plus parsed numbers and scheduler state in slots
+    """
+
+    __slots__ = ('_layout', '_values', 'deadline', 'duration', 'importance', 'mood', 'completed_work',
+                 'time_to_deadline', 'urgency', 'duration_left', 'weighted_score')
+
+    def __init__(self, fields, deadline, completed_work=0):
+        """
+        Parameters:
+        fields (dict): Raw input fields
+        deadline (datetime): Parsed deadline
+        completed_work (float): Work already done on the task
+        """
+        self._layout = _layout_for(fields)
+        self._values = tuple(fields.values())
+        self.deadline = deadline
+        self.completed_work = completed_work
+        self.duration = float(fields['duration'])
+        self.importance = float(fields.get('importance', DEFAULT_IMPORTANCE))
+        self.mood = float(fields.get('mood', DEFAULT_MOOD))
+        self.time_to_deadline = _MISSING
+        self.urgency = _MISSING
+        self.duration_left = _MISSING
+        self.weighted_score = _MISSING
+
+    @classmethod
+    def from_record(cls, record, year, deadline_hour):
+        """
+        Create a task from an input record with a 'M/D' DDL string
+
+        Parameters:
+        record (dict): Input task dictionary
+        year (int): Year of the deadline
+        deadline_hour (int): Hour at which deadlines fall
+
+        Returns:
+        Task: Parsed task
+        """
+        fields = dict(record)
+        deadline = fields.pop('deadline', None)
+        completed_work = fields.pop('completed_work', 0)
+        # Derived fields are recomputed by the scheduler
+        for key in DERIVED_FIELDS:
+            fields.pop(key, None)
+        if not isinstance(deadline, datetime):
+            month, day = map(int, fields['DDL'].split('/'))
+            deadline = datetime(year, month, day, deadline_hour, 0)
+        return cls(fields, deadline, completed_work)
+
+    @classmethod
+    def restore(cls, keys, values, deadline, duration, importance, mood, completed_work,
+                time_to_deadline=None, urgency=None, duration_left=None, weighted_score=None):
+        """
+        Rebuild a task from stored state without parsing any field
+
+        Parameters:
+        keys (tuple): Raw input field names
+        values (tuple): Raw input field values, in the order of keys
+        deadline (datetime): Parsed deadline
+        duration (float): Parsed duration
+        importance (float): Parsed importance
+        mood (float): Parsed mood
+        completed_work (float): Work already done on the task
+        time_to_deadline, urgency, duration_left, weighted_score: Derived fields
+            (None if the scheduler has not computed them yet)
+
+        Returns:
+        Task: Restored task
+        """
+        task = cls.__new__(cls)
+        task._layout = _layout_for(keys)
+        task._values = tuple(values)
+        task.deadline = deadline
+        task.duration = duration
+        task.importance = importance
+        task.mood = mood
+        task.completed_work = completed_work
+        task.time_to_deadline = _MISSING if time_to_deadline is None else time_to_deadline
+        task.urgency = _MISSING if urgency is None else urgency
+        task.duration_left = _MISSING if duration_left is None else duration_left
+        task.weighted_score = _MISSING if weighted_score is None else weighted_score
+        return task
+
+    def raw_fields(self):
+        """
+        Get the raw input fields as (keys, values) tuples, without building a dict
+        """
+        return self._layout.keys, self._values
+
+    @property
+    def scored(self):
+        """
+        True once the scheduler has set a weighted score
+        """
+        return self.weighted_score is not _MISSING
+
+    @property
+    def fields(self):
+        """
+        Get the raw input fields as a new dict
+        """
+        return dict(zip(self._layout.keys, self._values))
+
+    def __reduce__(self):
+        # Pickle through restore, so derived fields that were never set stay unset
+        return (Task.restore, (self._layout.keys, self._values, self.deadline, self.duration, self.importance,
+                               self.mood, self.completed_work) + tuple(self.get(key) for key in DERIVED_FIELDS))
+
+    def clone(self):
+        """
+        Copy the task; the field layout and values are immutable and shared
+        """
+        task = Task.__new__(Task)
+        for name in Task.__slots__:
+            setattr(task, name, getattr(self, name))
+        return task
+
+    def __getitem__(self, key):
+        position = self._layout.positions.get(key)
+        if position is not None:
+            return self._values[position]
+        if key == 'mood':
+            # Default mood that was not in the input
+            return _plain_number(self.mood)
+        if key in STATE_FIELDS or key in DERIVED_FIELDS:
+            value = getattr(self, key)
+            if value is not _MISSING:
+                return value
+        raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        if key in NUMERIC_FIELDS:
+            setattr(self, key, float(value))
+            if key != 'mood' or key in self._layout.positions:
+                self._set_field(key, value)
+        elif key in STATE_FIELDS or key in DERIVED_FIELDS:
+            setattr(self, key, value)
+        else:
+            self._set_field(key, value)
+
+    def _set_field(self, key, value):
+        position = self._layout.positions.get(key)
+        if position is None:
+            self._layout = _layout_for(self._layout.keys + (key,))
+            self._values = self._values + (value,)
+        else:
+            values = list(self._values)
+            values[position] = value
+            self._values = tuple(values)
+
+    def __contains__(self, key):
+        try:
+            self[key]
+        except KeyError:
+            return False
+        return True
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def keys(self):
+        """
+        Get the field names in snapshot order
+        """
+        keys = list(self._layout.keys)
+        keys.extend(STATE_FIELDS)
+        if 'mood' not in self._layout.positions:
+            keys.append('mood')
+        keys.extend(key for key in DERIVED_FIELDS if getattr(self, key) is not _MISSING)
+        return keys
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def __len__(self):
+        return len(self.keys())
+
+    def items(self):
+        return [(key, self[key]) for key in self.keys()]
+
+    def copy(self):
+        """
+        Get a plain dict of the task, as the scheduler used to store it
+        """
+        return dict(self.items())
+
+    def to_dict(self):
+        """
+        Serialize the task in the snapshot JSON layout (deadline as a string)
+        """
+        task_dict = self.copy()
+        task_dict['deadline'] = self.deadline.strftime("%Y-%m-%d %H:%M")
+        return task_dict
+
+    def __repr__(self):
+        return f"Task({self.copy()!r})"
+
+
+def _plain_number(value):
+    # 5.0 -> 5, so default values serialize like the integers they replaced
+    return int(value) if float(value).is_integer() else value
@@ -0,0 +1,158 @@
+"""
+Streaming reader for large task files
+
+Reads a JSON array of task objects or a JSONL file (one object per line) in
+fixed-size chunks and yields one record at a time, so memory use is bounded by
+the largest record instead of the whole document, and the first records can be
+used while the rest of the file is still being read.
+
+A record is only read further while it could still be valid: a syntax error
+before the end of the buffered input fails at once, and a record longer than
+max_record_size characters fails instead of buffering the rest of the file.
+Errors are ValueErrors that give the character offset in the file.
+"""
+import json
+import re
+
+from scheduling.task import Task
+
+
+CHUNK_SIZE = 1 << 16
+# Largest record (in characters) that is buffered before giving up
+MAX_RECORD_SIZE = 1 << 24
+
+_WHITESPACE = re.compile(r'[ \t\n\r]*')
+# A decode error this close to the end of the buffer may only mean the record
+# goes on in the next chunk (e.g. "tru", "-Infinit", a cut \uXXXX escape)
+_LOOKAHEAD = 16
+
+
+def iter_json_records(filename, chunk_size=CHUNK_SIZE, max_record_size=MAX_RECORD_SIZE):
+    """
+    Iterate over the records of a JSON array or JSONL file
+
+    Parameters:
+    filename (str): Path to the file
+    chunk_size (int): Number of characters read at a time
+    max_record_size (int): Longest record, in characters, that is read
+
+    Yields:
+    object: Decoded records in file order
+
+    Raises:
+    ValueError: If the file is not a valid JSON array or JSONL document, or a
+                record is longer than max_record_size (with the character offset)
+    """
+    decoder = json.JSONDecoder()
+    with open(filename, 'r', encoding='utf-8-sig') as f:
+        buffer = ''
+        pos = 0
+        # Character offset of buffer[0] in the file
+        offset = 0
+        eof = False
+
+        def error(message, position):
+            return ValueError(f"{message} at character {offset + position} of {filename}")
+
+        def skip_whitespace():
+            # Returns the position of the next non-whitespace character, reading as needed
+            nonlocal buffer, pos, offset, eof
+            while True:
+                pos = _WHITESPACE.match(buffer, pos).end()
+                if pos < len(buffer) or eof:
+                    return pos
+                offset += len(buffer)
+                buffer, pos = '', 0
+                chunk = f.read(chunk_size)
+                eof = not chunk
+                buffer = chunk
+
+        skip_whitespace()
+        is_array = pos < len(buffer) and buffer[pos] == '['
+        if is_array:
+            pos += 1
+        need_separator = False
+
+        while True:
+            skip_whitespace()
+            if pos >= len(buffer):
+                if is_array:
+                    raise error("Unterminated array", pos)
+                return
+
+            if is_array:
+                if buffer[pos] == ']':
+                    pos += 1
+                    if skip_whitespace() < len(buffer):
+                        raise error("Extra data", pos)
+                    return
+                if need_separator:
+                    if buffer[pos] != ',':
+                        raise error("Expecting ',' delimiter", pos)
+                    pos += 1
+                    skip_whitespace()
+
+            while True:
+                try:
+                    record, end = decoder.raw_decode(buffer, pos)
+                    # A number (or literal) ending at the end of the buffer may go on in the next chunk
+                    if end < len(buffer) or eof:
+                        break
+                except json.JSONDecodeError as e:
+                    if eof or (e.pos < len(buffer) - _LOOKAHEAD and not e.msg.startswith('Unterminated')):
+                        raise error(e.msg, e.pos) from None
+                if len(buffer) - pos > max_record_size:
+                    raise error(f"Record longer than {max_record_size} characters", pos)
+                # Record continues past the buffer: read more (at least doubling
+                # what is buffered, so very large records stay linear)
+                offset += pos
+                buffer = buffer[pos:]
+                pos = 0
+                chunk = f.read(max(chunk_size, len(buffer)))
+                eof = not chunk
+                buffer += chunk
+
+            pos = end
+            need_separator = True
+            yield record
+
+            if pos >= chunk_size:
+                # Drop consumed input
+                offset += pos
+                buffer = buffer[pos:]
+                pos = 0
+
+
+def iter_tasks(filename, year, deadline_hour, skip_invalid=False, chunk_size=CHUNK_SIZE):
+    """
+    Stream a task file and convert every record into a Task
+
+    Parameters:
+    filename (str): JSON array or JSONL file of task dictionaries
+    year (int): Year of the deadlines
+    deadline_hour (int): Hour at which deadlines fall
+    skip_invalid (bool): Skip invalid records instead of raising
+    chunk_size (int): Number of characters read at a time
+
+    Yields:
+    Task: Parsed task with completed work reset to 0
+
+    Raises:
+    ValueError: If a record is not a valid task and skip_invalid is False
+    """
+    for position, record in enumerate(iter_json_records(filename, chunk_size)):
+        try:
+            task = _record_to_task(record, year, deadline_hour)
+        except (ValueError, KeyError, TypeError, AttributeError) as e:
+            if skip_invalid:
+                continue
+            raise ValueError(f"Invalid task record #{position + 1} in {filename}: {e!r}") from e
+        yield task
+
+
+def _record_to_task(record, year, deadline_hour):
+    if not isinstance(record, dict):
+        raise TypeError(f"expected an object, got {type(record).__name__}")
+    task = Task.from_record(record, year, deadline_hour)
+    task.completed_work = 0
+    return task
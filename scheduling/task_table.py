@@ -0,0 +1,175 @@
+try:
+    import numpy as np
+except ImportError:  # NumPy is only needed for the columnar backend
+    np = None
+
+from scheduling.scoring import get_ranking_policy, get_urgency_policy
+
+
+class TaskTable:
+    """
+    Columnar NumPy view of the scheduler's tasks
+
+    Holds one array per numeric field so urgency, time_to_deadline and the
+    weighted score of every task can be recomputed in a single vectorized pass.
+    Deadlines are kept on the scheduler's integer time axis (see
+    scheduling.slots), and the available hours come from the scheduler itself,
+    once per distinct deadline day. The task dictionaries stay the public
+    view: `export` writes the computed fields back for snapshots, status
+    output and the GUI.
+    """
+
+    def __init__(self, tasks, time_axis, urgency_policy=None, ranking_policy=None):
+        """
+        Build the table from a task list
+
+        Parameters:
+        tasks (list): List of task dictionaries with parsed 'deadline'
+        time_axis (SlotAxis): Time axis of the scheduler
+        urgency_policy (str or UrgencyPolicy): Urgency policy (see scheduling.scoring)
+        ranking_policy (str or RankingPolicy): Ranking policy (see scheduling.scoring)
+        """
+        if np is None:
+            raise ImportError("The columnar task table requires NumPy (pip install numpy)")
+
+        self.urgency_policy = get_urgency_policy(urgency_policy)
+        self.ranking_policy = get_ranking_policy(ranking_policy)
+
+        self.size = len(tasks)
+        self.duration = np.array([float(task['duration']) for task in tasks], dtype=np.float64)
+        self.completed_work = np.array([task.get('completed_work', 0) for task in tasks], dtype=np.float64)
+        # Deadlines fall on the hour, so "now < deadline" is "now slot < deadline slot"
+        self.deadline_slot = np.array([time_axis.to_slot(task['deadline']) for task in tasks], dtype=np.int64)
+        self.deadline_day = self.deadline_slot // 24
+        self.importance = np.array([float(task.get('importance', 5)) for task in tasks], dtype=np.float64)
+        self.mood = np.array([float(task.get('mood', 5)) for task in tasks], dtype=np.float64)
+
+        # Derived fields already present (e.g. tasks restored from a state file) are kept
+        self.time_to_deadline = np.array([task.get('time_to_deadline', 0) for task in tasks], dtype=np.int64)
+        self.duration_left = np.array([task.get('duration_left', 0) for task in tasks], dtype=np.float64)
+        self.urgency = np.array([task.get('urgency', 0) for task in tasks], dtype=np.float64)
+        self.weighted_score = np.array([task.get('weighted_score', 0) for task in tasks], dtype=np.float64)
+        # Rows that have been recalculated at least once (and so have derived fields)
+        self.computed = np.array(['urgency' in task for task in tasks], dtype=bool)
+
+    def reload_moods(self, tasks):
+        """
+        Reload the mood column, e.g. after merge_mood_json updated the task dicts
+
+        Parameters:
+        tasks (list): List of task dictionaries
+        """
+        self.mood = np.array([float(task.get('mood', 5)) for task in tasks], dtype=np.float64)
+
+    def recalculate(self, now, hours_until, weights):
+        """
+        Recalculate time_to_deadline, urgency and weighted score of every task
+        whose deadline is after now and which has work left (completed rows
+        keep the values they had when they were finished)
+
+        Parameters:
+        now (int): Current hour slot
+        hours_until (callable): hours_until(deadline day) -> available working hours
+                                from now until that day's deadline (the scheduler's
+                                memoized TaskScheduler._available_hours)
+        weights (tuple): (urgency_weight, importance_weight, mood_weight)
+        """
+        live = self.active_mask(now)
+        rows = np.flatnonzero(live)
+        # Available hours only depend on the deadline day: one call per distinct day
+        days, inverse = np.unique(self.deadline_day[rows], return_inverse=True)
+        hours = np.array([hours_until(day) for day in days.tolist()], dtype=np.int64)
+        time_to_deadline = hours[inverse]
+
+        duration_left = self.duration[rows] - self.completed_work[rows]
+        self.time_to_deadline[rows] = time_to_deadline
+        self.duration_left[rows] = duration_left
+        self.urgency[rows] = self.urgency_policy.batch(duration_left, time_to_deadline)
+        self.computed |= live
+        self.recalculate_scores(weights, live)
+
+    def recalculate_scores(self, weights, rows=None):
+        """
+        Recalculate the weighted score from urgency, importance and mood
+
+        Parameters:
+        weights (tuple): (urgency_weight, importance_weight, mood_weight)
+        rows (ndarray): Boolean mask of rows to update (default: all computed rows)
+        """
+        if rows is None:
+            rows = self.computed & (self.duration_left > 0)
+        score = self.ranking_policy.batch(self.urgency, self.importance, self.mood, weights)
+        self.weighted_score[rows] = score[rows]
+
+    def update_row(self, row, completed_work, time_to_deadline, urgency, weights):
+        """
+        Update one row after work was done on it
+
+        Parameters:
+        row (int): Task index
+        completed_work (float): New completed work
+        time_to_deadline (int): New available hours before the deadline
+        urgency (float): New urgency
+        weights (tuple): (urgency_weight, importance_weight, mood_weight)
+        """
+        self.completed_work[row] = completed_work
+        self.duration_left[row] = max(0, self.duration[row] - completed_work)
+        self.time_to_deadline[row] = time_to_deadline
+        self.urgency[row] = urgency
+        self.computed[row] = True
+        if self.duration_left[row] > 0:
+            self.weighted_score[row] = self.ranking_policy.scalar(urgency, self.importance[row],
+                                                                  self.mood[row], weights)
+
+    def active_mask(self, now):
+        """
+        Get the rows that are before their deadline (after hour slot now) and not completed
+        """
+        return (now < self.deadline_slot) & (self.duration - self.completed_work > 0)
+
+    def top_k(self, k, now):
+        """
+        Get the k active rows with the highest weighted score
+
+        Ties are broken by row order, like a stable descending sort.
+
+        Parameters:
+        k (int): Number of rows to return
+        now (int): Current hour slot
+
+        Returns:
+        list: Row indices, best first
+        """
+        rows = np.flatnonzero(self.active_mask(now) & self.computed)
+        if k <= 0 or not len(rows):
+            return []
+        scores = self.weighted_score[rows]
+        if len(rows) > k:
+            # Keep everything tied with the k-th best score, then sort only those
+            kth_score = np.partition(scores, len(scores) - k)[len(scores) - k]
+            keep = scores >= kth_score
+            rows, scores = rows[keep], scores[keep]
+        order = np.lexsort((rows, -scores))[:k]
+        return rows[order].tolist()
+
+    def export(self, tasks, rows=None):
+        """
+        Write the derived fields back into the task dictionaries
+
+        Parameters:
+        tasks (list): Task dictionaries the table was built from
+        rows (list): Row indices to export (default: every computed row)
+        """
+        if rows is None:
+            rows = np.flatnonzero(self.computed)
+        rows = np.asarray(rows, dtype=np.int64)
+        scored = (self.duration_left[rows] > 0).tolist()
+        for row, time_to_deadline, urgency, duration_left, weighted_score, has_score in zip(
+                rows.tolist(), self.time_to_deadline[rows].tolist(), self.urgency[rows].tolist(),
+                self.duration_left[rows].tolist(), self.weighted_score[rows].tolist(), scored):
+            task = tasks[row]
+            task['time_to_deadline'] = time_to_deadline
+            task['urgency'] = urgency
+            task['duration_left'] = duration_left
+            if has_score:
+                task['weighted_score'] = weighted_score
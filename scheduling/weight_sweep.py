@@ -0,0 +1,228 @@
+"""
+Monte Carlo sweep of urgency/importance/mood weights over headless scheduler runs
+
+Every weight triple is simulated several times with randomly perturbed moods and
+durations, spread over a process pool, and the outcomes (missed deadlines,
+overtime hours, completion times) are aggregated per triple.
+
+Usage (from the project root):
+    python -m scheduling.weight_sweep --input tj_simulator/input_extreme.json --grid-step 0.1 --samples 20
+"""
+import argparse
+import json
+import random
+from datetime import datetime
+
+from scheduling.pool import ENGINE_HELP, ENGINES, check_engine, run_engine, run_pool, worker_state
+from scorer import TaskScheduler
+
+
+def weight_grid(step=0.1):
+    """
+    Get every (urgency, importance, mood) weight triple on a grid that sums to 1
+
+    Parameters:
+    step (float): Grid spacing
+
+    Returns:
+    list: List of weight tuples
+    """
+    divisions = int(round(1 / step))
+    triples = []
+    for urgency in range(divisions + 1):
+        for importance in range(divisions + 1 - urgency):
+            mood = divisions - urgency - importance
+            triples.append((urgency / divisions, importance / divisions, mood / divisions))
+    return triples
+
+
+def random_weights(count, seed=0):
+    """
+    Draw weight triples uniformly from the simplex
+
+    Parameters:
+    count (int): Number of triples
+    seed (int): Random seed
+
+    Returns:
+    list: List of weight tuples
+    """
+    rng = random.Random(seed)
+    triples = []
+    for _ in range(count):
+        first, second = sorted((rng.random(), rng.random()))
+        triples.append((first, second - first, 1 - second))
+    return triples
+
+
+def perturb_tasks(tasks_data, rng, mood_sigma=1.0, duration_sigma=0.2):
+    """
+    Copy a task list with randomly perturbed moods and durations
+
+    Parameters:
+    tasks_data (list): List of raw task dictionaries
+    rng (random.Random): Random number generator
+    mood_sigma (float): Standard deviation of the additive mood noise (mood stays in 0-10)
+    duration_sigma (float): Standard deviation of the multiplicative (log-normal) duration noise
+
+    Returns:
+    list: Perturbed task dictionaries
+    """
+    perturbed = []
+    for task in tasks_data:
+        task_copy = dict(task)
+        if mood_sigma:
+            mood = float(task_copy.get('mood', 5)) + rng.gauss(0, mood_sigma)
+            task_copy['mood'] = round(min(10, max(0, mood)), 1)
+        if duration_sigma:
+            duration = float(task_copy['duration']) * rng.lognormvariate(0, duration_sigma)
+            # Keep durations on half hours, like the evaluated inputs
+            task_copy['duration'] = max(0.5, round(duration * 2) / 2)
+        perturbed.append(task_copy)
+    return perturbed
+
+
+def _run_job(job):
+    """
+    Run one perturbed scenario for one weight triple in a worker process
+    """
+    weights, seed = job
+    settings = worker_state['settings']
+    rng = random.Random(seed)
+    tasks_data = perturb_tasks(worker_state['tasks_data'], rng,
+                               settings['mood_sigma'], settings['duration_sigma'])
+
+    scheduler = TaskScheduler(
+        tasks_data=tasks_data,
+        start_date=settings['start_date'],
+        output_dir=None,
+        urgency_weight=weights[0],
+        importance_weight=weights[1],
+        mood_weight=weights[2]
+    )
+    run_engine(scheduler, settings['engine'])
+
+    summary = scheduler.get_run_summary()
+    summary['weights'] = weights
+    return summary
+
+
+def aggregate(summaries):
+    """
+    Aggregate run summaries per weight triple
+
+    Parameters:
+    summaries (list): Dictionaries returned by TaskScheduler.get_run_summary plus 'weights'
+
+    Returns:
+    list: One result per weight triple, best (fewest missed deadlines, then least overtime) first
+    """
+    by_weights = {}
+    for summary in summaries:
+        by_weights.setdefault(tuple(summary['weights']), []).append(summary)
+
+    results = []
+    for weights, runs in by_weights.items():
+        completion_hours = [run['mean_completion_hours'] for run in runs
+                            if run['mean_completion_hours'] is not None]
+        results.append({
+            'urgency_weight': weights[0],
+            'importance_weight': weights[1],
+            'mood_weight': weights[2],
+            'runs': len(runs),
+            'mean_missed_deadlines': sum(run['missed_deadlines'] for run in runs) / len(runs),
+            'max_missed_deadlines': max(run['missed_deadlines'] for run in runs),
+            'mean_overtime_hours': sum(run['overtime_hours'] for run in runs) / len(runs),
+            'max_overtime_hours': max(run['overtime_hours'] for run in runs),
+            'mean_completion_hours': (sum(completion_hours) / len(completion_hours)
+                                      if completion_hours else None)
+        })
+
+    results.sort(key=lambda result: (result['mean_missed_deadlines'], result['mean_overtime_hours']))
+    return results
+
+
+def run_sweep(tasks_data, weight_triples, samples=10, seed=0, workers=None,
+              start_date=None, engine='ticks', mood_sigma=1.0, duration_sigma=0.2):
+    """
+    Simulate every weight triple `samples` times over a process pool
+
+    Parameters:
+    tasks_data (list): List of raw task dictionaries
+    weight_triples (list): List of (urgency, importance, mood) weight tuples
+    samples (int): Perturbed scenarios per weight triple
+    seed (int): Base random seed; scenario i uses seed + i for every triple,
+                so all triples are compared on the same perturbations
+    workers (int): Number of worker processes (default: one per run, at most the CPU count)
+    start_date (datetime): Simulation start (default: 2025-01-01 09:00)
+    engine (str): 'ticks' for run_headless, 'events' for run_event_driven
+    mood_sigma (float): Mood noise, see perturb_tasks
+    duration_sigma (float): Duration noise, see perturb_tasks
+
+    Returns:
+    tuple: (aggregated results, run statistics)
+
+    Raises:
+    ValueError: If the engine is unknown
+    """
+    check_engine(engine)
+    settings = {
+        'start_date': start_date or datetime(2025, 1, 1, 9, 0),
+        'engine': engine,
+        'mood_sigma': mood_sigma,
+        'duration_sigma': duration_sigma
+    }
+    jobs = [(tuple(weights), seed + sample) for weights in weight_triples for sample in range(samples)]
+    # Few large chunks keep inter-process traffic low compared to the simulations
+    summaries, pool_stats = run_pool(_run_job, jobs, {'tasks_data': tasks_data, 'settings': settings},
+                                     workers=workers, chunks_per_worker=4)
+
+    stats = {
+        'runs': len(jobs),
+        **pool_stats,
+        'runs_per_second': len(jobs) / pool_stats['seconds'] if pool_stats['seconds'] else None
+    }
+    return aggregate(summaries), stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Parallel weight sweep over headless scheduler runs")
+    parser.add_argument('--input', default='tj_simulator/input_extreme.json', help="Task JSON file")
+    parser.add_argument('--grid-step', type=float, default=0.1, help="Weight grid spacing")
+    parser.add_argument('--random', type=int, default=0,
+                        help="Use this many random weight triples instead of a grid")
+    parser.add_argument('--samples', type=int, default=10, help="Perturbed scenarios per weight triple")
+    parser.add_argument('--seed', type=int, default=0, help="Base random seed")
+    parser.add_argument('--workers', type=int, default=None, help="Worker processes (default: CPU count, at most one per run)")
+    parser.add_argument('--engine', choices=ENGINES, default='ticks', help=ENGINE_HELP)
+    parser.add_argument('--mood-sigma', type=float, default=1.0, help="Mood noise")
+    parser.add_argument('--duration-sigma', type=float, default=0.2, help="Log-normal duration noise")
+    parser.add_argument('--output', default='weight_sweep_results.json', help="Results JSON file")
+    args = parser.parse_args()
+
+    with open(args.input, 'r') as f:
+        tasks_data = json.load(f)
+
+    if args.random:
+        weight_triples = random_weights(args.random, args.seed)
+    else:
+        weight_triples = weight_grid(args.grid_step)
+
+    results, stats = run_sweep(tasks_data, weight_triples, samples=args.samples, seed=args.seed,
+                               workers=args.workers, engine=args.engine,
+                               mood_sigma=args.mood_sigma, duration_sigma=args.duration_sigma)
+
+    with open(args.output, 'w') as f:
+        json.dump({'stats': stats, 'results': results}, f, indent=4)
+
+    print(f"{stats['runs']} runs on {stats['workers']} workers in {stats['seconds']:.2f}s "
+          f"({stats['runs_per_second']:.0f} runs/s)")
+    print("Best weight triples (urgency, importance, mood):")
+    for result in results[:5]:
+        print(f"  ({result['urgency_weight']:.2f}, {result['importance_weight']:.2f}, {result['mood_weight']:.2f}) "
+              f"missed={result['mean_missed_deadlines']:.2f} overtime={result['mean_overtime_hours']:.1f}h")
+    print(f"Results saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
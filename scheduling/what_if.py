@@ -0,0 +1,291 @@
+"""
+What-if branches of a scheduler run
+
+A what-if question ("what if I skip tomorrow?", "what if 3F8 takes 10 more
+hours?") is answered by forking the scheduler (TaskScheduler.fork, copy on
+write, so the scheduler asked is never modified), applying the scenario's
+changes to the fork and running it headless to the end. Several scenarios are
+run concurrently, and each outcome is compared with a baseline branch that
+continues without changes.
+
+Scenario format (one dict per branch, e.g. the entries of a JSON list):
+    {"name": "skip tomorrow and Friday",
+     "skip_days": [1, "2025-01-03"],
+     "busy": [{"start": "2025-01-02 10:00", "end": "2025-01-02 12:00"}],
+     "extra_hours": {"3F8": 10, "AI Agent Hackathon": -4},
+     "weights": [0.6, 0.2, 0.2]}
+    skip_days    whole days off: offsets from the current day or "YYYY-MM-DD" dates
+    busy         extra busy hours, in the JSON format of scheduling.calendar_index
+    extra_hours  hours added to task durations; a key is a task name, the first
+                 word of task names (module code, e.g. "3F8") or a task index
+    weights      (urgency, importance, mood) weights from now on
+Every key except name is optional.
+
+Branches run on a thread pool over forks of the scheduler, which share every
+task record they don't change. With processes=True they run on a process pool
+instead (see scheduling.pool): each worker restores the scheduler state once
+and forks it per scenario, which scales with the CPU cores.
+
+Usage (from the project root):
+    python -m scheduling.what_if --input tj_simulator/input_extreme.json --scenarios scenarios.json
+"""
+import argparse
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+from scheduling.calendar_index import BusyCalendar
+from scheduling.pool import (ENGINE_HELP, ENGINES, check_engine, pool_workers, run_engine, run_pool,
+                             worker_state)
+from scheduling.renderer import task_name
+from scorer import TaskScheduler
+
+
+BASELINE = 'baseline'
+
+
+def find_tasks(scheduler, key):
+    """
+    Find the tasks a scenario key refers to
+
+    Parameters:
+    scheduler (TaskScheduler): Scheduler with the tasks
+    key (str or int): Task name, first word of task names (module code) or task index
+
+    Returns:
+    list: Task indices
+
+    Raises:
+    ValueError: If no task matches
+    """
+    names = [task_name(task) for task in scheduler.tasks]
+    key_name = str(key)
+    matches = [i for i, name in enumerate(names) if name == key_name]
+    if not matches:
+        matches = [i for i, name in enumerate(names) if name.split(' ', 1)[0] == key_name]
+    if not matches and key_name.isdigit() and int(key_name) < len(names):
+        matches = [int(key_name)]
+    if not matches:
+        raise ValueError(f"No task matches {key!r}")
+    return matches
+
+
+def apply_scenario(scheduler, scenario):
+    """
+    Apply a scenario's changes to a scheduler (normally a fork)
+
+    Parameters:
+    scheduler (TaskScheduler): Scheduler to change
+    scenario (dict): Scenario, see the module docstring
+    """
+    for day in scenario.get('skip_days', ()):
+        if isinstance(day, int):
+            start = scheduler.current_date.replace(hour=0, minute=0, second=0, microsecond=0) + timedelta(days=day)
+        else:
+            start = datetime.strptime(day, "%Y-%m-%d")
+        # Up to midnight, so even overtime can't use the day
+        scheduler.add_busy_interval(start, start + timedelta(days=1))
+    if scenario.get('busy'):
+        scheduler.add_busy_entries(scenario['busy'])
+    for key, hours in scenario.get('extra_hours', {}).items():
+        for i in find_tasks(scheduler, key):
+            scheduler.set_task_duration(i, max(0, scheduler.tasks[i].duration + hours))
+    if scenario.get('weights'):
+        scheduler.urgency_weight, scheduler.importance_weight, scheduler.mood_weight = scenario['weights']
+
+
+def run_branch(scheduler, scenario, engine='ticks', max_steps=None):
+    """
+    Apply a scenario to a scheduler and run it to the end
+
+    Parameters:
+    scheduler (TaskScheduler): Fork to run (it is changed)
+    scenario (dict): Scenario, see the module docstring
+    engine (str): 'ticks' for run_headless, 'events' for run_event_driven
+    max_steps (int): Maximum number of work sessions or events (None for no limit)
+
+    Returns:
+    dict: TaskScheduler.get_run_summary plus 'scenario', 'missed_tasks' and 'seconds'
+    """
+    started = time.perf_counter()
+    apply_scenario(scheduler, scenario)
+    run_engine(scheduler, engine, max_steps)
+
+    outcome = scheduler.get_run_summary()
+    outcome['scenario'] = scenario.get('name', BASELINE)
+    outcome['missed_tasks'] = [task_name(task) for task in scheduler.tasks
+                               if task.duration - task.completed_work > 0]
+    outcome['seconds'] = time.perf_counter() - started
+    return outcome
+
+
+def compare(outcomes):
+    """
+    Add the differences to the baseline (the first outcome) to every outcome
+
+    Parameters:
+    outcomes (list): Outcomes returned by run_branch, baseline first
+
+    Returns:
+    list: The same outcomes with 'missed_delta', 'overtime_delta', 'newly_missed'
+          and 'no_longer_missed'
+    """
+    baseline = outcomes[0]
+    baseline_missed = set(baseline['missed_tasks'])
+    for outcome in outcomes:
+        missed = set(outcome['missed_tasks'])
+        outcome['missed_delta'] = outcome['missed_deadlines'] - baseline['missed_deadlines']
+        outcome['overtime_delta'] = outcome['overtime_hours'] - baseline['overtime_hours']
+        outcome['newly_missed'] = [name for name in outcome['missed_tasks'] if name not in baseline_missed]
+        outcome['no_longer_missed'] = [name for name in baseline['missed_tasks'] if name not in missed]
+    return outcomes
+
+
+def scheduler_state(scheduler):
+    """
+    Get the state a worker process needs to restore a scheduler (see restore_scheduler)
+
+    Parameters:
+    scheduler (TaskScheduler): Scheduler to copy
+
+    Returns:
+    dict: Picklable state
+    """
+    scheduler._sync_task_dicts()
+    return {
+        'tasks': scheduler.tasks,
+        'start_date': scheduler.start_date,
+        'current_date': scheduler.current_date,
+        'work_end_hour': scheduler.work_end_hour,
+        'weights': scheduler._score_weights(),
+        'urgency_policy': scheduler.urgency_policy.name,
+        'ranking_policy': scheduler.ranking_policy.name,
+        'busy_slots': scheduler.calendar.slots(),
+        'overtime_hours': scheduler.overtime_hours,
+        'completion_times': scheduler.completion_times
+    }
+
+
+def restore_scheduler(state):
+    """
+    Rebuild a scheduler that writes no files from scheduler_state
+
+    Parameters:
+    state (dict): State returned by scheduler_state
+
+    Returns:
+    TaskScheduler: Restored scheduler
+    """
+    scheduler = TaskScheduler(
+        output_dir=None,
+        start_date=state['start_date'],
+        urgency_weight=state['weights'][0],
+        importance_weight=state['weights'][1],
+        mood_weight=state['weights'][2],
+        busy_calendar=BusyCalendar.from_slots(state['busy_slots']),
+        urgency_policy=state['urgency_policy'],
+        ranking_policy=state['ranking_policy']
+    )
+    scheduler.tasks = state['tasks']
+    scheduler.current_date = state['current_date']
+    scheduler.work_end_hour = state['work_end_hour']
+    scheduler._tasks_loaded()
+    scheduler.overtime_hours = state['overtime_hours']
+    scheduler.completion_times = dict(state['completion_times'])
+    return scheduler
+
+
+def _setup_worker(shared):
+    return {'scheduler': restore_scheduler(shared['state']), 'settings': shared['settings']}
+
+
+def _run_job(scenario):
+    """
+    Run one scenario on a fork of the worker's scheduler
+    """
+    settings = worker_state['settings']
+    return run_branch(worker_state['scheduler'].fork(), scenario, settings['engine'], settings['max_steps'])
+
+
+def run_what_if(scheduler, scenarios, workers=None, processes=False, engine='ticks', max_steps=None):
+    """
+    Run every scenario, plus a baseline without changes, from the scheduler's
+    current state and compare the outcomes; the scheduler itself is not modified
+
+    Parameters:
+    scheduler (TaskScheduler): Scheduler to ask (it must not be used while the branches run)
+    scenarios (list): Scenarios, see the module docstring
+    workers (int): Number of threads or processes (default: one per branch, at most the CPU count)
+    processes (bool): Run the branches on a process pool instead of threads
+    engine (str): 'ticks' for run_headless, 'events' for run_event_driven
+    max_steps (int): Maximum number of work sessions or events per branch
+
+    Returns:
+    tuple: (outcomes, baseline first, see compare; run statistics)
+
+    Raises:
+    ValueError: If the engine is unknown
+    """
+    check_engine(engine)
+    branches = [{'name': BASELINE}] + list(scenarios)
+    workers = pool_workers(workers, len(branches))
+
+    started = time.perf_counter()
+    if processes:
+        shared = {'state': scheduler_state(scheduler), 'settings': {'engine': engine, 'max_steps': max_steps}}
+        outcomes, _ = run_pool(_run_job, branches, shared, workers=workers, setup=_setup_worker)
+    else:
+        # Forking changes the base's sharing bookkeeping, so it is done up front on this thread
+        forks = [scheduler.fork() for _ in branches]
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            outcomes = list(executor.map(lambda fork, scenario: run_branch(fork, scenario, engine, max_steps),
+                                         forks, branches))
+    elapsed = time.perf_counter() - started
+
+    stats = {
+        'branches': len(branches),
+        'workers': workers,
+        'processes': processes,
+        'seconds': elapsed
+    }
+    return compare(outcomes), stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare what-if scenarios against the plain schedule")
+    parser.add_argument('--input', default='tj_simulator/input_extreme.json', help="Task JSON file")
+    parser.add_argument('--scenarios', required=True, help="JSON file with a list of scenarios")
+    parser.add_argument('--workers', type=int, default=None, help="Threads or processes (default: one per branch)")
+    parser.add_argument('--processes', action='store_true', help="Run the branches on a process pool")
+    parser.add_argument('--engine', choices=ENGINES, default='ticks', help=ENGINE_HELP)
+    parser.add_argument('--max-steps', type=int, default=None, help="Maximum work sessions per branch")
+    parser.add_argument('--output', default='what_if_results.json', help="Results JSON file")
+    args = parser.parse_args()
+
+    with open(args.input, 'r') as f:
+        tasks_data = json.load(f)
+    with open(args.scenarios, 'r') as f:
+        scenarios = json.load(f)
+
+    scheduler = TaskScheduler(tasks_data=tasks_data, start_date=datetime(2025, 1, 1, 9, 0), output_dir=None)
+    outcomes, stats = run_what_if(scheduler, scenarios, workers=args.workers, processes=args.processes,
+                                  engine=args.engine, max_steps=args.max_steps)
+
+    with open(args.output, 'w') as f:
+        json.dump({'stats': stats, 'outcomes': outcomes}, f, indent=4, ensure_ascii=False)
+
+    print(f"{stats['branches']} branches on {stats['workers']} "
+          f"{'processes' if stats['processes'] else 'threads'} in {stats['seconds']:.2f}s")
+    width = max(len(outcome['scenario']) for outcome in outcomes)
+    for outcome in outcomes:
+        line = (f"  {outcome['scenario']:<{width}}  missed={outcome['missed_deadlines']} ({outcome['missed_delta']:+d})"
+                f"  overtime={outcome['overtime_hours']:.1f}h ({outcome['overtime_delta']:+.1f}h)")
+        if outcome['newly_missed']:
+            line += f"  newly missed: {', '.join(outcome['newly_missed'])}"
+        print(line)
+    print(f"Results saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
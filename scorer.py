@@ -8,9 +8,26 @@ import os
 # 添加项目根目录到Python路径，以便导入quantify模块
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from quantify.merge_mood import merge_mood_json
-from audio.mood import get_mood_json
-# 导入explain_priority函数
-from suggestion.suggestion import explain_priority
+# audio.mood and suggestion.suggestion are imported where they are used, so
+# headless runs work without audio devices or an OpenAI key
+from scheduling.deadline_index import DeadlineIndex
+from scheduling.priority_index import TaskPriorityIndex
+from scheduling.dirty_tracker import DirtyTracker
+from scheduling.expiry_wheel import COMPLETED, EXPIRED, ExpiryWheel, TaskArchive
+from scheduling.slots import SlotAxis
+from scheduling.task_table import TaskTable
+from scheduling.snapshot_log import SnapshotLogWriter
+from scheduling.snapshot_writer import SnapshotWriter
+from scheduling.task import Task
+from scheduling.overtime_solver import minimal_work_end_hour
+from scheduling.state_file import read_state_file, write_state_file
+from scheduling.day_plan import DayPlan
+from scheduling.calendar_index import BusyCalendar
+from scheduling.task_stream import iter_tasks
+from scheduling.profiler import PhaseProfiler, profiled
+from scheduling.session_log import SessionLog, encode_tasks, decode_tasks
+from scheduling.renderer import Colors, ConsoleRenderer, QUIET, SUMMARY, VERBOSE, task_name
+from scheduling.scoring import get_ranking_policy, get_urgency_policy
 
 
 
@@ -20,63 +37,110 @@ WORK_END_HOUR = 19
 # Define fixed deadline time
 DEADLINE_HOUR = 19
 
-# 添加颜色常量定义
-# ANSI颜色代码
-class Colors:
-    RESET = "\033[0m"
-    BLACK = "\033[30m"
-    RED = "\033[31m"
-    GREEN = "\033[32m"
-    YELLOW = "\033[33m"
-    BLUE = "\033[34m"
-    MAGENTA = "\033[35m"
-    CYAN = "\033[36m"
-    WHITE = "\033[37m"
-    BOLD = "\033[1m"
-    UNDERLINE = "\033[4m"
-    BACKGROUND_BLACK = "\033[40m"
-    BACKGROUND_RED = "\033[41m"
-    BACKGROUND_GREEN = "\033[42m"
-    BACKGROUND_YELLOW = "\033[43m"
-    BACKGROUND_BLUE = "\033[44m"
-    BACKGROUND_MAGENTA = "\033[45m"
-    BACKGROUND_CYAN = "\033[46m"
-    BACKGROUND_WHITE = "\033[47m"
-
 class TaskScheduler:
     def __init__(self, tasks_data=None, start_date=None, output_dir="score_output_test", 
-                 urgency_weight=0.5, importance_weight=0.3, mood_weight=0.2):
+                 urgency_weight=0.5, importance_weight=0.3, mood_weight=0.2, use_task_table=False,
+                 snapshot_mode="files", checkpoint_every=50, async_snapshots=False, plan_horizon_days=0,
+                 busy_calendar=None, profile=False, output_level="verbose", urgency_policy=None,
+                 ranking_policy=None):
         """
         Initialize the task scheduler with tasks data and start date
         
         Parameters:
         tasks_data (list): List of task dictionaries
         start_date (datetime): Starting date and time for the scheduler
-        output_dir (str): Directory to save task snapshots
+        output_dir (str): Directory to save task snapshots (None to not create one)
         urgency_weight (float): Weight for urgency in task scoring (0-1)
         importance_weight (float): Weight for importance in task scoring (0-1)
         mood_weight (float): Weight for mood in task scoring (0-1)
+        use_task_table (bool): Use the vectorized NumPy task table for urgency and scoring
+        snapshot_mode (str): "files" for one JSON file per snapshot, "log" for an
+                             append-only change log (tasks_log.jsonl) in output_dir
+        checkpoint_every (int): Full checkpoint interval of the change log
+        async_snapshots (bool): Write snapshots on a background thread
+        plan_horizon_days (int): Serve suggestions from a precomputed plan covering
+                                 this many days (0 to rank the tasks at every step)
+        busy_calendar (BusyCalendar): Busy hours (lectures, labs, ...) not available for work
+        profile (bool): Record per-phase timings from the start (see self.profiler)
+        output_level (str): Console output of run_simulation: "quiet", "summary" or "verbose"
+        urgency_policy (str): Urgency formula, see scheduling.scoring (default "deadline_pressure")
+        ranking_policy (str): Weighted score formula, see scheduling.scoring (default "weighted")
         """
         self.start_date = start_date if start_date else datetime.now().replace(hour=9, minute=0, second=0, microsecond=0)
         self.current_date = self.start_date
+        # Integer hour slots from the start day, used for deadline and availability math
+        self.time_axis = SlotAxis(self.start_date)
         self.output_dir = output_dir
         self.work_start_hour = WORK_START_HOUR
         self.work_end_hour = WORK_END_HOUR
         self.deadline_hour = DEADLINE_HOUR
         
+        # Fixed commitments inside the working window
+        self.calendar = busy_calendar if busy_calendar is not None else BusyCalendar()
+        # The calendar object is shared with a fork or its parent until changed (see fork)
+        self._calendar_shared = False
+        
+        # Memo for calculate_available_working_hours, keyed on
+        # (start slot, deadline day, work_end_hour, calendar version)
+        self._available_hours_cache = {}
+        
         # 存储权重值
         self.urgency_weight = urgency_weight
         self.importance_weight = importance_weight
         self.mood_weight = mood_weight
+        # Urgency and weighted score formulas, shared with the task table and the simulators
+        self.urgency_policy = get_urgency_policy(urgency_policy)
+        self.ranking_policy = get_ranking_policy(ranking_policy)
         
         # Initialize tasks if provided
         if tasks_data:
             self.tasks = self.initialize_tasks(tasks_data)
         else:
             self.tasks = []
+        # Indices of task records shared with a fork or its parent, copied before a change (see fork)
+        self._shared_tasks = set()
+        
+        # Remaining work per deadline day for the work-hour check (see solve_work_end_hour)
+        self.deadline_index = DeadlineIndex(self.tasks)
+        # Weighted scores of active tasks, kept current as urgency/mood change
+        self.priority_index = TaskPriorityIndex()
+        # Deadline-day groups for incremental recalculation within a day
+        self.dirty_tracker = DirtyTracker()
+        # Live tasks (before their deadline, work left); the others are archived
+        self._index_live_tasks()
+        # Optional columnar backend; task dicts are refreshed from it lazily
+        self.use_task_table = use_task_table
+        self.task_table = self._new_task_table() if use_task_table else None
+        self._task_dicts_stale = False
+        # Precomputed plan of work blocks (see get_recommended_tasks)
+        self.day_plan = DayPlan(plan_horizon_days) if plan_horizon_days else None
+        
+        # Snapshot persistence
+        self.snapshot_mode = snapshot_mode
+        self.checkpoint_every = checkpoint_every
+        self._snapshot_log = None
+        self.async_snapshots = async_snapshots
+        self._snapshot_writer = None
+        self.last_snapshot = None
+        # Archived tasks already in the previous change-log entry: (archive, epoch, count)
+        self._snapshot_archived = (None, 0, 0)
+        
+        # Run statistics for batch runs (see get_run_summary)
+        self.overtime_hours = 0
+        self.completion_times = {}
+        
+        # Per-phase wall time and call counts; can be switched on at any time
+        self.profiler = PhaseProfiler(enabled=profile)
+        
+        # Recorded or replayed external inputs of an interactive session (see record_session)
+        self.session_log = None
+        
+        # Buffered, diffed console output of run_simulation
+        self.renderer = ConsoleRenderer(output_level)
             
         # Ensure output directory exists
-        os.makedirs(output_dir, exist_ok=True)
+        if output_dir:
+            os.makedirs(output_dir, exist_ok=True)
         
     def initialize_tasks(self, tasks_data):
         """
@@ -86,18 +150,13 @@ class TaskScheduler:
         tasks_data (list): List of task dictionaries
         
         Returns:
-        list: Processed task list with additional fields
+        list: List of Task records (deadline parsed, numeric fields coerced once,
+              completed work initialized, mood defaulting to 5)
         """
         tasks = []
         for task in tasks_data:
-            task_copy = task.copy()
-            # Parse deadline
-            month, day = map(int, task_copy['DDL'].split('/'))
-            task_copy['deadline'] = datetime(self.start_date.year, month, day, self.deadline_hour, 0)
-            task_copy['completed_work'] = 0  # Initialize completed work time
-            # 确保每个任务都有心情值，如果没有则设置默认值
-            if 'mood' not in task_copy:
-                task_copy['mood'] = 5
+            task_copy = Task.from_record(task, self.start_date.year, self.deadline_hour)
+            task_copy.completed_work = 0  # Initialize completed work time
             tasks.append(task_copy)
         return tasks
     
@@ -111,8 +170,310 @@ class TaskScheduler:
         with open(filename, 'r') as f:
             tasks_data = json.load(f)
         self.tasks = self.initialize_tasks(tasks_data)
+        return self._tasks_loaded()
+    
+    def load_tasks_streaming(self, filename, on_task=None, skip_invalid=False):
+        """
+        Load tasks from a JSON array or JSONL file one record at a time, without
+        reading the whole document into memory (see scheduling.task_stream)
+        
+        Parameters:
+        filename (str): Path to the task file
+        on_task (callable): on_task(task_index, task) is called for every task as
+                            soon as it is parsed, before the rest of the file is read
+        skip_invalid (bool): Skip invalid records instead of raising ValueError
+        
+        Returns:
+        int: Number of tasks loaded
+        """
+        self.tasks = []
+        self._tasks_loaded()
+        now = self.time_axis.to_slot(self.current_date)
+        try:
+            for task in iter_tasks(filename, self.start_date.year, self.deadline_hour, skip_invalid):
+                # Indexed as soon as it is parsed, not after the whole file was read
+                self.tasks.append(task)
+                task_index = len(self.tasks) - 1
+                self.deadline_index.add_task(task)
+                self._index_task(task_index, now)
+                if on_task is not None:
+                    on_task(task_index, task)
+        finally:
+            if self.use_task_table:
+                # The columnar table is built once, from the tasks read
+                self.task_table = self._new_task_table()
+        return len(self.tasks)
+    
+    def _tasks_loaded(self):
+        """
+        Rebuild the indexes and reset the run state after self.tasks was replaced
+        """
+        self.deadline_index.rebuild(self.tasks)
+        self.priority_index.clear()
+        self.dirty_tracker.reset()
+        self._shared_tasks = set()
+        self._index_live_tasks()
+        if self.use_task_table:
+            self.task_table = self._new_task_table()
+            self._task_dicts_stale = False
+        self.overtime_hours = 0
+        self.completion_times = {}
+        self._invalidate_plan()
+        return len(self.tasks)
+    
+    def save_state(self, filename):
+        """
+        Checkpoint the scheduler (tasks, clock, working window, weights, scoring
+        policies, busy calendar and run statistics) to a binary state file, see
+        scheduling.state_file
+        
+        Parameters:
+        filename (str): Path of the state file
+        """
+        self._sync_task_dicts()
+        write_state_file(filename, self.tasks, self.start_date, self.current_date, self.work_end_hour,
+                         self._score_weights(), self.overtime_hours, self.completion_times,
+                         urgency_policy=self.urgency_policy.name, ranking_policy=self.ranking_policy.name,
+                         busy_slots=self.calendar.slots())
+        return filename
+    
+    def load_state(self, filename):
+        """
+        Restore a scheduler checkpoint written by save_state, replacing the current
+        tasks and state; the run can continue where it was saved
+        
+        Parameters:
+        filename (str): Path of the state file
+        
+        Returns:
+        int: Number of tasks loaded
+        """
+        state = read_state_file(filename)
+        self.tasks = state['tasks']
+        self._set_start_date(state['start_date'])
+        self.current_date = state['current_date']
+        self.urgency_weight, self.importance_weight, self.mood_weight = state['weights']
+        self.urgency_policy = get_urgency_policy(state['urgency_policy'])
+        self.ranking_policy = get_ranking_policy(state['ranking_policy'])
+        self.calendar = BusyCalendar.from_slots(state['busy_slots'])
+        self._calendar_shared = False
+        self.overtime_hours = state['overtime_hours']
+        self.completion_times = state['completion_times']
+        
+        self.work_end_hour = state['work_end_hour']
+        self.deadline_index.rebuild(self.tasks)
+        
+        # Scores were saved with the tasks, so the ranking is restored without recalculating
+        self.priority_index.rebuild((i, task.weighted_score) for i, task in enumerate(self.tasks)
+                                    if task.scored and task.duration - task.completed_work > 0)
+        self.dirty_tracker.reset()
+        self._shared_tasks = set()
+        self._index_live_tasks()
+        if self.use_task_table:
+            self.task_table = self._new_task_table()
+            self._task_dicts_stale = False
+        self._invalidate_plan()
         return len(self.tasks)
     
+    def _set_start_date(self, start_date):
+        """
+        Move the start date, rebuilding the time axis it is the epoch of (slots
+        and the available-hours memo of the old axis are no longer valid)
+        """
+        self.start_date = start_date
+        self.time_axis = SlotAxis(start_date)
+        self._available_hours_cache.clear()
+    
+    def fork(self):
+        """
+        Copy-on-write fork for what-if simulation (see scheduling.what_if)
+        
+        The fork starts from the same tasks, clock, working window, busy calendar,
+        weights and policies, and writes no files. Task records and the calendar
+        are shared until one side changes them: the scheduler that first writes a
+        shared task (or calendar) copies it and keeps the copy (see _own_task), so
+        neither side ever sees the other's changes, and only the tasks a branch
+        actually touches are copied. The indexes are copied as they are, so the
+        fork's next recalculation is still an incremental one. A fork always uses
+        the task dicts, even if this scheduler uses the task table.
+        
+        Returns:
+        TaskScheduler: Independent scheduler sharing unchanged data with this one
+        """
+        fork = type(self)(output_dir=None, start_date=self.start_date)
+        self._share_state(fork)
+        # From now on this side copies a task or the calendar before changing it too
+        self._shared_tasks = set(range(len(self.tasks)))
+        self._calendar_shared = True
+        return fork
+    
+    def lookahead(self, shadow=None):
+        """
+        One-sided fork for simulating ahead of this scheduler (see scheduling.day_plan)
+        
+        Like fork, except that only the shadow copies shared tasks and the
+        calendar before changing them: this scheduler keeps changing its records
+        in place and never pays for copies. In exchange the shadow is only valid
+        until this scheduler changes, so it is meant to be run right away, then
+        dropped or passed back in to be re-synced for the next look-ahead.
+        
+        Parameters:
+        shadow (TaskScheduler): Earlier look-ahead of this scheduler to re-sync
+                                instead of creating a new one
+        
+        Returns:
+        TaskScheduler: Shadow scheduler in this scheduler's current state
+        """
+        if shadow is None:
+            shadow = type(self)(output_dir=None, start_date=self.start_date)
+        self._share_state(shadow)
+        return shadow
+    
+    def _share_state(self, fork):
+        """
+        Put a fork (or a look-ahead) in this scheduler's state, sharing the task
+        records and the calendar with it copy-on-write (see fork)
+        """
+        self._sync_task_dicts()
+        fork.start_date = self.start_date
+        fork.urgency_weight = self.urgency_weight
+        fork.importance_weight = self.importance_weight
+        fork.mood_weight = self.mood_weight
+        fork.urgency_policy = self.urgency_policy
+        fork.ranking_policy = self.ranking_policy
+        fork.tasks = list(self.tasks)
+        fork._shared_tasks = set(range(len(self.tasks)))
+        fork.calendar = self.calendar
+        fork._calendar_shared = True
+        # The time axis and the day layout of the deadline index are only ever replaced, never changed
+        fork.time_axis = self.time_axis
+        fork.deadline_slots = list(self.deadline_slots)
+        fork.current_date = self.current_date
+        fork.work_end_hour = self.work_end_hour
+        fork._available_hours_cache = dict(self._available_hours_cache)
+        fork.deadline_index = self.deadline_index.copy()
+        if self.task_table is None:
+            fork.priority_index = self.priority_index.copy()
+            fork.dirty_tracker = self.dirty_tracker.copy()
+        else:
+            # The fork's first recalculation is a full one and fills its priority index
+            fork.priority_index = TaskPriorityIndex()
+            fork.dirty_tracker = DirtyTracker()
+        fork.task_table = None
+        fork._task_dicts_stale = False
+        fork.live_tasks = set(self.live_tasks)
+        fork.expiry_wheel = self.expiry_wheel.copy()
+        fork.archive = self.archive.copy()
+        fork.overtime_hours = self.overtime_hours
+        fork.completion_times = dict(self.completion_times)
+    
+    def record_session(self, filename):
+        """
+        Record the current state and every external input (prompt answers, moods,
+        LLM explanations) of the next run_simulation to a session log, see
+        scheduling.session_log
+        
+        Parameters:
+        filename (str): Path of the session log
+        """
+        self._sync_task_dicts()
+        header = {
+            'start_date': self.start_date.strftime("%Y-%m-%d %H:%M"),
+            'current_date': self.current_date.strftime("%Y-%m-%d %H:%M"),
+            'work_end_hour': self.work_end_hour,
+            'weights': list(self._score_weights()),
+            'use_task_table': self.use_task_table,
+            'plan_horizon_days': self.day_plan.horizon_days if self.day_plan is not None else 0,
+            'urgency_policy': self.urgency_policy.name,
+            'ranking_policy': self.ranking_policy.name,
+            'busy_slots': self.calendar.slots(),
+            'tasks': encode_tasks(self.tasks)
+        }
+        self.session_log = SessionLog.record(filename, header)
+        return filename
+    
+    def replay_session(self, filename):
+        """
+        Restore the state a session log was recorded from; the next run_simulation
+        then takes every external input from the log instead of the user, the
+        microphone or the LLM
+        
+        Parameters:
+        filename (str): Path of the session log
+        
+        Returns:
+        int: Number of tasks loaded
+        """
+        self.session_log = SessionLog.replay(filename)
+        header = self.session_log.header
+        self._set_start_date(datetime.strptime(header['start_date'], "%Y-%m-%d %H:%M"))
+        self.current_date = datetime.strptime(header['current_date'], "%Y-%m-%d %H:%M")
+        self.urgency_weight, self.importance_weight, self.mood_weight = header['weights']
+        self.work_end_hour = header['work_end_hour']
+        self.use_task_table = header['use_task_table']
+        self.day_plan = DayPlan(header['plan_horizon_days']) if header['plan_horizon_days'] else None
+        self.urgency_policy = get_urgency_policy(header.get('urgency_policy'))
+        self.ranking_policy = get_ranking_policy(header.get('ranking_policy'))
+        self.calendar = BusyCalendar.from_slots(header['busy_slots'])
+        self._calendar_shared = False
+        self.tasks = decode_tasks(header['tasks'])
+        return self._tasks_loaded()
+    
+    def _prompt(self):
+        """
+        Read a line of user input (from the session log when replaying)
+        """
+        # The prompt itself is still in the output buffer
+        self._flush_console()
+        if self.session_log is not None and self.session_log.replaying:
+            return self.session_log.next_event('input')
+        line = input()
+        if self.session_log is not None:
+            self.session_log.append('input', line)
+        return line
+    
+    def _explain_priority(self, snapshot_file):
+        """
+        Get the LLM explanation of the current suggestions (from the session log
+        when replaying)
+        
+        Parameters:
+        snapshot_file (str): Snapshot the suggestions were saved to
+        
+        Returns:
+        str: Explanation text
+        """
+        if self.session_log is not None and self.session_log.replaying:
+            explanation = self.session_log.next_event('explain')
+            if isinstance(explanation, dict):
+                raise RuntimeError(explanation['error'])
+            return explanation
+        try:
+            # 导入explain_priority函数
+            from suggestion.suggestion import (explain_priority, explain_priority_for_assignments,
+                                               rank_assignments)
+            if self.snapshot_mode == "log" or self.async_snapshots:
+                # Hand over the in-memory snapshot instead of waiting for the file
+                explanation = explain_priority_for_assignments(rank_assignments(self.last_snapshot))
+            else:
+                explanation = explain_priority(snapshot_file)
+        except Exception as e:
+            if self.session_log is not None:
+                self.session_log.append('explain', {'error': str(e)})
+            raise
+        if self.session_log is not None:
+            self.session_log.append('explain', explanation)
+        return explanation
+    
+    def _flush_console(self):
+        with self.profiler.phase("console"):
+            self.renderer.flush()
+    
+    def _close_session_log(self):
+        if self.session_log is not None:
+            self.session_log.close()
+            self.session_log = None
+    
     def is_working_hours(self, dt):
         """
         Check if a datetime is during working hours
@@ -145,9 +506,10 @@ class TaskScheduler:
         # Already during working hours
         return dt
     
+    @profiled()
     def save_tasks_snapshot(self, current_time):
         """
-        Save current task status to a JSON file
+        Save current task status to a JSON file (or append it to the change log)
         
         Parameters:
         current_time (datetime): Current time for the snapshot
@@ -155,28 +517,82 @@ class TaskScheduler:
         Returns:
         str: Path to the saved snapshot file
         """
+        self._sync_task_dicts()
+        
+        # Create serializable copy of tasks
+        serializable_tasks = self._serialize_tasks()
+        self.last_snapshot = serializable_tasks
+        
+        if self.snapshot_mode == "log":
+            # Append only the changed fields to the change log
+            if self._snapshot_log is None:
+                self._snapshot_log = SnapshotLogWriter(
+                    os.path.join(self.output_dir, "tasks_log.jsonl"), self.checkpoint_every)
+            snapshot_log = self._snapshot_log
+            # Tasks archived before the previous entry can't have changed since
+            archive = self.archive
+            previous_archive, epoch, count = self._snapshot_archived
+            unchanged = archive.order[:count] if previous_archive is archive and epoch == archive.epoch else ()
+            self._snapshot_archived = (archive, archive.epoch, len(archive))
+            if self.async_snapshots:
+                # Log appends must stay in order, so they are never coalesced
+                self._get_snapshot_writer().submit(
+                    lambda: snapshot_log.append(current_time, serializable_tasks, unchanged))
+                return snapshot_log.path
+            return snapshot_log.append(current_time, serializable_tasks, unchanged)
+        
         # Create filename with timestamp
         timestamp = current_time.strftime("%Y%m%d_%H%M")
         filename = os.path.join(self.output_dir, f"tasks_{timestamp}.json")
         
-        # Create serializable copy of tasks
-        serializable_tasks = []
-        for task in self.tasks:
-            task_copy = task.copy()
-            # Convert datetime objects to strings
-            if 'deadline' in task_copy:
-                task_copy['deadline'] = task_copy['deadline'].strftime("%Y-%m-%d %H:%M")
-            # 确保心情值存在于快照中
-            if 'mood' not in task_copy:
-                task_copy['mood'] = 5
-            serializable_tasks.append(task_copy)
+        if self.async_snapshots:
+            # Serialize and write on the writer thread; the file may not exist yet on return
+            self._get_snapshot_writer().submit(
+                lambda: self._write_json(filename, serializable_tasks), key=filename)
+            return filename
         
         # Save tasks to JSON file
-        with open(filename, 'w') as f:
-            json.dump(serializable_tasks, f, indent=4)
+        self._write_json(filename, serializable_tasks)
         
         return filename
     
+    def _write_json(self, filename, data):
+        """
+        Write data to a JSON file in the snapshot layout
+        """
+        with open(filename, 'w') as f:
+            json.dump(data, f, indent=4)
+    
+    def _get_snapshot_writer(self):
+        """
+        Get the background snapshot writer, starting it on first use
+        """
+        if self._snapshot_writer is None:
+            self._snapshot_writer = SnapshotWriter()
+        return self._snapshot_writer
+    
+    def close_snapshots(self):
+        """
+        Flush pending background writes and close the snapshot change log, if one is open
+        """
+        if self._snapshot_writer is not None:
+            self._snapshot_writer.close()
+            self._snapshot_writer = None
+        if self._snapshot_log is not None:
+            self._snapshot_log.close()
+            self._snapshot_log = None
+    
+    def _serialize_tasks(self):
+        """
+        Create a JSON-serializable copy of all tasks
+        
+        Returns:
+        list: Task dictionaries with the deadline formatted as a string
+        """
+        archive = self.archive
+        return [archive.to_dict(i, task) if i in archive else task.to_dict()
+                for i, task in enumerate(self.tasks)]
+    
     def calculate_available_working_hours(self, start_date, deadline):
         """
         Calculate available working hours before a deadline
@@ -188,143 +604,163 @@ class TaskScheduler:
         Returns:
         float: Available working hours
         """
-        # Daily work hours
-        daily_work_hours = self.work_end_hour - self.work_start_hour
+        axis = self.time_axis
+        return self._available_hours(axis.to_slot(start_date), axis.to_day(deadline))
+    
+    def _available_hours(self, start_slot, deadline_day, work_end_hour=None):
+        """
+        calculate_available_working_hours on the integer time axis (see scheduling.slots)
         
-        # Start date
-        current_date = start_date
-        total_hours = 0
+        Parameters:
+        start_slot (int): Hour slot of the start
+        deadline_day (int): Day of the deadline
+        work_end_hour (int): Work end hour to assume (default: the current one)
         
-        # Get date part of deadline (without time)
-        deadline_day = deadline.date()
+        Returns:
+        float: Available working hours
+        """
+        if work_end_hour is None:
+            work_end_hour = self.work_end_hour
+        # The result only depends on the start slot, the deadline day, the
+        # working window and the busy calendar, so it can be memoized on those
+        cache_key = (start_slot, deadline_day, work_end_hour, self.calendar.version)
+        cached_hours = self._available_hours_cache.get(cache_key)
+        if cached_hours is not None:
+            return cached_hours
+        start_day, hour = divmod(start_slot, 24)
         
         # If start date is already after deadline, no time available
-        if current_date.date() > deadline_day:
-            return 0
-            
-        # Handle start day (if during working hours)
-        if current_date.date() == deadline_day:
+        if start_day > deadline_day:
+            total_hours = 0
+        elif start_day == deadline_day:
             # If current date is deadline day, can only work until deadline time
-            end_hour = min(self.deadline_hour, self.work_end_hour)
-            start_hour = max(current_date.hour, self.work_start_hour)
-            # If start time is already past end time, no time available
-            if start_hour >= end_hour:
-                return 0
-            hours_today = end_hour - start_hour
-            total_hours += hours_today
-            return total_hours
+            end_hour = min(self.deadline_hour, work_end_hour)
+            start_hour = max(hour, self.work_start_hour)
+            total_hours = max(0, end_hour - start_hour)
         else:
-            # If not deadline day, can use extended work time
-            if current_date.hour < self.work_end_hour:
-                # Calculate remaining work time today
-                start_hour = max(current_date.hour, self.work_start_hour)
-                hours_today = self.work_end_hour - start_hour
-                total_hours += hours_today
-        
-        # Advance to next day
-        current_date = datetime(current_date.year, current_date.month, current_date.day, 0, 0) + timedelta(days=1)
-        
-        # Handle middle days (full work days)
-        while current_date.date() < deadline_day:
-            total_hours += daily_work_hours
-            current_date += timedelta(days=1)
-        
-        # Handle deadline day (if any)
-        if current_date.date() == deadline_day:
+            # Daily work hours
+            daily_work_hours = work_end_hour - self.work_start_hour
+            
+            # Remaining work time on the start day (can use extended work time)
+            hours_today = 0
+            if hour < work_end_hour:
+                hours_today = work_end_hour - max(hour, self.work_start_hour)
+            
+            # Full work days strictly between the start day and the deadline day
+            middle_days = deadline_day - start_day - 1
+            
             # Can only work until DEADLINE_HOUR (19:00) on deadline day
             hours_deadline_day = max(0, self.deadline_hour - self.work_start_hour)
-            total_hours += hours_deadline_day
+            
+            total_hours = hours_today + middle_days * daily_work_hours + hours_deadline_day
+        
+        if self.calendar:
+            # Lectures and other busy hours inside those windows are not available
+            total_hours -= self.calendar.busy_between(self.time_axis, start_slot, deadline_day,
+                                                      self.work_start_hour, work_end_hour, self.deadline_hour)
         
+        self._available_hours_cache[cache_key] = total_hours
         return total_hours
     
+    @profiled()
     def check_time_sufficiency(self, tasks, current_date):
         """
         Check if there's enough working time to complete specified tasks
         
         Parameters:
-        tasks (list): List of tasks to check
+        tasks (list): List of tasks to check, or None for every unfinished task with a
+                      deadline after current_date (read from the deadline index)
         current_date (datetime): Current datetime
         
         Returns:
         list: List of tuples with insufficient deadlines (deadline, required_hours, available_hours)
         """
-        # Sort tasks by deadline
-        sorted_tasks = sorted(tasks, key=lambda x: x['deadline'])
-        
-        # Group tasks by deadline
-        tasks_by_deadline = {}
-        for task in sorted_tasks:
-            deadline_str = task['deadline'].strftime('%Y-%m-%d')
-            if deadline_str not in tasks_by_deadline:
-                tasks_by_deadline[deadline_str] = []
-            tasks_by_deadline[deadline_str].append(task)
+        to_day = self.time_axis.to_day
+        start_slot = self.time_axis.to_slot(current_date)
+        if tasks is None:
+            # Work due on or before every deadline day, kept by the deadline index
+            index = self.deadline_index
+            epoch_day = self.time_axis.epoch_day
+            days = [(index.group_days[g] - epoch_day, index.group_deadlines[g], required)
+                    for g, required in index.cumulative_remaining(index.first_group_after(current_date))]
+        else:
+            # Group the tasks by deadline day: only the distinct days are sorted
+            required_by_day = {}
+            first_deadline = {}
+            for task in tasks:
+                day = to_day(task['deadline'])
+                required_by_day[day] = (required_by_day.get(day, 0)
+                                        + float(task['duration']) - task.get('completed_work', 0))
+                if day not in first_deadline or task['deadline'] < first_deadline[day]:
+                    first_deadline[day] = task['deadline']
+            days = []
+            required_hours = 0
+            for day in sorted(required_by_day):
+                # Total work time needed by all tasks with deadlines before or on this day
+                required_hours += required_by_day[day]
+                days.append((day, first_deadline[day], required_hours))
         
-        # Check each deadline
         insufficient_deadlines = []
-        accumulated_tasks = []
-        
-        for deadline_str, deadline_tasks in sorted(tasks_by_deadline.items()):
-            # Add current deadline's tasks to accumulated task list
-            accumulated_tasks.extend(deadline_tasks)
-            
-            # Get datetime object for current deadline
-            current_deadline = deadline_tasks[0]['deadline']
-            
+        for day, deadline, required_hours in days:
             # Calculate available working hours before deadline
-            available_hours = self.calculate_available_working_hours(current_date, current_deadline)
-            
-            # Calculate total work time needed (all tasks with deadlines before or equal to current deadline)
-            required_hours = sum(float(task['duration']) - task.get('completed_work', 0) for task in accumulated_tasks)
-            
+            available_hours = self._available_hours(start_slot, day)
             if required_hours > available_hours:
-                insufficient_deadlines.append((current_deadline, required_hours, available_hours))
+                insufficient_deadlines.append((deadline, required_hours, available_hours))
         
         return insufficient_deadlines
     
+    def has_future_work(self, current_date):
+        """
+        Check if any unfinished task has a deadline after current_date
+        
+        Parameters:
+        current_date (datetime): Current datetime
+        
+        Returns:
+        bool: True if there is still work to schedule
+        """
+        index = self.deadline_index
+        return index.has_active_from(index.first_group_after(current_date))
+    
     def adjust_work_end_time(self, insufficient_deadlines, current_date):
         """
         Calculate adjusted work end time based on insufficient deadlines
         
         Parameters:
-        insufficient_deadlines (list): List of insufficient deadlines
+        insufficient_deadlines (list): List of insufficient deadlines (only checked for
+                                       emptiness; the solver looks at every future deadline)
         current_date (datetime): Current datetime
         
         Returns:
         int: New work end hour
         """
-        max_additional_hours_needed = 0
-        
-        for deadline, required, available in insufficient_deadlines:
-            # Calculate time shortage
-            shortage = required - available
-            
-            # Calculate working days from current date to day before deadline (not including deadline day)
-            current_day = current_date.date()
-            deadline_day = deadline.date()
-            working_days = 0
-            
-            check_date = current_day
-            while check_date < deadline_day:  # Not including deadline_day
-                # For simplicity, assume all dates are working days
-                working_days += 1
-                check_date += timedelta(days=1)
-            
-            if working_days <= 0:
-                # If already deadline day, cannot adjust work time
-                continue
-            
-            # Additional hours needed per day
-            additional_hours_per_day = math.ceil(shortage / working_days)
-            max_additional_hours_needed = max(max_additional_hours_needed, additional_hours_per_day)
-        
-        # Ensure additional time is a multiple of 2 (convenient for 2-hour work sessions)
-        if max_additional_hours_needed % 2 != 0:
-            max_additional_hours_needed += 1
+        if not insufficient_deadlines:
+            return self.work_end_hour
+        return self.solve_work_end_hour(current_date)
+    
+    def solve_work_end_hour(self, current_date):
+        """
+        Find the earliest work end hour (19, 21, 23 or 24) with which every future
+        deadline can still be met, see scheduling.overtime_solver
         
-        # Ensure new end time doesn't exceed midnight
-        new_end_hour = min(24, self.work_end_hour + max_additional_hours_needed)
+        Parameters:
+        current_date (datetime): Current datetime
         
-        return new_end_hour
+        Returns:
+        int: Minimal work end hour (24 if even midnight is not enough)
+        """
+        index = self.deadline_index
+        first_group = index.first_group_after(current_date)
+        today = current_date.toordinal()
+        epoch_day = self.time_axis.epoch_day
+        # Deadlines later today can't be helped by working longer, but their work
+        # still counts towards every later deadline
+        demands = [(index.group_days[g] - epoch_day, required)
+                   for g, required in index.cumulative_remaining(first_group)
+                   if index.group_days[g] != today]
+        # Probes the scheduler's own (memoized) available hours at every candidate end hour
+        now = self.time_axis.to_slot(current_date)
+        return minimal_work_end_hour(demands, lambda day, end_hour: self._available_hours(now, day, end_hour))
     
     def update_working_hours(self, new_end_hour):
         """
@@ -333,41 +769,262 @@ class TaskScheduler:
         Parameters:
         new_end_hour (int): New work end hour
         """
-        self.work_end_hour = new_end_hour
+        if new_end_hour != self.work_end_hour:
+            # Cached available hours were computed for the old working window
+            self._available_hours_cache.clear()
+            self.work_end_hour = new_end_hour
         return self.work_end_hour
     
+    def add_busy_interval(self, start, end):
+        """
+        Block a fixed commitment (lecture, lab, ...) in the calendar
+        
+        Parameters:
+        start (datetime): Start of the busy interval
+        end (datetime): End of the busy interval
+        """
+        self._own_calendar()
+        self.calendar.add(start, end)
+        self._calendar_changed()
+    
+    def add_busy_entries(self, entries):
+        """
+        Block calendar entries (one-off intervals or weekly recurrences)
+        
+        Parameters:
+        entries (list): Entries in the JSON format of scheduling.calendar_index
+        """
+        self._own_calendar()
+        self.calendar.load(entries)
+        self._calendar_changed()
+    
+    def load_calendar_from_json(self, filename):
+        """
+        Load busy intervals from a JSON file (see scheduling.calendar_index)
+        
+        Parameters:
+        filename (str): Path to the JSON file
+        
+        Returns:
+        int: Number of busy hours in the calendar
+        """
+        self.calendar = BusyCalendar.from_json(filename)
+        self._calendar_shared = False
+        self._calendar_changed()
+        return len(self.calendar)
+    
+    def _own_calendar(self):
+        # Copy the calendar before changing it if it is shared with a fork (see fork)
+        if self._calendar_shared:
+            self.calendar = self.calendar.copy()
+            self._calendar_shared = False
+    
+    def _calendar_changed(self):
+        # Available hours depend on the busy hours
+        self._available_hours_cache.clear()
+        self.dirty_tracker.invalidate()
+        self._invalidate_plan()
+    
+    def _skip_busy_time(self):
+        """
+        Move the clock past a busy hour
+        
+        Returns:
+        bool: True if the current hour was busy
+        """
+        if self.calendar and self.calendar.is_busy(self.current_date):
+            self.advance_time(1)
+            return True
+        return False
+    
+    def _session_length(self, session_hours):
+        """
+        Get the length of a work session starting now, cut short by the next busy hour
+        """
+        if self.calendar:
+            next_busy = self.calendar.next_busy(self.current_date)
+            if next_busy is not None and next_busy < self.current_date + timedelta(hours=session_hours):
+                hours = (next_busy - self.current_date).total_seconds() / 3600
+                return int(hours) if hours.is_integer() else hours
+        return session_hours
+    
+    @profiled()
     def recalculate_all_tasks(self, current_date):
         """
         Recalculate available time and urgency for all tasks
         
+        The first recalculation of a day, or after the work end hour, busy
+        calendar, weights, moods or tasks changed, goes over every task. Later
+        ones only redo what the clock advance and the work done changed, see
+        _recalculate_changed_tasks.
+        
         Parameters:
         current_date (datetime): Current datetime
         """
-        for task in self.tasks:
-            if current_date < task['deadline']:
-                # Calculate effective work time before deadline (only considering hours during work time)
-                time_to_deadline = self.calculate_available_working_hours(current_date, task['deadline'])
-                task['time_to_deadline'] = time_to_deadline
-                
-                # Update urgency
-                duration = float(task['duration'])
-                duration_left = max(0, duration - task.get('completed_work', 0))
-                
-                if time_to_deadline <= 0:
-                    urgency = 100  # Past deadline
-                elif duration_left <= 0:
-                    urgency = 0    # Task completed
-                else:
-                    # New urgency formula: 100 * (duration_left / (time_to_deadline + duration_left)) * (1 + duration_left)
-                    urgency = 100 * (duration_left / (time_to_deadline + duration_left)) * (1 + 1/duration_left)
-                
-                task['urgency'] = urgency  # Keep as float for more precise sorting
-                task['duration_left'] = duration_left
-                
-                # 确保每个任务都有心情值
-                if 'mood' not in task:
-                    task['mood'] = 5
+        now = self.time_axis.to_slot(current_date)
+        self._expire_tasks(now)
+        if self.task_table is not None:
+            # One vectorized pass over the columnar table; dicts are synced when needed
+            self.task_table.recalculate(now, lambda day: self._available_hours(now, day),
+                                        self._score_weights())
+            self._task_dicts_stale = True
+            return
+        
+        today = now // 24
+        window = (today, self.work_end_hour, self.calendar.version, self._score_weights(),
+                  self.urgency_policy, self.ranking_policy)
+        tracker = self.dirty_tracker
+        if tracker.is_current(window, now):
+            self._recalculate_changed_tasks(now)
+            return
+        tracker.start(window, now)
+        
+        urgency_of = self.urgency_policy.scalar
+        tasks = self.tasks
+        deadline_slots = self.deadline_slots
+        # Available hours only depend on the deadline day: calculated once per day
+        hours_by_day = {}
+        shared = self._shared_tasks
+        # Archived tasks keep the fields they had when they were archived
+        for i in self.live_tasks:
+            task = tasks[i] if i not in shared else self._own_task(i)
+            deadline_day = deadline_slots[i] // 24
+            # Calculate effective work time before deadline (only considering hours during work time)
+            time_to_deadline = hours_by_day.get(deadline_day)
+            if time_to_deadline is None:
+                time_to_deadline = hours_by_day[deadline_day] = self._available_hours(now, deadline_day)
+            task.time_to_deadline = time_to_deadline
+            
+            # Update urgency
+            duration_left = max(0, task.duration - task.completed_work)
+            urgency = urgency_of(duration_left, time_to_deadline)
+            
+            task.urgency = urgency  # Keep as float for more precise sorting
+            task.duration_left = duration_left
+            
+            self._refresh_priority(i)
+            tracker.add(i, deadline_day, today, time_to_deadline)
+    
+    def _recalculate_changed_tasks(self, now):
+        """
+        Incremental recalculate_all_tasks within the window of the last full one:
+        the available hours are calculated once per deadline day, and a task is
+        only rescored if its day's hours changed or work was done on it.
+        
+        Parameters:
+        now (int): Current hour slot, not earlier than the last recalculation
+        """
+        tracker = self.dirty_tracker
+        tracker.last_slot = now
+        dirty = tracker.take_dirty()
+        tasks = self.tasks
+        deadline_slots = self.deadline_slots
+        urgency_of = self.urgency_policy.scalar
+        live = self.live_tasks
+        shared = self._shared_tasks
+        
+        # Tasks due later today
+        live_today = []
+        for i in tracker.today:
+            if i in live:
+                task = tasks[i] if i not in shared else self._own_task(i)
+                live_today.append(i)
+                task.time_to_deadline = time_to_deadline = self._available_hours(now, deadline_slots[i] // 24)
+                task.duration_left = duration_left = max(0, task.duration - task.completed_work)
+                task.urgency = urgency_of(duration_left, time_to_deadline)
+                self._refresh_priority(i)
+        tracker.today = live_today
+        
+        # Later days: the same hours for every task of the group
+        changed_days = []
+        for day in tracker.active:
+            time_to_deadline = self._available_hours(now, day)
+            if time_to_deadline != tracker.group_hours[day]:
+                tracker.group_hours[day] = time_to_deadline
+                changed_days.append(day)
+        groups = [(day, tracker.active[day]) for day in changed_days]
+        for i in dirty:
+            day = deadline_slots[i] // 24
+            if day not in changed_days and i in tracker.active.get(day, ()):
+                groups.append((day, (i,)))
+        
+        score_of = self.ranking_policy.scalar
+        weights = self._score_weights()
+        scores = []
+        for day, members in groups:
+            time_to_deadline = tracker.group_hours[day]
+            for i in members:
+                task = tasks[i] if i not in shared else self._own_task(i)
+                duration_left = task.duration - task.completed_work
+                task.time_to_deadline = time_to_deadline
+                task.duration_left = duration_left
+                task.urgency = urgency = urgency_of(duration_left, time_to_deadline)
+                task.weighted_score = score = score_of(urgency, task.importance, task.mood, weights)
+                scores.append((i, score))
+        self.priority_index.update_many(scores)
+    
+    def _index_live_tasks(self):
+        """
+        Split the tasks into live ones, scheduled to expire on the timing wheel,
+        and archived ones, after the task list was replaced
+        """
+        now = self.time_axis.to_slot(self.current_date)
+        # Deadline of every task as an hour slot, for the integer math of the hot loops
+        self.deadline_slots = []
+        self.live_tasks = set()
+        self.expiry_wheel = ExpiryWheel(now)
+        self.archive = TaskArchive()
+        for i in range(len(self.tasks)):
+            self._index_task(i, now)
+    
+    def _index_task(self, task_index, now):
+        """
+        Add the next task of the task list to the live set or the archive
+        
+        Parameters:
+        task_index (int): Index of the task (the length of deadline_slots)
+        now (int): Current hour slot
+        """
+        task = self.tasks[task_index]
+        deadline_slot = self.time_axis.to_slot(task.deadline)
+        self.deadline_slots.append(deadline_slot)
+        if now >= deadline_slot:
+            self.archive.add(task_index, EXPIRED)
+        elif task.duration - task.completed_work <= 0:
+            if 'duration_left' not in task:
+                # Completed before it was ever recalculated, e.g. restored from a session log
+                task = self._own_task(task_index)
+                task.time_to_deadline = self._available_hours(now, deadline_slot // 24)
+                task.duration_left = 0
+                task.urgency = self.urgency_policy.scalar(0, task.time_to_deadline)
+            self.archive.add(task_index, COMPLETED)
+        else:
+            self.live_tasks.add(task_index)
+            self.expiry_wheel.add(task_index, deadline_slot)
+    
+    def _archive_task(self, task_index, reason):
+        """
+        Move a live task to the archive
+        
+        Parameters:
+        task_index (int): Index of the task in the tasks list
+        reason (str): COMPLETED or EXPIRED
+        """
+        self.live_tasks.discard(task_index)
+        self.archive.add(task_index, reason)
+        self.priority_index.remove(task_index)
+        self.dirty_tracker.remove(task_index, self.deadline_slots[task_index] // 24)
+    
+    def _expire_tasks(self, now):
+        """
+        Archive the live tasks whose deadline has passed by the hour slot now
+        """
+        for i in self.expiry_wheel.advance(now):
+            # Completed tasks are archived already and stay so
+            if i in self.live_tasks:
+                self._archive_task(i, EXPIRED)
     
+    @profiled()
     def check_and_adjust_working_hours(self, current_date):
         """
         Check and adjust working hours if needed
@@ -378,52 +1035,56 @@ class TaskScheduler:
         Returns:
         bool: True if adjustment was made, False otherwise
         """
-        # Filter future tasks (deadlines after current date and not completed)
-        future_tasks = [task for task in self.tasks if task['deadline'] > current_date and 
-                        float(task['duration']) - task.get('completed_work', 0) > 0]
-        
-        if not future_tasks:
+        # Check for future tasks (deadlines after current date and not completed)
+        if not self.has_future_work(current_date):
             # If no future tasks, restore standard working hours
             self.update_working_hours(19)
             return True
         
-        # Save current work end time to check if standard work time is enough
         current_work_end_hour = self.work_end_hour
+        new_end_hour = self.solve_work_end_hour(current_date)
         
-        # Temporarily set work time to standard (19:00) for calculation
-        temp_work_end_hour = 19
-        self.update_working_hours(temp_work_end_hour)
-        
-        # Check if standard work time is enough for all future tasks
-        insufficient_deadlines = self.check_time_sufficiency(future_tasks, current_date)
-        
-        if not insufficient_deadlines:
+        if new_end_hour == 19:
             # If standard work time is enough, keep 19:00 end
+            self.update_working_hours(19)
             return False
-        else:
-            # If standard work time is not enough, calculate how much extension is needed
-            # Restore previous work end time for recalculation
-            self.update_working_hours(current_work_end_hour)
-            
-            # Recalculate if time adjustment is needed under current conditions
-            insufficient_deadlines = self.check_time_sufficiency(future_tasks, current_date)
-            
-            if not insufficient_deadlines:
-                # If current time is enough (may have been extended), keep it
-                return False
-            
-            # Calculate needed new end time
-            new_end_hour = self.adjust_work_end_time(insufficient_deadlines, current_date)
-            
-            # Ensure new end time is not earlier than current end time (unless can return to 19:00)
-            if 19 < new_end_hour < current_work_end_hour:
-                new_end_hour = current_work_end_hour
-                return False
-            
-            # Update work hours
-            self.update_working_hours(new_end_hour)
-            return True
+        
+        # Ensure new end time is not earlier than current end time (unless can return to 19:00)
+        if new_end_hour <= current_work_end_hour:
+            return False
+        
+        # Update work hours
+        self.update_working_hours(new_end_hour)
+        return True
+    
+    @profiled()
+    def plan_working_hours_for_day(self, current_date):
+        """
+        Set today's work end hour at the start of a working day: standard hours
+        (9:00-19:00) if they are sufficient for all future tasks, extended otherwise
+        
+        Parameters:
+        current_date (datetime): Current datetime (start of the working day)
+        
+        Returns:
+        str: 'no_tasks', 'standard' or 'extended'
+        """
+        # Temporarily set to standard work hours (9:00-19:00)
+        self.update_working_hours(19)
+        
+        # 检查未来任务（截止日期在当前日期之后且未完成）
+        if not self.has_future_work(current_date):
+            return 'no_tasks'
+        
+        # Earliest end hour with which every future deadline can be met
+        new_end_hour = self.solve_work_end_hour(current_date)
+        if new_end_hour == 19:
+            return 'standard'
+        
+        self.update_working_hours(new_end_hour)
+        return 'extended'
     
+    @profiled()
     def update_mood_values(self):
         """
         Update mood values for tasks using the merge_mood_json function
@@ -431,22 +1092,61 @@ class TaskScheduler:
         Returns:
         bool: True if mood values were updated, False otherwise
         """
+        if self.session_log is not None and self.session_log.replaying:
+            mood_changes = self.session_log.next_event('mood')
+            if mood_changes is None:
+                print("No mood data available, using default mood values")
+                return False
+            if 'error' in mood_changes:
+                print(f"Error updating mood values: {mood_changes['error']}")
+                return False
+            for task_index, mood in mood_changes.items():
+                self._own_task(int(task_index))['mood'] = mood
+            self._moods_changed()
+            return True
+        
+        mood_changes = None
         try:
+            from audio.mood import get_mood_json
+            
             # 首先获取心情JSON数据
             mood_json, mood_conversation_thread = get_mood_json()
             
             # 然后使用merge_mood_json函数更新心情值
             if mood_json:
+                moods_before = [task.mood for task in self.tasks]
+                self._own_tasks(range(len(self.tasks)))
                 updated_tasks = merge_mood_json(self.tasks)
                 self.tasks = updated_tasks
+                mood_changes = {i: task['mood'] for i, task in enumerate(self.tasks)
+                                if task.mood != moods_before[i]}
+                self._moods_changed()
                 return True
             else:
                 print("No mood data available, using default mood values")
                 return False
         except Exception as e:
             print(f"Error updating mood values: {e}")
+            mood_changes = {'error': str(e)}
             return False
+        finally:
+            if self.session_log is not None:
+                self.session_log.append('mood', mood_changes)
     
+    def _moods_changed(self):
+        # Mood is part of the weighted score
+        if self.task_table is not None:
+            self.task_table.reload_moods(self.tasks)
+            self.task_table.recalculate_scores(self._score_weights())
+        else:
+            self.refresh_priorities()
+            self.dirty_tracker.invalidate()
+        # Archived tasks show their mood too
+        self.archive.clear_cache()
+        # Planned blocks assumed the old moods
+        self._invalidate_plan()
+    
+    @profiled()
     def get_top_urgent_tasks(self, top_n=3):
         """
         Get the top N most urgent active tasks based on weighted score of urgency, importance and mood
@@ -457,31 +1157,130 @@ class TaskScheduler:
         Returns:
         list: List of tuples (task_index, task_dict) or empty list if no active tasks
         """
-        active_tasks = []
-        for i, task in enumerate(self.tasks):
-            # If current time is before deadline and task is not completed
-            if (self.current_date < task['deadline'] and 
-                float(task['duration']) - task.get('completed_work', 0) > 0):
-                active_tasks.append((i, task))
+        if self.task_table is not None:
+            top_indices = self.task_table.top_k(top_n, self.time_axis.to_slot(self.current_date))
+            self._own_tasks(top_indices)
+            self.task_table.export(self.tasks, top_indices)
+        else:
+            now = self.time_axis.to_slot(self.current_date)
+            top_indices = self.priority_index.top_k(top_n, lambda i: self._is_active_task(i, now))
+        return [(i, self.tasks[i]) for i in top_indices]
+    
+    @profiled()
+    def get_recommended_tasks(self, top_n=3, session_hours=2):
+        """
+        Get the suggested tasks for the current work block: from the precomputed
+        plan if enabled (re-planning only the remaining blocks when the plan no
+        longer matches), otherwise ranked now as in get_top_urgent_tasks
         
-        if not active_tasks:
-            return []
-            
-        # Calculate weighted score for each task
-        for i, task in active_tasks:
-            urgency = task['urgency']
-            importance = float(task.get('importance', 5))  # Default to 5 if not provided
-            mood = float(task.get('mood', 5))  # Default to 5 if not provided
-            
-            # 使用实例变量中存储的权重值
-            weighted_score = (self.urgency_weight * urgency/10 + 
-                             self.importance_weight * importance + 
-                             self.mood_weight * mood)
-            task['weighted_score'] = weighted_score
+        Parameters:
+        top_n (int): Number of suggested tasks
+        session_hours (int): Length of one work block
+        
+        Returns:
+        list: List of tuples (task_index, task_dict) or empty list if no active tasks
+        """
+        if self.day_plan is None:
+            return self.get_top_urgent_tasks(top_n)
+        
+        top_indices = self.day_plan.recommend(self, top_n, session_hours)
+        if self.task_table is not None:
+            self._own_tasks(top_indices)
+            self.task_table.export(self.tasks, top_indices)
+        return [(i, self.tasks[i]) for i in top_indices]
+    
+    def _record_choice(self, task_index):
+        """
+        Tell the plan which task is worked on in the current block
+        """
+        if self.day_plan is not None:
+            self.day_plan.record(self.current_date, task_index)
+    
+    def _invalidate_plan(self):
+        if self.day_plan is not None:
+            self.day_plan.invalidate()
+    
+    def calculate_weighted_score(self, task):
+        """
+        Calculate the weighted score of urgency, importance and mood for a task
+        
+        Parameters:
+        task (Task): Task with an up-to-date urgency
+        
+        Returns:
+        float: Weighted score
+        """
+        # 使用实例变量中存储的权重值 (importance and mood default to 5 at load time)
+        return self.ranking_policy.scalar(task.urgency, task.importance, task.mood, self._score_weights())
+    
+    def _new_task_table(self):
+        return TaskTable(self.tasks, self.time_axis, self.urgency_policy, self.ranking_policy)
+    
+    def _score_weights(self):
+        """
+        Get the (urgency, importance, mood) weights as a tuple
+        """
+        return (self.urgency_weight, self.importance_weight, self.mood_weight)
+    
+    def _sync_task_dicts(self):
+        """
+        Write fields computed by the task table back into the task dicts
+        """
+        if self.task_table is not None and self._task_dicts_stale:
+            self._own_tasks(range(len(self.tasks)))
+            self.task_table.export(self.tasks)
+            self._task_dicts_stale = False
+    
+    def _own_task(self, task_index):
+        """
+        Get a task for changing it, copying it first if its record is still
+        shared with a fork or the scheduler this one was forked from
+        """
+        task = self.tasks[task_index]
+        if task_index in self._shared_tasks:
+            self._shared_tasks.discard(task_index)
+            task = self.tasks[task_index] = task.clone()
+        return task
+    
+    def _own_tasks(self, task_indices):
+        """
+        _own_task for several tasks
+        """
+        if self._shared_tasks:
+            for i in task_indices:
+                self._own_task(i)
+    
+    def _is_active_task(self, task_index, now):
+        """
+        Check if a task is before its deadline (now is the current hour slot) and not completed
+        """
+        task = self.tasks[task_index]
+        return now < self.deadline_slots[task_index] and task.duration - task.completed_work > 0
+    
+    def _refresh_priority(self, task_index):
+        """
+        Recompute a task's weighted score and update the priority index
         
-        # Sort by weighted score and return top N
-        active_tasks.sort(key=lambda x: x[1]['weighted_score'], reverse=True)
-        return active_tasks[:min(top_n, len(active_tasks))]
+        Parameters:
+        task_index (int): Index of the task in the tasks list
+        """
+        task = self.tasks[task_index]
+        if task.duration - task.completed_work > 0:
+            task.weighted_score = self.calculate_weighted_score(task)
+            self.priority_index.update(task_index, task.weighted_score)
+        else:
+            # Completed tasks never come back
+            self.priority_index.remove(task_index)
+    
+    def refresh_priorities(self):
+        """
+        Recompute the weighted score of every indexed task, e.g. after mood or weight changes
+        """
+        now = self.time_axis.to_slot(self.current_date)
+        for i in list(self.priority_index):
+            if self._is_active_task(i, now):
+                self._own_task(i)
+                self._refresh_priority(i)
     
     def get_most_urgent_task(self):
         """
@@ -495,6 +1294,7 @@ class TaskScheduler:
             return None, None
         return top_tasks[0]
     
+    @profiled()
     def work_on_task(self, task_index, hours=2):
         """
         Work on a task for specified hours
@@ -509,29 +1309,83 @@ class TaskScheduler:
         if task_index is None or task_index >= len(self.tasks):
             return None
             
-        task = self.tasks[task_index]
-        task['completed_work'] = task.get('completed_work', 0) + hours
+        task = self._own_task(task_index)
+        task.completed_work += hours
         
         # Update status after processing
-        duration = float(task['duration'])
-        time_to_deadline = self.calculate_available_working_hours(self.current_date, task['deadline'])
-        duration_left = max(0, duration - task['completed_work'])
+        self.deadline_index.update_remaining(task_index, task.duration - task.completed_work)
+        time_to_deadline = self._available_hours(self.time_axis.to_slot(self.current_date),
+                                                 self.deadline_slots[task_index] // 24)
+        duration_left = max(0, task.duration - task.completed_work)
+        
+        # Track work past the standard end of day and when each task was finished
+        session_start = self.current_date.hour + self.current_date.minute / 60
+        self.overtime_hours += max(0, min(session_start + hours, 24) - max(session_start, WORK_END_HOUR))
+        if duration_left <= 0 and task_index not in self.completion_times:
+            self.completion_times[task_index] = self.current_date + timedelta(hours=hours)
         
         # Update task fields
-        task['duration_left'] = duration_left
-        task['time_to_deadline'] = time_to_deadline
-        
-        # Recalculate urgency with new formula
-        if time_to_deadline <= 0:
-            urgency = 100  # Past deadline
-        elif duration_left <= 0:
-            urgency = 0    # Task completed
+        task.duration_left = duration_left
+        task.time_to_deadline = time_to_deadline
+        
+        # Recalculate urgency
+        urgency = self.urgency_policy.scalar(duration_left, time_to_deadline)
+        
+        task.urgency = urgency
+        if self.task_table is not None:
+            self.task_table.update_row(task_index, task.completed_work, time_to_deadline,
+                                       urgency, self._score_weights())
         else:
-            # New urgency formula: 100 * (duration_left / (time_to_deadline + duration_left)) * (1 + duration_left)
-            urgency = 100 * (duration_left / (time_to_deadline + duration_left)) * (1 + 1/duration_left)
+            self._refresh_priority(task_index)
+            self.dirty_tracker.mark(task_index)
+        if duration_left <= 0 and task_index in self.live_tasks:
+            self._archive_task(task_index, COMPLETED)
+        
+        return task
+    
+    def set_task_duration(self, task_index, duration):
+        """
+        Change the estimated duration of a task, e.g. when it turns out to take longer
+        
+        A completed task with work left again is reopened; a task whose deadline
+        has passed stays missed.
         
-        task['urgency'] = urgency
+        Parameters:
+        task_index (int): Index of the task in the tasks list
+        duration (float): New total duration in hours
         
+        Returns:
+        Task: Updated task
+        """
+        self._sync_task_dicts()
+        task = self._own_task(task_index)
+        task['duration'] = duration
+        remaining = task.duration - task.completed_work
+        self.deadline_index.update_remaining(task_index, remaining)
+        if remaining > 0:
+            self.completion_times.pop(task_index, None)
+        
+        if task_index in self.live_tasks:
+            if remaining > 0:
+                # Rescored by the next recalculation, like a task that was worked on
+                self.dirty_tracker.mark(task_index)
+            else:
+                # Already done by the new estimate
+                task.time_to_deadline = self._available_hours(self.time_axis.to_slot(self.current_date),
+                                                              self.deadline_slots[task_index] // 24)
+                task.duration_left = 0
+                task.urgency = self.urgency_policy.scalar(0, task.time_to_deadline)
+                self._archive_task(task_index, COMPLETED)
+        elif remaining > 0 and self.archive.reasons[task_index] == COMPLETED:
+            # Reopened: rebuild the live set and rescore every task
+            self._index_live_tasks()
+            self.dirty_tracker.invalidate()
+        else:
+            # Still archived, but its cached output shows the old duration
+            self.archive.clear_cache()
+        if self.task_table is not None:
+            self.task_table = self._new_task_table()
+        self._invalidate_plan()
         return task
     
     def advance_time(self, hours=2):
@@ -560,22 +1414,37 @@ class TaskScheduler:
         Parameters:
         filename (str): Output file name
         """
-        final_tasks = []
-        for task in self.tasks:
-            task_copy = task.copy()
-            # Convert datetime objects to strings
-            if 'deadline' in task_copy:
-                task_copy['deadline'] = task_copy['deadline'].strftime("%Y-%m-%d %H:%M")
-            # 确保最终结果中包含心情值
-            if 'mood' not in task_copy:
-                task_copy['mood'] = 5
-            final_tasks.append(task_copy)
+        self._sync_task_dicts()
+        
+        # 确保最终结果中包含心情值
+        final_tasks = self._serialize_tasks()
         
         with open(filename, 'w') as f:
             json.dump(final_tasks, f, indent=4)
         
         return filename
     
+    def get_run_summary(self):
+        """
+        Summarize the outcome of a simulation run
+        
+        Returns:
+        dict: Task counts, missed deadlines, overtime hours and completion times
+              (hours since start_date)
+        """
+        completion_hours = [(finished_at - self.start_date).total_seconds() / 3600
+                            for finished_at in self.completion_times.values()]
+        completed = sum(1 for task in self.tasks if task.duration - task.completed_work <= 0)
+        return {
+            'tasks': len(self.tasks),
+            'completed': completed,
+            'missed_deadlines': len(self.tasks) - completed,
+            'overtime_hours': self.overtime_hours,
+            'mean_completion_hours': sum(completion_hours) / len(completion_hours) if completion_hours else None,
+            'last_completion_hours': max(completion_hours) if completion_hours else None,
+            'finished_at': self.current_date.strftime('%Y-%m-%d %H:%M')
+        }
+    
     def get_task_status(self):
         """
         Get status of all tasks
@@ -583,143 +1452,352 @@ class TaskScheduler:
         Returns:
         list: List of task status dictionaries
         """
-        status_list = []
-        for i, task in enumerate(self.tasks):
-            duration = float(task['duration'])
-            completed_work = task.get('completed_work', 0)
-            duration_left = task.get('duration_left', max(0, duration - completed_work))
-            urgency = task.get('urgency', 0)
+        self._sync_task_dicts()
+        
+        archive = self.archive
+        build_status = self._task_status
+        return [archive.status(i, build_status) if i in archive else build_status(i)
+                for i in range(len(self.tasks))]
+    
+    def _task_status(self, task_index):
+        """
+        Build the status dictionary of one task (see get_task_status)
+        """
+        task = self.tasks[task_index]
+        duration = task.duration
+        completed_work = task.completed_work
+        duration_left = task.get('duration_left', max(0, duration - completed_work))
+        urgency = task.get('urgency', 0)
+        
+        return {
+            'index': task_index,
+            'name': task.get('name', task.get('assignment_name', 'Unnamed Task')),
+            'duration': duration,
+            'completed_work': completed_work,
+            'duration_left': duration_left,
+            'urgency': urgency,
+            'deadline': task.deadline.strftime('%Y-%m-%d %H:%M'),
+            'is_completed': duration_left <= 0
+        }
+    
+    def run_headless(self, policy=None, stop_condition=None, top_n=3, session_hours=2,
+                     max_steps=None, update_mood=False, save_snapshots=False, results_file=None):
+        """
+        Run the task scheduling simulation without user input, console output or
+        LLM explanations
+        
+        Parameters:
+        policy (callable): policy(scheduler, top_tasks) -> position in top_tasks to work on;
+                           defaults to the most urgent task (same as pressing Enter)
+        stop_condition (callable): stop_condition(scheduler) -> True to stop after a session
+        top_n (int): Number of suggested tasks the policy chooses from
+        session_hours (int): Length of one work session
+        max_steps (int): Maximum number of work sessions (None for no limit)
+        update_mood (bool): Capture mood every morning (needs audio devices)
+        save_snapshots (bool): Save a task snapshot before every session
+        results_file (str): Save final results to this file if given
+        
+        Returns:
+        list: List of task status dictionaries
+        """
+        self._run_sessions(policy, stop_condition, top_n, session_hours, max_steps, update_mood,
+                           save_snapshots)
+        
+        if results_file:
+            self.save_results(results_file)
+        self.close_snapshots()
+        
+        return self.get_task_status()
+    
+    def _run_sessions(self, policy=None, stop_condition=None, top_n=3, session_hours=2, max_steps=None,
+                      update_mood=False, save_snapshots=False, until=None, day_started=False):
+        """
+        Session loop of run_headless (also used to simulate ahead, see scheduling.day_plan)
+        
+        Parameters:
+        policy, stop_condition, top_n, session_hours, max_steps, update_mood,
+        save_snapshots: See run_headless
+        until (datetime): Stop before the first session starting at or after this time
+        day_started (bool): The current working day has been started already (no
+                            start-of-day step for a first session at the start hour)
+        """
+        day_start = self.current_date if day_started else None
+        steps = 0
+        
+        # 确保当前时间在工作时间内
+        self.current_date = self.get_next_working_time(self.current_date)
+        
+        while max_steps is None or steps < max_steps:
+            if until is not None and self.current_date >= until:
+                break
+            if not self.is_working_hours(self.current_date):
+                # Not during working hours, skip to next working time
+                self.current_date = self.get_next_working_time(self.current_date)
+                continue
+            
+            # 每天9:00调整工作时间
+            if (self.current_date.hour == 9 and self.current_date.minute == 0
+                    and self.current_date != day_start):
+                self._start_working_day(update_mood)
             
-            status = {
-                'index': i,
-                'name': task.get('name', task.get('assignment_name', 'Unnamed Task')),
-                'duration': duration,
-                'completed_work': completed_work,
-                'duration_left': duration_left,
-                'urgency': urgency,
-                'deadline': task['deadline'].strftime('%Y-%m-%d %H:%M'),
-                'is_completed': duration_left <= 0
-            }
-            status_list.append(status)
-        
-        return status_list
-    
-    def run_simulation(self):
+            # No work during lectures and other busy hours
+            if self._skip_busy_time():
+                continue
+            
+            # Update status and urgency of all uncompleted tasks
+            self.recalculate_all_tasks(self.current_date)
+            top_urgent_tasks = self.get_recommended_tasks(top_n, session_hours)
+            
+            # If no active tasks, end simulation
+            if not top_urgent_tasks:
+                break
+            
+            if save_snapshots:
+                self.save_tasks_snapshot(self.current_date)
+            
+            task_idx, selected_task = self._choose_task(policy, top_urgent_tasks)
+            self._record_choice(task_idx)
+            hours = self._session_length(session_hours)
+            self.work_on_task(task_idx, hours)
+            steps += 1
+            
+            if stop_condition is not None and stop_condition(self):
+                break
+            
+            self.advance_time(hours)
+    
+    def run_event_driven(self, policy=None, stop_condition=None, top_n=3, session_hours=None,
+                         max_events=None, update_mood=False):
+        """
+        Run the simulation as a discrete-event engine: the chosen task is worked
+        on until the next event, and the clock jumps straight there
+        
+        Events are the completion of the task being worked on, the deadline of
+        any live task, the end of the working day, the start of a busy hour and,
+        if session_hours is given, the end of a session of that length. The start
+        of every working day is a decision point too (work-hour plan and mood
+        update). The work done between two events is credited in one
+        work_on_task call, so a run costs time proportional to the number of
+        events rather than the number of hours; off-hours and runs of busy hours
+        are jumped over in one step.
+        
+        This is a different model from run_headless, which re-decides every
+        session_hours even if nothing happened: here a task is kept until
+        something changes, so the policy is consulted less often.
+        
+        Parameters:
+        policy (callable): policy(scheduler, top_tasks) -> position in top_tasks to work on
+        stop_condition (callable): stop_condition(scheduler) -> True to stop after an event
+        top_n (int): Number of suggested tasks the policy chooses from
+        session_hours (float): Longest stretch of work on one task (None for no limit)
+        max_events (int): Maximum number of work stretches (None for no limit)
+        update_mood (bool): Capture mood at the start of every working day
+        
+        Returns:
+        list: List of task status dictionaries
+        """
+        events = 0
+        self.current_date = self.get_next_working_time(self.current_date)
+        
+        while max_events is None or events < max_events:
+            if not self.is_working_hours(self.current_date):
+                # Working-day boundary: jump over the off-hours in one step
+                self.current_date = self.get_next_working_time(self.current_date)
+                continue
+            
+            if self.current_date.hour == self.work_start_hour and self.current_date.minute == 0:
+                self._start_working_day(update_mood)
+            
+            if self.calendar and self.calendar.is_busy(self.current_date):
+                # Jump to the end of the busy run (or of the working day)
+                busy_end = self.current_date + timedelta(hours=1)
+                while self.is_working_hours(busy_end) and self.calendar.is_busy(busy_end):
+                    busy_end += timedelta(hours=1)
+                self.advance_time((busy_end - self.current_date).total_seconds() / 3600)
+                continue
+            
+            self.recalculate_all_tasks(self.current_date)
+            top_urgent_tasks = self.get_recommended_tasks(top_n, session_hours or 2)
+            if not top_urgent_tasks:
+                break
+            
+            task_idx, selected_task = self._choose_task(policy, top_urgent_tasks)
+            self._record_choice(task_idx)
+            
+            # Work on the chosen task until the next event
+            hours = self._hours_to_next_event(task_idx, session_hours)
+            self.work_on_task(task_idx, hours)
+            events += 1
+            
+            if stop_condition is not None and stop_condition(self):
+                break
+            
+            self.advance_time(hours)
+        
+        return self.get_task_status()
+    
+    def _hours_to_next_event(self, task_index, session_hours=None):
+        """
+        Get how long a task can be worked on from now until the next event (see
+        run_event_driven)
+        
+        Parameters:
+        task_index (int): Index of the task to work on
+        session_hours (float): Longest stretch of work (None for no limit)
+        
+        Returns:
+        float: Hours until the next event (an int if whole)
+        """
+        task = self.tasks[task_index]
+        into_hour = self.current_date.minute / 60
+        # Completion of the task and the end of the working day
+        hours = min(task.duration - task.completed_work,
+                    self.work_end_hour - self.current_date.hour - into_hour)
+        if session_hours is not None:
+            hours = min(hours, session_hours)
+        # The next deadline of a live task (deadlines fall on the hour)
+        now = self.time_axis.to_slot(self.current_date)
+        live = self.live_tasks
+        for slot, due in self.expiry_wheel.expiring_before(now + math.ceil(into_hour + hours)):
+            if any(i in live for i in due):
+                hours = min(hours, slot - now - into_hour)
+                break
+        # The next busy hour
+        hours = self._session_length(hours)
+        return int(hours) if float(hours).is_integer() else hours
+    
+    def _start_working_day(self, update_mood=False):
+        """
+        Start-of-day step for non-interactive runs: optional mood capture and the
+        work-hour check
+        """
+        if update_mood:
+            self.update_mood_values()
+        self.plan_working_hours_for_day(self.current_date)
+    
+    def _choose_task(self, policy, top_urgent_tasks):
+        """
+        Pick a task from the top list with a policy, defaulting to the most urgent
+        one if there is no policy or its choice is not valid
+        
+        Returns:
+        tuple: (task_index, task_dict)
+        """
+        selected_idx = policy(self, top_urgent_tasks) if policy else 0
+        if not isinstance(selected_idx, int) or not 0 <= selected_idx < len(top_urgent_tasks):
+            selected_idx = 0
+        return top_urgent_tasks[selected_idx]
+    
+    def run_simulation(self, interactive=True, policy=None, stop_condition=None, output_level=None):
         """
         Run the full task scheduling simulation
+        
+        Parameters:
+        interactive (bool): Ask the user for choices; if False, run headless (see run_headless)
+        policy (callable): Task choice policy for headless runs
+        stop_condition (callable): Stop condition for headless runs
+        output_level (str): Console output of this run: "quiet", "summary" or "verbose"
+                            (default: the output_level the scheduler was created with)
         """
+        if not interactive:
+            return self.run_headless(policy=policy, stop_condition=stop_condition)
+        if output_level is not None:
+            self.renderer = ConsoleRenderer(output_level)
+        
         continue_simulation = True
         first_iteration = True
+        out = self.renderer
         
         # 确保当前时间在工作时间内
         self.current_date = self.get_next_working_time(self.current_date)
-        print(f"{Colors.BOLD}{Colors.GREEN}Adjusted start time: {self.current_date.strftime('%Y-%m-%d %H:%M')}{Colors.RESET}")
+        out.write(f"{Colors.BOLD}{Colors.GREEN}Adjusted start time: {self.current_date.strftime('%Y-%m-%d %H:%M')}{Colors.RESET}")
         
-        print(f"\n{Colors.BOLD}{Colors.BLUE}Program starting, work schedule will be checked at the first 9:00 AM...{Colors.RESET}")
+        out.write(f"\n{Colors.BOLD}{Colors.BLUE}Program starting, work schedule will be checked at the first 9:00 AM...{Colors.RESET}")
         
         while continue_simulation:
             # 检查是否在工作时间内
             if self.is_working_hours(self.current_date):
-                print(f"\n{Colors.BOLD}{Colors.CYAN}Current time point: {self.current_date.strftime('%Y-%m-%d %H:%M')}{Colors.RESET}")
+                out.write(f"\n{Colors.BOLD}{Colors.CYAN}Current time point: {self.current_date.strftime('%Y-%m-%d %H:%M')}{Colors.RESET}", QUIET)
                 
                 # 检查是否是新的一天的9:00（每天9:00调整工作时间）
                 if self.current_date.hour == 9 and self.current_date.minute == 0:
-                    print(f"\n{Colors.BOLD}{Colors.YELLOW}New day begins, checking today's work hour arrangement...{Colors.RESET}")
+                    out.write(f"\n{Colors.BOLD}{Colors.YELLOW}New day begins, checking today's work hour arrangement...{Colors.RESET}")
                     
                     # 在这里添加心情更新 - 每天早上9:00更新一次
+                    # (mood capture prints directly, so buffered output goes first)
+                    self._flush_console()
                     self.update_mood_values()
-                    print(f"{Colors.GREEN}Updated mood values for today's tasks{Colors.RESET}")
-                    
-                    # 过滤未来任务（截止日期在当前日期之后且未完成）
-                    future_tasks = [task for task in self.tasks if task['deadline'] > self.current_date and 
-                                    float(task['duration']) - task.get('completed_work', 0) > 0]
+                    out.write(f"{Colors.GREEN}Updated mood values for today's tasks{Colors.RESET}")
                     
-                    if not future_tasks:
-                        print("No tasks to complete, using standard work hours (9:00-19:00)")
-                        self.update_working_hours(19)
+                    # 检查未来任务并调整今天的工作时间
+                    day_plan = self.plan_working_hours_for_day(self.current_date)
+                    if day_plan == 'no_tasks':
+                        out.write("No tasks to complete, using standard work hours (9:00-19:00)")
+                    elif day_plan == 'standard':
+                        out.write("Checking if all tasks can be completed within standard work hours (9:00-19:00)...", VERBOSE)
+                        out.write("Starting today, can restore standard work hours (9:00-19:00), task progress is good")
                     else:
-                        # Save current work end time
-                        current_end_hour = self.work_end_hour
-                        
-                        # Temporarily set to standard work hours (9:00-19:00)
-                        self.update_working_hours(19)
-                        print("Checking if all tasks can be completed within standard work hours (9:00-19:00)...")
-                        
-                        # Check if standard work hours are sufficient
-                        insufficient_deadlines = self.check_time_sufficiency(future_tasks, self.current_date)
-                        
-                        if not insufficient_deadlines:
-                            print("Starting today, can restore standard work hours (9:00-19:00), task progress is good")
-                            # Already set to 19:00, no need to change
-                        else:
-                            print("Standard work hours are not sufficient to complete all tasks, need to extend work hours")
-                            # Calculate needed new end time
-                            new_end_hour = self.adjust_work_end_time(insufficient_deadlines, self.current_date)
-                            self.update_working_hours(new_end_hour)
-                            print(f"Work hours adjusted to {self.work_start_hour}:00-{self.work_end_hour}:00")
+                        out.write("Checking if all tasks can be completed within standard work hours (9:00-19:00)...", VERBOSE)
+                        out.write("Standard work hours are not sufficient to complete all tasks, need to extend work hours")
+                        out.write(f"Work hours adjusted to {self.work_start_hour}:00-{self.work_end_hour}:00", QUIET)
                     
                     # Recalculate all tasks' time (because work hours may have changed)
                     self.recalculate_all_tasks(self.current_date)
                 
+                if self.calendar.is_busy(self.current_date):
+                    out.write(f"{Colors.YELLOW}Busy (lecture or other commitment) at {self.current_date.strftime('%H:%M')}, skipping this hour{Colors.RESET}")
+                    self.advance_time(1)
+                    continue
+                
                 # Update status and urgency of all uncompleted tasks
                 self.recalculate_all_tasks(self.current_date)
                 
                 # Get top 3 most urgent tasks
-                top_urgent_tasks = self.get_top_urgent_tasks(3)
+                top_urgent_tasks = self.get_recommended_tasks(3)
                 
                 # If no active tasks, end simulation
                 if not top_urgent_tasks:
-                    print("All tasks completed or deadline reached, ending simulation.")
+                    out.write("All tasks completed or deadline reached, ending simulation.", QUIET)
                     break
                 
-                # Display status of all tasks
-                print(f"\n{Colors.BOLD}{Colors.MAGENTA}Current task status:{Colors.RESET}")
-                for task_status in self.get_task_status():
-                    if not task_status['is_completed']:
-                        i = task_status['index']
-                        print(f"{Colors.CYAN}Task {i+1}: {task_status['name']}{Colors.RESET}")
-                        print(f"  Accumulated work time: {task_status['completed_work']} hours")
-                        print(f"  Remaining work time: {Colors.YELLOW}{task_status['duration_left']} hours{Colors.RESET}")
-                        print(f"  Effective work time before deadline: {self.tasks[i].get('time_to_deadline', 0):.2f} hours")
-                        
-                        # 根据紧急程度使用不同颜色
-                        urgency = task_status['urgency']
-                        if urgency > 70:
-                            urgency_color = Colors.RED
-                        elif urgency > 40:
-                            urgency_color = Colors.YELLOW
-                        else:
-                            urgency_color = Colors.GREEN
-                        
-                        print(f"  Urgency: {urgency_color}{task_status['urgency']:.2f}%{Colors.RESET}")
+                if self.day_plan is not None and self.current_date.hour == 9 and self.current_date.minute == 0:
+                    out.write(f"\n{Colors.BOLD}{Colors.BLUE}Planned work blocks:{Colors.RESET}")
+                    for block in self.day_plan.upcoming():
+                        block_end = block.start + timedelta(hours=2)
+                        out.write(f"  {block.start.strftime('%m-%d %H:%M')}-{block_end.strftime('%H:%M')}  "
+                                  f"Task {block.ranking[0]+1}: {task_name(self.tasks[block.ranking[0]])}")
+                
+                # Display status of all tasks (only what changed since the last step)
+                with self.profiler.phase("console"):
+                    if out.shows(SUMMARY):
+                        out.task_status(self.get_task_status(), self.tasks)
                 
                 # Save current status to JSON file
                 snapshot_file = self.save_tasks_snapshot(self.current_date)
-                print(f"Saved task snapshot to: {snapshot_file}")
+                out.write(f"Saved task snapshot to: {snapshot_file}", VERBOSE)
                 
                 # Display top 3 suggestions based on weighted score
-                print(f"\n{Colors.BOLD}{Colors.GREEN}Top 3 suggested tasks based on weighted score:{Colors.RESET}")
-                for i, (task_idx, task) in enumerate(top_urgent_tasks):
-                    print(f"{Colors.BOLD}{i+1}. Task {task_idx+1}: {task.get('name', task.get('assignment_name', 'Unnamed Task'))}{Colors.RESET}")
-                    print(f"   Weighted Score: {Colors.CYAN}{task['weighted_score']:.2f}{Colors.RESET}")
-                    print(f"   Urgency: {Colors.YELLOW}{task['urgency']:.2f}%{Colors.RESET}")
-                    print(f"   Importance: {task.get('importance', 5)}")
-                    print(f"   Mood: {Colors.MAGENTA}{task.get('mood', 5)}{Colors.RESET}")
-                    print(f"   Remaining work: {task.get('duration_left', 0)} hours")
-                    print(f"   Deadline: {task['deadline'].strftime('%Y-%m-%d %H:%M')}")
+                with self.profiler.phase("console"):
+                    out.suggestions(top_urgent_tasks)
                 
                 # 使用explain_priority函数提供详细解释
-                try:
-                    print(f"\n{Colors.BOLD}{Colors.BLUE}Why these tasks are prioritized:{Colors.RESET}")
-                    explanation = explain_priority(snapshot_file)
-                    print(f"{Colors.YELLOW}{explanation}{Colors.RESET}")
-                except Exception as e:
-                    print(f"{Colors.RED}无法生成任务优先级解释: {str(e)}{Colors.RESET}")
+                self._flush_console()
+                with self.profiler.phase("explain_priority"):
+                    try:
+                        out.write(f"\n{Colors.BOLD}{Colors.BLUE}Why these tasks are prioritized:{Colors.RESET}")
+                        explanation = self._explain_priority(snapshot_file)
+                        out.write(f"{Colors.YELLOW}{explanation}{Colors.RESET}")
+                    except Exception as e:
+                        out.write(f"{Colors.RED}无法生成任务优先级解释: {str(e)}{Colors.RESET}")
+                
+                # A session ends early at the next busy hour
+                hours = self._session_length(2)
                 
                 if first_iteration:
                     # First iteration, ask user to choose which task to work on
-                    print(f"\n{Colors.BOLD}{Colors.BLUE}Which task would you like to work on for the next 2 hours? (Enter 1-3, or press Enter for the most urgent):{Colors.RESET}")
-                    user_choice = input().strip()
+                    out.write(f"\n{Colors.BOLD}{Colors.BLUE}Which task would you like to work on for the next {hours:g} hours? (Enter 1-3, or press Enter for the most urgent):{Colors.RESET}", QUIET)
+                    with self.profiler.phase("user_input"):
+                        user_choice = self._prompt().strip()
                     
                     # Default to most urgent if no input
                     selected_idx = 0
@@ -732,18 +1810,21 @@ class TaskScheduler:
                     task_idx, selected_task = top_urgent_tasks[selected_idx]
                     
                     # Work on selected task
-                    self.work_on_task(task_idx, 2)
+                    self._record_choice(task_idx)
+                    selected_task = self.work_on_task(task_idx, hours)
                     
-                    print(f"\n{Colors.GREEN}Will begin processing task: {selected_task.get('name', selected_task.get('assignment_name', 'Unnamed Task'))}{Colors.RESET}")
-                    print(f"\n{Colors.GREEN}Completed 2 hours of work on this task from 09:00-11:00{Colors.RESET}")
-                    print(f"  Accumulated work time: {selected_task['completed_work']} hours")
-                    print(f"  Remaining work time: {selected_task['duration_left']} hours")
-                    print(f"  Effective work time before deadline: {selected_task['time_to_deadline']:.2f} hours")
+                    out.write(f"\n{Colors.GREEN}Will begin processing task: {task_name(selected_task)}{Colors.RESET}")
+                    session_end = self.current_date + timedelta(hours=hours)
+                    out.write(f"\n{Colors.GREEN}Completed {hours:g} hours of work on this task from {self.current_date.strftime('%H:%M')}-{session_end.strftime('%H:%M')}{Colors.RESET}")
+                    out.write(f"  Accumulated work time: {selected_task['completed_work']} hours", VERBOSE)
+                    out.write(f"  Remaining work time: {selected_task['duration_left']} hours", VERBOSE)
+                    out.write(f"  Effective work time before deadline: {selected_task['time_to_deadline']:.2f} hours", VERBOSE)
                     first_iteration = False
                 else:
                     # Normal processing - ask user to choose which task to work on
-                    print(f"\n{Colors.BOLD}{Colors.BLUE}Which task would you like to work on for the next 2 hours? (Enter 1-3, or press Enter for the most urgent):{Colors.RESET}")
-                    user_choice = input().strip()
+                    out.write(f"\n{Colors.BOLD}{Colors.BLUE}Which task would you like to work on for the next {hours:g} hours? (Enter 1-3, or press Enter for the most urgent):{Colors.RESET}", QUIET)
+                    with self.profiler.phase("user_input"):
+                        user_choice = self._prompt().strip()
                     
                     # Default to most urgent if no input
                     selected_idx = 0
@@ -756,63 +1837,111 @@ class TaskScheduler:
                     task_idx, selected_task = top_urgent_tasks[selected_idx]
                     
                     # Work on selected task
-                    self.work_on_task(task_idx, 2)
+                    self._record_choice(task_idx)
+                    selected_task = self.work_on_task(task_idx, hours)
                     
-                    print(f"\n{Colors.GREEN}Completed 2 hours of work on task: {selected_task.get('name', selected_task.get('assignment_name', 'Unnamed Task'))}{Colors.RESET}")
-                    print(f"  Accumulated work time: {selected_task['completed_work']} hours")
-                    print(f"  Remaining work time: {selected_task['duration_left']} hours")
-                    print(f"  Effective work time before deadline: {selected_task['time_to_deadline']:.2f} hours")
+                    out.write(f"\n{Colors.GREEN}Completed {hours:g} hours of work on task: {task_name(selected_task)}{Colors.RESET}")
+                    out.write(f"  Accumulated work time: {selected_task['completed_work']} hours", VERBOSE)
+                    out.write(f"  Remaining work time: {selected_task['duration_left']} hours", VERBOSE)
+                    out.write(f"  Effective work time before deadline: {selected_task['time_to_deadline']:.2f} hours", VERBOSE)
                 
                 # Ask user whether to continue
                 # print(f"\nCurrent time: {self.current_date.strftime('%Y-%m-%d %H:%M')}")
                 if first_iteration:
-                    print("Ready to start work. Press Enter to continue, enter 'stop' to stop...")
+                    out.write("Ready to start work. Press Enter to continue, enter 'stop' to stop...", QUIET)
                 else:
-                    print("Two hours have passed. Press Enter to continue, enter 'stop' to stop...")
-                user_input = input()
+                    out.write(f"{hours:g} hours have passed. Press Enter to continue, enter 'stop' to stop...", QUIET)
+                with self.profiler.phase("user_input"):
+                    user_input = self._prompt()
                 
                 if user_input.lower() == 'stop':
-                    print("User chose to stop")
+                    out.write("User chose to stop", QUIET)
                     continue_simulation = False
                     break
                 
-                # Advance 2 hours
+                # Advance to the end of the session
                 old_date = self.current_date
-                self.advance_time(2)
-                print(f"Time advances: {old_date.strftime('%H:%M')} -> {self.current_date.strftime('%H:%M')}")
+                self.advance_time(hours)
+                out.write(f"Time advances: {old_date.strftime('%H:%M')} -> {self.current_date.strftime('%H:%M')}", VERBOSE)
                 
                 # Print separator
-                print(f"\n{Colors.BOLD}{Colors.BACKGROUND_BLUE}{Colors.WHITE}" + "#" * 50 + f"{Colors.RESET}")
+                out.write(f"\n{Colors.BOLD}{Colors.BACKGROUND_BLUE}{Colors.WHITE}" + "#" * 50 + f"{Colors.RESET}")
             else:
                 # Not during working hours, skip to next working time
                 old_date = self.current_date
                 self.current_date = self.get_next_working_time(self.current_date)
-                print(f"Not during working hours, adjusted to: {old_date.strftime('%Y-%m-%d %H:%M')} -> {self.current_date.strftime('%Y-%m-%d %H:%M')}")
+                out.write(f"Not during working hours, adjusted to: {old_date.strftime('%Y-%m-%d %H:%M')} -> {self.current_date.strftime('%Y-%m-%d %H:%M')}", VERBOSE)
                 
                 # Print separator
-                print(f"\n{Colors.BOLD}{Colors.BACKGROUND_BLUE}{Colors.WHITE}" + "#" * 50 + f"{Colors.RESET}")
+                out.write(f"\n{Colors.BOLD}{Colors.BACKGROUND_BLUE}{Colors.WHITE}" + "#" * 50 + f"{Colors.RESET}", VERBOSE)
+            
+            # One terminal write per step
+            self._flush_console()
         
         # Display final results for all tasks
-        print("\nFinal results for all tasks:")
-        for task_status in self.get_task_status():
-            i = task_status['index']
-            print(f"\nTask {i+1}:")
-            print(f"Task name: {task_status['name']}")
-            print(f"Duration: {task_status['duration']} hours")
-            print(f"Completed time: {task_status['completed_work']} hours")
-            print(f"Remaining work time: {task_status['duration_left']} hours")
-            print(f"Urgency: {task_status['urgency']:.2f}%")
-            print(f"Deadline: {task_status['deadline']}")
+        if out.shows(VERBOSE):
+            out.write("\nFinal results for all tasks:", VERBOSE)
+            for task_status in self.get_task_status():
+                i = task_status['index']
+                out.write(f"\nTask {i+1}:", VERBOSE)
+                out.write(f"Task name: {task_status['name']}", VERBOSE)
+                out.write(f"Duration: {task_status['duration']} hours", VERBOSE)
+                out.write(f"Completed time: {task_status['completed_work']} hours", VERBOSE)
+                out.write(f"Remaining work time: {task_status['duration_left']} hours", VERBOSE)
+                out.write(f"Urgency: {task_status['urgency']:.2f}%", VERBOSE)
+                out.write(f"Deadline: {task_status['deadline']}", VERBOSE)
+        elif out.shows(SUMMARY):
+            final_status = self.get_task_status()
+            completed = sum(1 for task_status in final_status if task_status['is_completed'])
+            work_left = sum(task_status['duration_left'] for task_status in final_status)
+            out.write(f"\nFinal results: {completed}/{len(final_status)} tasks completed, "
+                      f"{work_left:g} hours of work left")
         
         # Save final results to output.json
         output_file = self.save_results('output.json')
-        print(f"\nAll tasks processed, final results saved to {output_file}")
+        self.close_snapshots()
+        self._close_session_log()
+        out.write(f"\nAll tasks processed, final results saved to {output_file}", QUIET)
+        self._flush_console()
         
         return self.get_task_status()
 
 
 # Example usage
 if __name__ == "__main__":
+    # Console output level of interactive runs and replays (--quiet, --summary, default verbose)
+    output_level = "quiet" if "--quiet" in sys.argv else "summary" if "--summary" in sys.argv else "verbose"
+
+if __name__ == "__main__" and "--headless" in sys.argv:
+    # Non-interactive run with default weights, always working on the most urgent task
+    scheduler = TaskScheduler(start_date=datetime(2025, 1, 1, 9, 00), profile="--profile" in sys.argv)
+    scheduler.load_tasks_from_json('tj_simulator/eval_example_from_max.json')
+    final_status = scheduler.run_headless(results_file='output.json')
+    unfinished = [status['name'] for status in final_status if not status['is_completed']]
+    print(f"Headless run finished at {scheduler.current_date.strftime('%Y-%m-%d %H:%M')}, "
+          f"{len(final_status) - len(unfinished)}/{len(final_status)} tasks completed")
+    if scheduler.profiler.enabled:
+        print(scheduler.profiler.report())
+        print(f"Profile saved to {scheduler.profiler.save(os.path.join(scheduler.output_dir, 'profile.json'))}")
+elif __name__ == "__main__" and "--replay" in sys.argv:
+    # Re-run a recorded session at full speed: every input comes from the session
+    # log and the console output is discarded
+    import contextlib
+    session_file = sys.argv[sys.argv.index("--replay") + 1]
+    scheduler = TaskScheduler(output_dir="replay_output", profile="--profile" in sys.argv)
+    num_tasks = scheduler.replay_session(session_file)
+    try:
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+            scheduler.run_simulation(output_level=output_level)
+        print(f"Replayed {session_file} over {num_tasks} tasks, "
+              f"finished at {scheduler.current_date.strftime('%Y-%m-%d %H:%M')}")
+    except EOFError as e:
+        print(f"{e}, the session was not finished (stopped at {scheduler.current_date.strftime('%Y-%m-%d %H:%M')})")
+        scheduler._close_session_log()
+    if scheduler.profiler.enabled:
+        print(scheduler.profiler.report())
+        print(f"Profile saved to {scheduler.profiler.save(os.path.join(scheduler.output_dir, 'profile.json'))}")
+elif __name__ == "__main__":
     # 获取用户输入的权重值
     print(f"{Colors.BOLD}{Colors.BLUE}Please enter weight values for task priority calculation (between 0-1){Colors.RESET}")
     
@@ -865,7 +1994,8 @@ if __name__ == "__main__":
         start_date=start_date,
         urgency_weight=urgency_weight,
         importance_weight=importance_weight,
-        mood_weight=mood_weight
+        mood_weight=mood_weight,
+        profile="--profile" in sys.argv
     )
     
     print(f"Initial time: {start_date.strftime('%Y-%m-%d %H:%M')}")
@@ -875,5 +2005,12 @@ if __name__ == "__main__":
     num_tasks = scheduler.load_tasks_from_json('tj_simulator/eval_example_from_max.json')
     print(f"Loaded {num_tasks} tasks")
     
+    if "--record" in sys.argv:
+        # Log every answer, mood and explanation so the session can be replayed with --replay
+        print(f"Recording session to {scheduler.record_session(sys.argv[sys.argv.index('--record') + 1])}")
+    
     # Run the simulation
-    scheduler.run_simulation()
\ No newline at end of file
+    scheduler.run_simulation(output_level=output_level)
+    if scheduler.profiler.enabled:
+        print(scheduler.profiler.report())
+        print(f"Profile saved to {scheduler.profiler.save(os.path.join(scheduler.output_dir, 'profile.json'))}")
\ No newline at end of file
@@ -11,17 +11,20 @@ client = OpenAI(
     api_key=os.environ.get("OPENAI_API_KEY"),  # This is the default and can be omitted
 )
 
+def rank_assignments(assignments):
+    # Sort assignments by weighted_score in descending order
+    sorted_assignments = sorted(assignments, key=lambda x: x["weighted_score"], reverse=True)
+    
+    # Assign ranks (1 for highest weighted_score) on copies: the scheduler passes
+    # its snapshot dicts, which the snapshot writer thread may still be dumping
+    return [dict(assignment, rank=idx) for idx, assignment in enumerate(sorted_assignments, start=1)]
+
 def add_ranks_to_assignments(json_path):
     # Load assignments from JSON file
     with open(json_path, 'r') as f:
         assignments = json.load(f)
     
-    # Sort assignments by weighted_score in descending order
-    sorted_assignments = sorted(assignments, key=lambda x: x["weighted_score"], reverse=True)
-    
-    # Assign ranks (1 for highest weighted_score)
-    for idx, assignment in enumerate(sorted_assignments, start=1):
-        assignment["rank"] = idx
+    sorted_assignments = rank_assignments(assignments)
     
     # Write the updated list back to the JSON file
     with open(json_path, 'w') as f:
@@ -43,13 +46,19 @@ def explain_priority(json_file):
     # (1) Add ranking
     add_ranks_to_assignments(json_file)
 
-    # (2) Filter the json 
-    keys_to_keep = ["assignment_name", "importance", "urgency", "mood", "rank"]
-
-    # Read the JSON data
+    # (2) Read the JSON data (filtered in explain_priority_for_assignments)
     with open(json_file, 'r') as f:
         assignments = json.load(f)
     
+    return explain_priority_for_assignments(assignments)
+
+
+def explain_priority_for_assignments(assignments):
+    # Same as explain_priority, for ranked assignments that are already in memory
+
+    # Filter the json 
+    keys_to_keep = ["assignment_name", "importance", "urgency", "mood", "rank"]
+
     new_assignment = filter_json(assignments, keys_to_keep)
 
     # print(f"NEW: {new_assignment}")
@@ -66,7 +75,7 @@ def explain_priority(json_file):
     - "mood": A value between 0 and 10 indicating the user's preference for the assignment, where 10 means the user is very enthusiastic and 0 means the user is very reluctant (with 5 being neutral).
     
     Here is the JSON data:
-    {json.dumps(assignments, indent=4)}
+    {json.dumps(new_assignment, indent=4)}
     
     Based on this data, please provide a clear, friendly, and detailed explanation for the user. Explain why each of the top three assignments is prioritized, referring to their urgency, importance, and mood values. Your explanation should be conversational and include insights like:
     - If an assignment has a high urgency value, explain that it needs immediate attention.
@@ -0,0 +1,98 @@
+import itertools
+import os
+import random
+import sys
+from datetime import datetime, timedelta
+
+import pytest
+
+# The scheduler modules are imported from the project root (python -m scheduling....)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scheduling.benchmark import generate_tasks
+from scheduling.calendar_index import BusyCalendar
+from scorer import TaskScheduler
+
+
+START = datetime(2025, 1, 1, 9, 0)
+
+
+def lectures(seed, days=30):
+    """
+    Busy calendar with scattered lectures, a weekly lab and one overnight block
+    """
+    rng = random.Random(seed)
+    calendar = BusyCalendar()
+    for _ in range(25):
+        start = datetime(2025, 1, 1) + timedelta(days=rng.randint(0, days), hours=rng.randint(8, 20))
+        calendar.add(start, start + timedelta(hours=rng.choice([1, 1, 2, 3])))
+    calendar.add_weekly(rng.randint(0, 6), 14, 16, datetime(2025, 1, 1), datetime(2025, 3, 1))
+    calendar.add(datetime(2025, 1, 3, 17), datetime(2025, 1, 4, 11))
+    return calendar
+
+
+def read_files(directory):
+    """
+    Contents of every file in a directory, by file name
+    """
+    contents = {}
+    for name in sorted(os.listdir(directory)):
+        with open(os.path.join(directory, name), 'rb') as f:
+            contents[name] = f.read()
+    return contents
+
+
+@pytest.fixture
+def make_scheduler():
+    """
+    Factory for schedulers over generated tasks that write no files
+    """
+    def make(count=40, seed=0, spread=25, busy=False, **kwargs):
+        kwargs.setdefault('output_dir', None)
+        if busy:
+            kwargs['busy_calendar'] = lectures(seed)
+        return TaskScheduler(tasks_data=generate_tasks(count, seed, deadline_spread_days=spread),
+                             start_date=START, **kwargs)
+    return make
+
+
+@pytest.fixture
+def random_policy():
+    """
+    Factory for seeded task choice policies that record every decision
+    """
+    def make(seed, trace):
+        rng = random.Random(seed)
+
+        def policy(scheduler, top_tasks):
+            trace.append((scheduler.current_date, scheduler.work_end_hour,
+                          [(i, round(task['weighted_score'], 9)) for i, task in top_tasks]))
+            return rng.randrange(len(top_tasks)) if rng.random() < 0.3 else 0
+        return policy
+    return make
+
+
+@pytest.fixture
+def snapshot_run(make_scheduler, random_policy):
+    """
+    Factory for seeded runs that save a snapshot before every session
+    """
+    def run(directory, max_steps=None, **kwargs):
+        scheduler = make_scheduler(seed=6, busy=True, output_dir=str(directory), **kwargs)
+        scheduler.run_headless(policy=random_policy(6, []), max_steps=max_steps, save_snapshots=True)
+        return scheduler
+    return run
+
+
+@pytest.fixture
+def results(tmp_path):
+    """
+    Factory reading a scheduler's final results back as written by save_results
+    """
+    counter = itertools.count()
+
+    def read(scheduler):
+        filename = scheduler.save_results(str(tmp_path / f"results_{next(counter)}.json"))
+        with open(filename, 'r') as f:
+            return f.read()
+    return read
@@ -0,0 +1,22 @@
+import json
+
+from scheduling.expiry_wheel import COMPLETED, EXPIRED
+
+
+def test_archived_output_is_not_shared(tmp_path, make_scheduler, results):
+    scheduler = make_scheduler(seed=3, busy=True, output_dir=str(tmp_path))
+    scheduler.run_headless(max_steps=60)
+    counts = scheduler.archive.counts()
+    assert counts[COMPLETED] and counts[EXPIRED]
+    before = (scheduler.get_task_status(), results(scheduler))
+
+    # Changing what the scheduler handed out must not show up in its later output
+    for status in scheduler.get_task_status():
+        status['name'] = 'changed'
+    scheduler.save_tasks_snapshot(scheduler.current_date)
+    for task_dict in scheduler.last_snapshot:
+        task_dict['duration'] = -1
+    assert (scheduler.get_task_status(), results(scheduler)) == before
+
+    scheduler.save_tasks_snapshot(scheduler.current_date)
+    assert scheduler.last_snapshot == json.loads(before[1])
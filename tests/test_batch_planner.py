@@ -0,0 +1,51 @@
+import json
+import os
+
+import pytest
+
+from conftest import START
+from scheduling.batch_planner import load_students, run_batch, student_dir
+from scheduling.benchmark import generate_tasks
+from scheduling.pool import run_engine
+from scorer import TaskScheduler
+
+
+def test_student_dirs_are_distinct(tmp_path):
+    ids = ['alice', 'a/b', 'a b', 'a_b', '../up', '..', '.hidden', '_hidden', '学生']
+    dirs = [student_dir(str(tmp_path), student_id) for student_id in ids]
+    assert len(set(dirs)) == len(ids)
+    assert dirs[0] == os.path.join(str(tmp_path), 'alice')
+    assert all(os.path.dirname(path) == str(tmp_path) for path in dirs)
+
+
+def test_duplicate_ids_are_rejected(tmp_path):
+    with pytest.raises(ValueError, match='Duplicate student id'):
+        run_batch([('a', []), ('b', []), ('a', [])], output_dir=str(tmp_path))
+
+
+@pytest.mark.parametrize('engine', ('ticks', 'events'))
+def test_batch_matches_single_runs(tmp_path, results, engine):
+    path = tmp_path / 'students.jsonl'
+    students = [(f's{i}', generate_tasks(15, seed=i, deadline_spread_days=15)) for i in range(4)]
+    path.write_text('\n'.join(json.dumps({'student': student_id, 'tasks': tasks})
+                              for student_id, tasks in students) + '\n')
+    # A broken task set fails on its own without stopping the others
+    with open(path, 'a') as f:
+        f.write(json.dumps({'student': 'broken', 'tasks': [{'DDL': 'soon'}]}) + '\n')
+
+    summaries, stats = run_batch(load_students(str(path)), output_dir=str(tmp_path / 'out'),
+                                 workers=2, engine=engine)
+    assert [summary['student'] for summary in summaries] == ['s0', 's1', 's2', 's3', 'broken']
+    assert stats['failed'] == 1 and 'error' in summaries[-1]
+
+    for (student_id, tasks), summary in zip(students, summaries):
+        scheduler = TaskScheduler(tasks_data=tasks, start_date=START, output_dir=None)
+        run_engine(scheduler, engine)
+        assert {key: summary[key] for key in scheduler.get_run_summary()} == scheduler.get_run_summary()
+        with open(os.path.join(summary['output_dir'], 'output.json')) as f:
+            assert f.read() == results(scheduler)
+
+
+def test_unknown_engine_is_rejected(tmp_path):
+    with pytest.raises(ValueError, match='Unknown engine'):
+        run_batch([('a', [])], output_dir=str(tmp_path), engine='hours')
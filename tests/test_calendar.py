@@ -0,0 +1,42 @@
+import builtins
+import math
+from datetime import timedelta
+
+import pytest
+
+
+@pytest.mark.parametrize('engine', ('run_headless', 'run_event_driven'))
+def test_sessions_skip_busy_hours(make_scheduler, engine):
+    scheduler = make_scheduler(seed=2, busy=True)
+    sessions = []
+    work_on_task = scheduler.work_on_task
+
+    def record(task_index, hours=2):
+        sessions.append((scheduler.current_date, hours))
+        return work_on_task(task_index, hours)
+
+    scheduler.work_on_task = record
+    getattr(scheduler, engine)(session_hours=2)
+    assert sessions
+    for start, hours in sessions:
+        assert 0 < hours <= 2
+        for hour in range(math.ceil(hours + start.minute / 60)):
+            assert not scheduler.calendar.is_busy(start + timedelta(hours=hour))
+
+
+def test_interactive_session_ends_at_lecture(tmp_path, monkeypatch, capsys, make_scheduler, results):
+    # Pressing Enter at every prompt must give the same run as the default headless policy
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(builtins, 'input', lambda *args: '')
+    interactive = make_scheduler(seed=3, busy=True, output_dir=str(tmp_path / 'snapshots'), output_level='quiet')
+    # A lecture at 10:00 on the first day cuts the first session to one hour
+    lecture_start = interactive.current_date.replace(hour=10)
+    interactive.add_busy_interval(lecture_start, lecture_start.replace(hour=12))
+    statuses = interactive.run_simulation(interactive=True)
+    assert 'next 1 hours' in capsys.readouterr().out
+
+    headless = make_scheduler(seed=3, busy=True)
+    headless.add_busy_interval(lecture_start, lecture_start.replace(hour=12))
+    assert statuses == headless.run_headless()
+    assert interactive.get_run_summary() == headless.get_run_summary()
+    assert (tmp_path / 'output.json').read_text() == results(headless)
@@ -0,0 +1,31 @@
+import pickle
+
+import pytest
+
+
+@pytest.mark.parametrize('horizon_days', (1, 3))
+@pytest.mark.parametrize('seed', range(3))
+def test_plan_matches_ranking_every_step(make_scheduler, random_policy, horizon_days, seed):
+    plain_trace, plan_trace = [], []
+    plain = make_scheduler(count=30, seed=seed, busy=True)
+    plain.run_headless(policy=random_policy(seed, plain_trace))
+    planned = make_scheduler(count=30, seed=seed, busy=True, plan_horizon_days=horizon_days)
+    planned.run_headless(policy=random_policy(seed, plan_trace))
+
+    assert plan_trace == plain_trace
+    assert planned.get_task_status() == plain.get_task_status()
+    assert planned.day_plan.repairs > 0
+
+
+def test_planning_leaves_the_scheduler_alone(make_scheduler, random_policy):
+    scheduler = make_scheduler(count=30, seed=4, busy=True, plan_horizon_days=2)
+    tasks = list(scheduler.tasks)
+    scheduler.run_headless(policy=random_policy(4, []))
+
+    # The look-ahead copies what it changes; the scheduler keeps working on its own records
+    assert all(task is original for task, original in zip(scheduler.tasks, tasks))
+    assert scheduler.day_plan.builds + scheduler.day_plan.repairs > 1
+    # The plan travels to worker processes without its look-ahead copy
+    restored = pickle.loads(pickle.dumps(scheduler.day_plan))
+    assert restored.upcoming() == scheduler.day_plan.upcoming()
+    assert len(pickle.dumps(restored)) < len(pickle.dumps(scheduler)) / 2
@@ -0,0 +1,87 @@
+import math
+from datetime import timedelta
+
+import pytest
+
+from conftest import START, lectures
+from scheduling.benchmark import generate_tasks
+from scheduling.expiry_wheel import EXPIRED
+from scorer import TaskScheduler
+
+
+def whole_hour_scheduler(seed, busy, **kwargs):
+    # Whole-hour durations, so an hourly reference completes tasks exactly on the hour
+    tasks = generate_tasks(30, seed, deadline_spread_days=20)
+    for task in tasks:
+        task['duration'] = math.ceil(task['duration'])
+    return TaskScheduler(tasks_data=tasks, start_date=START, output_dir=None,
+                         busy_calendar=lectures(seed) if busy else None, **kwargs)
+
+
+def sticky_policy(choose, top_n, session_hours):
+    """
+    Policy for an hourly run_headless that keeps the chosen task until an event
+    of run_event_driven: the task is finished, a deadline passes, the clock
+    jumped (end of the day or a busy hour) or the session is full
+    """
+    state = {'task': None, 'end': None, 'hours': 0, 'expired': 0}
+
+    def policy(scheduler, top_tasks):
+        expired = scheduler.archive.counts()[EXPIRED]
+        positions = {i: position for position, (i, _) in enumerate(top_tasks)}
+        if (state['task'] in positions and scheduler.current_date == state['end'] and
+                expired == state['expired'] and state['hours'] != session_hours):
+            state['hours'] += 1
+        else:
+            chosen = choose(scheduler, top_tasks[:top_n])
+            state['task'] = top_tasks[chosen if isinstance(chosen, int) else 0][0]
+            state['hours'] = 1
+        state['end'] = scheduler.current_date + timedelta(hours=1)
+        state['expired'] = expired
+        return positions[state['task']]
+    return policy
+
+
+def outcome(scheduler):
+    return ([status['completed_work'] for status in scheduler.get_task_status()],
+            scheduler.completion_times, scheduler.get_run_summary())
+
+
+@pytest.mark.parametrize('use_task_table', (False, True))
+@pytest.mark.parametrize('session_hours', (None, 3))
+@pytest.mark.parametrize('seed', range(3))
+@pytest.mark.parametrize('busy', (False, True))
+def test_events_match_hourly_reference(random_policy, use_task_table, session_hours, seed, busy):
+    top_n = 3
+    reference_trace, event_trace = [], []
+    reference = whole_hour_scheduler(seed, busy, use_task_table=use_task_table)
+    reference.run_headless(policy=sticky_policy(random_policy(seed, reference_trace), top_n, session_hours),
+                           top_n=len(reference.tasks), session_hours=1)
+    events = whole_hour_scheduler(seed, busy, use_task_table=use_task_table)
+    events.run_event_driven(policy=random_policy(seed, event_trace), top_n=top_n, session_hours=session_hours)
+
+    assert event_trace == reference_trace
+    assert outcome(events) == outcome(reference)
+
+
+def test_events_cost_less_than_hours(make_scheduler):
+    scheduler = make_scheduler(seed=1, busy=True)
+    stretches = []
+    work_on_task = scheduler.work_on_task
+
+    def record(task_index, hours=2):
+        deadlines = [task.deadline for task in scheduler.tasks if task.duration > task.completed_work]
+        stretches.append((scheduler.current_date, scheduler.work_end_hour, deadlines, hours))
+        return work_on_task(task_index, hours)
+
+    scheduler.work_on_task = record
+    scheduler.run_event_driven()
+    worked = sum(hours for _, _, _, hours in stretches)
+    assert len(stretches) < worked / 2
+    for start, work_end_hour, deadlines, hours in stretches:
+        end = start + timedelta(hours=hours)
+        # A stretch never runs past the working day, an open task's deadline or into a busy hour
+        assert end <= start.replace(hour=0, minute=0) + timedelta(hours=work_end_hour)
+        assert not any(start < deadline < end for deadline in deadlines)
+        assert not any(scheduler.calendar.is_busy(start + timedelta(hours=hour))
+                       for hour in range(math.ceil(hours + start.minute / 60)))
@@ -0,0 +1,32 @@
+import copy
+
+import pytest
+
+FIELDS = ('time_to_deadline', 'urgency', 'duration_left', 'weighted_score')
+
+
+def live_fields(scheduler):
+    return {i: tuple(scheduler.tasks[i].get(name) for name in FIELDS) for i in scheduler.live_tasks}
+
+
+@pytest.mark.parametrize('urgency_policy', ('deadline_pressure', 'remaining_ratio'))
+@pytest.mark.parametrize('seed', range(3))
+def test_incremental_matches_full_recalculation(make_scheduler, random_policy, urgency_policy, seed):
+    scheduler = make_scheduler(count=30, seed=seed, spread=20, busy=True, urgency_policy=urgency_policy)
+    choose = random_policy(seed, [])
+    checked = []
+
+    def policy(current, top_tasks):
+        # Redo the step from scratch on a copy and compare rankings and derived fields
+        full = copy.deepcopy(current)
+        full.dirty_tracker.invalidate()
+        full.recalculate_all_tasks(full.current_date)
+        assert live_fields(full) == pytest.approx(live_fields(current))
+        assert ([i for i, _ in full.get_top_urgent_tasks(10)] ==
+                [i for i, _ in current.get_top_urgent_tasks(10)])
+        checked.append(current.current_date)
+        return choose(current, top_tasks)
+
+    scheduler.run_headless(policy=policy)
+    assert len(checked) > 50
+
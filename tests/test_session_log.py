@@ -0,0 +1,33 @@
+import builtins
+from datetime import timedelta
+
+import pytest
+
+from conftest import START
+from scorer import TaskScheduler
+
+
+@pytest.mark.parametrize('created_at', (START, START - timedelta(days=40), START + timedelta(days=9)))
+def test_replay_matches_recorded_session(tmp_path, monkeypatch, make_scheduler, results, created_at):
+    monkeypatch.chdir(tmp_path)
+    # Enter at most prompts, a different task now and then
+    answers = iter(['', '', '2', '', 'n', ''] * 1000)
+    monkeypatch.setattr(builtins, 'input', lambda *args: next(answers))
+    recorded = make_scheduler(seed=6, busy=True, output_dir=str(tmp_path / 'recorded'), output_level='quiet')
+    recorded.run_headless(max_steps=5)
+    recorded.record_session(str(tmp_path / 'session.jsonl'))
+    recorded.run_simulation(interactive=True)
+
+    def no_input(*args):
+        raise AssertionError('replay asked for input')
+    monkeypatch.setattr(builtins, 'input', no_input)
+    # The replaying scheduler was created for another start date and has already been used
+    replayed = TaskScheduler(start_date=created_at, output_dir=str(tmp_path / 'replayed'), output_level='quiet')
+    replayed.calculate_available_working_hours(created_at, created_at + timedelta(days=3))
+    replayed.replay_session(str(tmp_path / 'session.jsonl'))
+    assert replayed.time_axis.to_slot(replayed.start_date) == replayed.start_date.hour
+    replayed.run_simulation(interactive=True)
+
+    assert results(replayed) == results(recorded)
+    assert replayed.get_run_summary() == recorded.get_run_summary()
+    assert replayed.current_date == recorded.current_date
@@ -0,0 +1,42 @@
+import json
+import os
+
+from conftest import read_files
+from scheduling.snapshot_log import SnapshotLogReader
+
+
+def log_states(directory):
+    reader = SnapshotLogReader(os.path.join(directory, 'tasks_log.jsonl'))
+    timestamps = reader.timestamps()
+    return timestamps, [reader.state_at(timestamp) for timestamp in timestamps]
+
+
+def test_log_states_match_files(tmp_path, snapshot_run):
+    snapshot_run(tmp_path / 'files')
+    snapshot_run(tmp_path / 'log', snapshot_mode='log', checkpoint_every=7)
+    timestamps, states = log_states(tmp_path / 'log')
+    files = read_files(tmp_path / 'files')
+    assert len(files) > 20
+    assert [f"tasks_{timestamp}.json" for timestamp in timestamps] == list(files)
+    assert states == [json.loads(data) for data in files.values()]
+
+
+def test_rerun_replaces_log(tmp_path, snapshot_run):
+    snapshot_run(tmp_path / 'once', snapshot_mode='log', checkpoint_every=7)
+    snapshot_run(tmp_path / 'twice', snapshot_mode='log', checkpoint_every=7)
+    snapshot_run(tmp_path / 'twice', snapshot_mode='log', checkpoint_every=7)
+    assert read_files(tmp_path / 'twice') == read_files(tmp_path / 'once')
+
+
+def test_continued_run_appends_to_log(tmp_path, make_scheduler, random_policy, snapshot_run):
+    snapshot_run(tmp_path / 'whole', snapshot_mode='log', checkpoint_every=7)
+
+    scheduler = make_scheduler(seed=6, busy=True, output_dir=str(tmp_path / 'split'),
+                               snapshot_mode='log', checkpoint_every=7)
+    policy = random_policy(6, [])
+    scheduler.run_headless(policy=policy, max_steps=10, save_snapshots=True)
+    scheduler.run_headless(policy=policy, save_snapshots=True)
+
+    timestamps, states = log_states(tmp_path / 'split')
+    assert timestamps == sorted(set(timestamps))
+    assert (timestamps, states) == log_states(tmp_path / 'whole')
@@ -0,0 +1,39 @@
+import json
+
+import pytest
+
+from conftest import read_files
+
+
+def test_async_files_match_sync(tmp_path, snapshot_run):
+    snapshot_run(tmp_path / 'sync')
+    snapshot_run(tmp_path / 'async', async_snapshots=True)
+    sync_files = read_files(tmp_path / 'sync')
+    assert len(sync_files) > 20
+    assert all(name.startswith('tasks_') and name.endswith('.json') for name in sync_files)
+    assert read_files(tmp_path / 'async') == sync_files
+
+
+@pytest.mark.parametrize('checkpoint_every', (1, 7, 50))
+def test_async_log_matches_sync(tmp_path, snapshot_run, checkpoint_every):
+    snapshot_run(tmp_path / 'sync', snapshot_mode='log', checkpoint_every=checkpoint_every)
+    snapshot_run(tmp_path / 'async', snapshot_mode='log', checkpoint_every=checkpoint_every,
+                 async_snapshots=True)
+    assert read_files(tmp_path / 'async') == read_files(tmp_path / 'sync')
+
+
+def test_ranking_leaves_snapshot_unchanged(monkeypatch, tmp_path, snapshot_run, results):
+    pytest.importorskip('openai')
+    pytest.importorskip('dotenv')
+    monkeypatch.setenv('OPENAI_API_KEY', 'unused')
+    from suggestion.suggestion import rank_assignments
+
+    # The in-memory snapshot handed to the explanation in log and async modes
+    scheduler = snapshot_run(tmp_path / 'log', max_steps=30, snapshot_mode='log', async_snapshots=True)
+    snapshot = scheduler.last_snapshot
+    before = json.dumps(snapshot)
+    final = results(scheduler)
+    ranked = rank_assignments([task for task in snapshot if 'weighted_score' in task])
+    assert [task['rank'] for task in ranked] == list(range(1, len(ranked) + 1))
+    assert json.dumps(snapshot) == before
+    assert results(scheduler) == final
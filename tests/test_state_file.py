@@ -0,0 +1,101 @@
+import json
+from datetime import timedelta
+
+import pytest
+
+from conftest import START
+from scheduling.state_file import HEADER, read_state_file
+from scorer import TaskScheduler
+
+
+def run_state(scheduler, results):
+    return (results(scheduler), scheduler.get_task_status(), scheduler.get_run_summary(),
+            scheduler.current_date, scheduler.work_end_hour, scheduler.completion_times)
+
+
+@pytest.mark.parametrize('steps', (0, 1, 40))
+def test_round_trip(tmp_path, make_scheduler, results, steps):
+    scheduler = make_scheduler(seed=2, busy=True, urgency_weight=0.6, importance_weight=0.25,
+                               mood_weight=0.15, urgency_policy='remaining_ratio', ranking_policy='weighted_raw')
+    scheduler.run_headless(max_steps=steps)
+    # Int fields (completed_work after 2h sessions) and missing derived fields come back as they were
+    filename = scheduler.save_state(str(tmp_path / 'state.bin'))
+
+    restored = TaskScheduler(start_date=START, output_dir=None)
+    assert restored.load_state(filename) == len(scheduler.tasks)
+    assert run_state(restored, results) == run_state(scheduler, results)
+    assert restored.start_date == scheduler.start_date
+    assert ((restored.urgency_weight, restored.importance_weight, restored.mood_weight) ==
+            (scheduler.urgency_weight, scheduler.importance_weight, scheduler.mood_weight))
+    assert restored.overtime_hours == scheduler.overtime_hours
+    assert restored.urgency_policy.name == 'remaining_ratio'
+    assert restored.ranking_policy.name == 'weighted_raw'
+    assert restored.calendar.slots() == scheduler.calendar.slots()
+
+
+def test_restored_calendar_is_independent(tmp_path, make_scheduler):
+    scheduler = make_scheduler(seed=1, busy=True)
+    restored = TaskScheduler(start_date=START, output_dir=None)
+    restored.load_state(scheduler.save_state(str(tmp_path / 'state.bin')))
+    restored.add_busy_interval(scheduler.current_date, scheduler.current_date.replace(hour=18))
+    assert len(restored.calendar) > len(scheduler.calendar)
+
+
+@pytest.mark.parametrize('created_at', (START - timedelta(days=40), START + timedelta(days=9)))
+@pytest.mark.parametrize('busy', (False, True))
+def test_resume_matches_uninterrupted_run(tmp_path, make_scheduler, random_policy, results, busy, created_at):
+    kwargs = dict(seed=4, busy=busy, urgency_policy='remaining_ratio', ranking_policy='weighted_raw')
+    trace = []
+    uninterrupted = make_scheduler(**kwargs)
+    uninterrupted.run_headless(policy=random_policy(9, trace))
+
+    # Same policy decisions, split over two schedulers with a state file in between;
+    # the second one starts out with another start date, which the state file replaces
+    resumed_trace = []
+    policy = random_policy(9, resumed_trace)
+    first = make_scheduler(**kwargs)
+    # (run_headless has already moved the clock past the last session)
+    first.run_headless(policy=policy, max_steps=25)
+    second = TaskScheduler(start_date=created_at, output_dir=None)
+    second.calculate_available_working_hours(created_at, created_at + timedelta(days=3))
+    second.load_state(first.save_state(str(tmp_path / 'state.bin')))
+    # Slots count from the day the restored run started
+    assert second.time_axis.to_slot(second.start_date) == second.start_date.hour
+    second.run_headless(policy=policy)
+
+    assert resumed_trace == trace
+    assert run_state(second, results) == run_state(uninterrupted, results)
+
+
+def test_rejects_other_files(tmp_path):
+    other = tmp_path / 'other.bin'
+    other.write_bytes(b'\0' * HEADER.size)
+    with pytest.raises(ValueError, match='not a scheduler state file'):
+        read_state_file(str(other))
+
+    future = tmp_path / 'future.bin'
+    future.write_bytes(HEADER.pack(b'TSST', 99, 0, 0, 0, 0, 19, 0.5, 0.3, 0.2, 0, 0) + b'\0' * 8)
+    with pytest.raises(ValueError, match='version 99'):
+        read_state_file(str(future))
+
+
+def test_reads_version_1(tmp_path, make_scheduler, results):
+    # Version 1 had no policies or busy slots in the blob: rewrite a file without them
+    scheduler = make_scheduler(seed=5, count=10)
+    scheduler.run_headless(max_steps=3)
+    scheduler.save_state(str(tmp_path / 'state.bin'))
+    data = bytearray((tmp_path / 'state.bin').read_bytes())
+    fields = list(HEADER.unpack_from(data, 0))
+    blob_size = fields[-1]
+    blob = json.loads(bytes(data[-blob_size:]))
+    old_blob = json.dumps({'layouts': blob['layouts'], 'values': blob['values']},
+                          separators=(',', ':')).encode('utf-8')
+    fields[1] = 1
+    fields[-1] = len(old_blob)
+    data[:HEADER.size] = HEADER.pack(*fields)
+    (tmp_path / 'v1.bin').write_bytes(bytes(data[:-blob_size]) + old_blob)
+
+    state = read_state_file(str(tmp_path / 'v1.bin'))
+    assert state['urgency_policy'] is None and state['ranking_policy'] is None
+    assert state['busy_slots'] == []
+    assert [task.to_dict() for task in state['tasks']] == json.loads(results(scheduler))
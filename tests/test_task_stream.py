@@ -0,0 +1,113 @@
+import json
+
+import pytest
+
+from conftest import START
+from scheduling.benchmark import generate_tasks
+from scheduling.task_stream import iter_json_records, iter_tasks
+from scorer import TaskScheduler
+
+CHUNK_SIZES = (1, 2, 3, 7, 13, 64, 1 << 16)
+
+# Unicode, escapes, brackets and commas inside strings, nested values and
+# top-level scalars, which can end exactly at a chunk boundary
+RECORDS = [
+    {'assignment_name': 'Essay ]}, "draft" [{', 'DDL': '1/20', 'duration': '4.5', 'importance': 7, 'mood': 5},
+    {'assignment_name': '3F8 Übung – 机器学习 ☃', 'DDL': '2/1', 'duration': 12, 'importance': '8', 'mood': '6'},
+    {'assignment_name': 'Lab \\ report\n', 'DDL': '1/5', 'duration': 2, 'tags': [[1, 2], {'a': None}], 'mood': 9},
+    12345,
+    'just a string',
+    [True, False, None, -0.25e3],
+]
+
+
+def write_array(path, records):
+    # Irregular whitespace between tokens, as in hand-edited files
+    body = ' ,\n\t'.join(json.dumps(record, ensure_ascii=False) for record in records)
+    path.write_text(f"\n  [ \r\n{body}\n\n ]  \n", encoding='utf-8')
+    return str(path)
+
+
+def write_jsonl(path, records):
+    lines = [json.dumps(record, ensure_ascii=False) for record in records]
+    path.write_text('\n'.join(lines[:2]) + '\n\n' + '\n'.join(lines[2:]), encoding='utf-8')
+    return str(path)
+
+
+@pytest.mark.parametrize('chunk_size', CHUNK_SIZES)
+def test_array_records_match_json_load(tmp_path, chunk_size):
+    filename = write_array(tmp_path / 'tasks.json', RECORDS)
+    with open(filename, encoding='utf-8') as f:
+        expected = json.load(f)
+    assert list(iter_json_records(filename, chunk_size)) == expected
+
+
+@pytest.mark.parametrize('chunk_size', CHUNK_SIZES)
+def test_jsonl_records_match_json_loads(tmp_path, chunk_size):
+    filename = write_jsonl(tmp_path / 'tasks.jsonl', RECORDS)
+    assert list(iter_json_records(filename, chunk_size)) == RECORDS
+
+
+@pytest.mark.parametrize('chunk_size', (1, 5, 64))
+def test_empty_and_malformed_arrays(tmp_path, chunk_size):
+    empty = tmp_path / 'empty.json'
+    empty.write_text(' [ \n ] ')
+    assert list(iter_json_records(str(empty), chunk_size)) == []
+
+    for text, offset in (('[{"a": 1} {"b": 2}]', 10), ('[{"a": 1},', 10), ('[{"a": 1}] x', 11),
+                         ('[{"a": 1}, {"b" 2}]', 16)):
+        malformed = tmp_path / 'malformed.json'
+        malformed.write_text(text)
+        with pytest.raises(ValueError, match=f'at character {offset} of'):
+            list(iter_json_records(str(malformed), chunk_size))
+
+
+def test_malformed_record_fails_without_reading_on(tmp_path):
+    # A syntax error early in a long record fails at once, not after buffering the rest of the file
+    path = tmp_path / 'broken.jsonl'
+    path.write_text('{"a": 1}\n{"b": [1, 2 3, ' + ', '.join(['4'] * 200000) + ']}\n')
+    records = iter_json_records(str(path), chunk_size=64, max_record_size=1000)
+    assert next(records) == {'a': 1}
+    with pytest.raises(ValueError, match="Expecting ',' delimiter at character 21 of"):
+        next(records)
+
+
+def test_record_size_is_capped(tmp_path):
+    path = tmp_path / 'long.json'
+    path.write_text('[{"a": 1}, "' + 'x' * 5000 + '"]')
+    with pytest.raises(ValueError, match='longer than 1000 characters at character 11 of'):
+        list(iter_json_records(str(path), chunk_size=64, max_record_size=1000))
+    assert len(list(iter_json_records(str(path), chunk_size=64, max_record_size=10000))) == 2
+
+
+@pytest.mark.parametrize('chunk_size', (1, 3, 13))
+def test_invalid_task_records(tmp_path, chunk_size):
+    filename = write_array(tmp_path / 'tasks.json', RECORDS)
+    with pytest.raises(ValueError, match='#4'):
+        list(iter_tasks(filename, 2025, 19, chunk_size=chunk_size))
+
+    tasks = list(iter_tasks(filename, 2025, 19, skip_invalid=True, chunk_size=chunk_size))
+    assert [task['assignment_name'] for task in tasks] == [record['assignment_name'] for record in RECORDS[:3]]
+
+
+@pytest.mark.parametrize('suffix', ('json', 'jsonl'))
+def test_streaming_load_matches_json_load(tmp_path, suffix):
+    records = generate_tasks(300, seed=3)
+    path = tmp_path / f'tasks.{suffix}'
+    filename = write_array(path, records) if suffix == 'json' else write_jsonl(path, records)
+
+    streamed = TaskScheduler(start_date=START, output_dir=None)
+    seen = []
+
+    def on_task(i, task):
+        # Every task is indexed as soon as it is parsed
+        seen.append(i)
+        if i % 37 == 0:
+            assert (streamed.check_time_sufficiency(None, START) ==
+                    streamed.check_time_sufficiency(streamed.tasks, START))
+    assert streamed.load_tasks_streaming(filename, on_task=on_task) == len(records)
+    assert seen == list(range(len(records)))
+
+    loaded = TaskScheduler(tasks_data=records, start_date=START, output_dir=None)
+    assert [task.to_dict() for task in streamed.tasks] == [task.to_dict() for task in loaded.tasks]
+    assert streamed.run_headless() == loaded.run_headless()
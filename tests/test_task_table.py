@@ -0,0 +1,26 @@
+import pytest
+
+
+@pytest.mark.parametrize('seed', range(3))
+def test_task_table_matches_dicts(make_scheduler, random_policy, seed):
+    dict_trace, table_trace = [], []
+    dicts = make_scheduler(count=30, seed=seed, busy=True)
+    dicts.run_headless(policy=random_policy(seed, dict_trace))
+    table = make_scheduler(count=30, seed=seed, busy=True, use_task_table=True)
+    table.run_headless(policy=random_policy(seed, table_trace))
+
+    assert table_trace == dict_trace
+    assert table.get_task_status() == dicts.get_task_status()
+
+
+@pytest.mark.parametrize('end_hour', (19, 23))
+def test_task_table_hours_match_scheduler(make_scheduler, end_hour):
+    scheduler = make_scheduler(seed=4, busy=True, use_task_table=True)
+    scheduler.run_headless(max_steps=20)
+    scheduler.update_working_hours(end_hour)
+    scheduler.recalculate_all_tasks(scheduler.current_date)
+    live = scheduler.get_top_urgent_tasks(len(scheduler.tasks))
+    assert live
+    for i, task in live:
+        assert task['time_to_deadline'] == scheduler.calculate_available_working_hours(
+            scheduler.current_date, task['deadline'])
@@ -0,0 +1,77 @@
+import copy
+
+import pytest
+
+from scheduling.what_if import apply_scenario, find_tasks, run_what_if
+
+SCENARIOS = [
+    {'name': 'skip tomorrow', 'skip_days': [1]},
+    {'name': 'lab week', 'busy': [{'weekday': 2, 'start_hour': 9, 'end_hour': 13,
+                                   'from': '2025-01-01', 'until': '2025-01-31'}]},
+    {'name': 'longer tasks', 'extra_hours': {'task_0000003': 10, 'task_0000007': -2}},
+    {'name': 'importance first', 'weights': [0.2, 0.6, 0.2]},
+]
+
+
+@pytest.fixture
+def state(results):
+    def read(scheduler):
+        return (results(scheduler), scheduler.current_date, scheduler.work_end_hour, scheduler.calendar.slots(),
+                (scheduler.urgency_weight, scheduler.importance_weight, scheduler.mood_weight),
+                scheduler.get_run_summary())
+    return read
+
+
+def without_timing(outcomes):
+    return [{key: value for key, value in outcome.items() if key != 'seconds'} for outcome in outcomes]
+
+
+@pytest.mark.parametrize('scenario', SCENARIOS, ids=lambda scenario: scenario['name'])
+def test_fork_matches_deep_copy(make_scheduler, state, scenario):
+    base = make_scheduler(seed=8, busy=True)
+    base.run_headless(max_steps=15)
+    before = state(base)
+
+    fork = base.fork()
+    apply_scenario(fork, scenario)
+    fork.run_headless()
+    copied = copy.deepcopy(base)
+    apply_scenario(copied, scenario)
+    copied.run_headless()
+
+    assert state(fork) == state(copied)
+    assert state(base) == before
+    # The base keeps running as if it had never been forked
+    base.run_headless()
+    reference = make_scheduler(seed=8, busy=True)
+    reference.run_headless()
+    assert state(base) == state(reference)
+
+
+@pytest.mark.parametrize('engine', ('ticks', 'events'))
+def test_processes_match_threads(make_scheduler, state, engine):
+    base = make_scheduler(seed=8, busy=True)
+    base.run_headless(max_steps=10)
+    before = state(base)
+    threads, _ = run_what_if(base, SCENARIOS, workers=2, engine=engine)
+    processes, stats = run_what_if(base, SCENARIOS, workers=2, processes=True, engine=engine)
+    assert stats['branches'] == len(SCENARIOS) + 1
+    assert without_timing(processes) == without_timing(threads)
+    assert [outcome['scenario'] for outcome in threads] == ['baseline'] + [s['name'] for s in SCENARIOS]
+    assert threads[0]['missed_delta'] == 0
+    assert state(base) == before
+
+
+def test_find_tasks(make_scheduler):
+    scheduler = make_scheduler(count=12)
+    assert find_tasks(scheduler, 'task_0000004') == [4]
+    assert find_tasks(scheduler, 11) == [11]
+    with pytest.raises(ValueError, match='No task matches'):
+        find_tasks(scheduler, 'missing')
+    with pytest.raises(ValueError):
+        find_tasks(scheduler, 12)
+
+
+def test_unknown_engine_is_rejected(make_scheduler):
+    with pytest.raises(ValueError, match='Unknown engine'):
+        run_what_if(make_scheduler(count=5), SCENARIOS, processes=True, engine='hours')
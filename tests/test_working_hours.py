@@ -0,0 +1,156 @@
+import random
+from datetime import datetime, timedelta
+
+import pytest
+
+from scheduling.overtime_solver import minimal_work_end_hour
+
+END_HOURS = (19, 21, 23, 24)
+
+
+def slot_hours(scheduler, now, deadline):
+    """
+    Available working hours by walking every free hour slot between now and the deadline
+    """
+    first_day, last_day = now.toordinal(), deadline.toordinal()
+    total = 0
+    for day in range(first_day, last_day + 1):
+        start = max(now.hour, scheduler.work_start_hour) if day == first_day else scheduler.work_start_hour
+        if day == last_day:
+            end = min(scheduler.deadline_hour, scheduler.work_end_hour) if day == first_day else scheduler.deadline_hour
+        else:
+            end = scheduler.work_end_hour
+        midnight = datetime.fromordinal(day)
+        total += sum(1 for hour in range(start, end)
+                     if not scheduler.calendar.is_busy(midnight + timedelta(hours=hour)))
+    return total
+
+
+def future_tasks(scheduler, now):
+    return [task for task in scheduler.tasks
+            if task.deadline > now and task.duration - task.completed_work > 0]
+
+
+def late_deadlines(scheduler, now):
+    """
+    Deadlines after today that check_time_sufficiency reports as missed
+    """
+    today = now.toordinal()
+    return [deadline for deadline, required, available in scheduler.check_time_sufficiency(None, now)
+            if deadline.toordinal() != today]
+
+
+def random_progress(scheduler, rng, count=5):
+    for i in rng.sample(range(len(scheduler.tasks)), count):
+        scheduler.work_on_task(i, rng.choice([1, 2, 4, 100]))
+
+
+@pytest.mark.parametrize('seed', range(4))
+def test_available_hours_match_slot_walk(make_scheduler, seed):
+    scheduler = make_scheduler(seed=seed, busy=True)
+    rng = random.Random(seed)
+    for _ in range(500):
+        scheduler.update_working_hours(rng.choice(END_HOURS))
+        now = datetime(2025, 1, 1) + timedelta(days=rng.randint(0, 25), hours=rng.randint(0, 23))
+        deadline = datetime(2025, 1, 1, 19) + timedelta(days=rng.randint(0, 27))
+        assert scheduler.calculate_available_working_hours(now, deadline) == slot_hours(scheduler, now, deadline)
+        if rng.random() < 0.05:
+            # A new busy block changes the answer (the memo is per calendar version)
+            start = now.replace(minute=0) + timedelta(hours=rng.randint(0, 30))
+            scheduler.add_busy_interval(start, start + timedelta(hours=rng.randint(1, 4)))
+
+
+@pytest.mark.parametrize('seed', range(4))
+def test_check_time_sufficiency_matches_slot_walk(make_scheduler, seed):
+    scheduler = make_scheduler(seed=seed, busy=True)
+    rng = random.Random(seed)
+    for _ in range(50):
+        scheduler.update_working_hours(rng.choice(END_HOURS))
+        random_progress(scheduler, rng)
+        now = datetime(2025, 1, 1) + timedelta(days=rng.randint(0, 20), hours=rng.randint(9, 18))
+        tasks = sorted(future_tasks(scheduler, now), key=lambda task: task.deadline)
+
+        expected = []
+        required = 0
+        for position, task in enumerate(tasks):
+            required += task.duration - task.completed_work
+            if position + 1 < len(tasks) and tasks[position + 1].deadline.date() == task.deadline.date():
+                continue
+            available = slot_hours(scheduler, now, task.deadline)
+            if required > available:
+                first = next(t for t in tasks if t.deadline.date() == task.deadline.date())
+                expected.append((first.deadline, required, available))
+        # Any task order, and the scheduler's own unfinished tasks through the deadline index
+        rng.shuffle(tasks)
+        assert scheduler.check_time_sufficiency(tasks, now) == pytest.approx(expected)
+        assert scheduler.check_time_sufficiency(None, now) == pytest.approx(expected)
+
+
+@pytest.mark.parametrize('seed', range(4))
+def test_solver_matches_sufficiency_check(make_scheduler, seed):
+    # The solver's answer is the first end hour at which check_time_sufficiency
+    # finds no deadline after today short of time
+    scheduler = make_scheduler(seed=seed, busy=seed % 2 == 1)
+    rng = random.Random(seed)
+    for _ in range(60):
+        scheduler.update_working_hours(rng.choice(END_HOURS))
+        random_progress(scheduler, rng)
+        now = datetime(2025, 1, 1) + timedelta(days=rng.randint(0, 20), hours=rng.randint(9, 18))
+        solved = scheduler.solve_work_end_hour(now)
+
+        expected = 24
+        for end_hour in END_HOURS:
+            scheduler.update_working_hours(end_hour)
+            if not late_deadlines(scheduler, now):
+                expected = end_hour
+                break
+        assert solved == expected
+
+
+def test_solver_matches_brute_force():
+    rng = random.Random(7)
+    for _ in range(300):
+        hour = rng.randint(9, 18)
+        demands = []
+        required = 0
+        for day in sorted(rng.sample(range(1, 10), rng.randint(1, 5))):
+            required += rng.choice([2, 4.5, 8, 15, 30])
+            demands.append((day, required))
+
+        def hours_until(day, end_hour):
+            return max(0, end_hour - hour) + (day - 1) * (end_hour - 9) + (19 - 9)
+
+        def feasible(end_hour):
+            return all(required <= hours_until(day, end_hour) for day, required in demands)
+
+        expected = next((end_hour for end_hour in END_HOURS if feasible(end_hour)), 24)
+        assert minimal_work_end_hour(demands, hours_until) == expected
+
+
+@pytest.mark.parametrize('seed', range(3))
+def test_deadline_index_matches_tasks(make_scheduler, seed):
+    scheduler = make_scheduler(seed=seed)
+    index = scheduler.deadline_index
+    rng = random.Random(seed)
+    for _ in range(100):
+        random_progress(scheduler, rng)
+        now = datetime(2025, 1, 1) + timedelta(days=rng.randint(0, 27), hours=rng.randint(0, 23))
+        assert scheduler.has_future_work(now) == bool(future_tasks(scheduler, now))
+
+        first_group = index.first_group_after(now)
+        expected = []
+        required = 0
+        for g in range(first_group, len(index.group_days)):
+            day = index.group_days[g]
+            remaining = [task.duration - task.completed_work for task in scheduler.tasks
+                         if task.deadline.toordinal() == day]
+            required += sum(left for left in remaining if left > 0)
+            if any(left > 0 for left in remaining):
+                expected.append((g, required))
+        assert index.cumulative_remaining(first_group) == pytest.approx(expected)
+        assert index.next_active(first_group) == (expected[0][0] if expected else len(index.group_days))
+        # A fork's index is independent of its parent's
+        if rng.random() < 0.1:
+            fork = scheduler.fork()
+            random_progress(fork, rng)
+            assert index.cumulative_remaining(first_group) == pytest.approx(expected)
@@ -1,8 +1,16 @@
 import json
 import os
+import sys
 from datetime import datetime, timedelta
 import math
 
+# 添加项目根目录到Python路径，以便导入scheduling模块
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from scheduling.scoring import get_urgency_policy
+
+# Urgency: remaining work time / remaining available time
+urgency_of = get_urgency_policy('remaining_ratio').scalar
+
 
 current_date = datetime(2025, 1, 1, 9, 00)
 print(f"Initial time: {current_date.strftime('%Y-%m-%d %H:%M')}")
@@ -272,12 +280,7 @@ def recalculate_all_tasks(tasks, current_date):
             duration = float(task['duration'])
             duration_left = max(0, duration - task.get('completed_work', 0))
             
-            if time_to_deadline <= 0:
-                urgency = 100  # Past deadline
-            elif duration_left <= 0:
-                urgency = 0    # Task completed
-            else:
-                urgency = 100 * (duration_left / time_to_deadline)
+            urgency = urgency_of(duration_left, time_to_deadline)
             
             task['urgency'] = urgency  # Keep as float for more precise sorting
             task['duration_left'] = duration_left
@@ -340,12 +343,7 @@ while continue_simulation:
                 duration_left = max(0, duration - task.get('completed_work', 0))  # Remaining work time
                 
                 # Calculate urgency: remaining work time / remaining available time
-                if time_to_deadline <= 0:
-                    urgency = 100  # Past deadline
-                elif duration_left <= 0:
-                    urgency = 0    # Task completed
-                else:
-                    urgency = 100 * (duration_left / time_to_deadline)
+                urgency = urgency_of(duration_left, time_to_deadline)
                 
                 task['urgency'] = urgency
                 task['duration_left'] = duration_left
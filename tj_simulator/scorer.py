@@ -1,8 +1,13 @@
 import json
 import os
+import sys
 from datetime import datetime, timedelta
 import math
 
+# 添加项目根目录到Python路径，以便导入scheduling模块
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from scheduling.scoring import get_ranking_policy, get_urgency_policy
+
 
 # Define global working hours (9:00-19:00)
 WORK_START_HOUR = 9
@@ -27,6 +32,9 @@ class TaskScheduler:
         self.work_start_hour = WORK_START_HOUR
         self.work_end_hour = WORK_END_HOUR
         self.deadline_hour = DEADLINE_HOUR
+        # This simulator ranks by the unscaled urgency (see scheduling.scoring)
+        self.urgency_policy = get_urgency_policy('deadline_pressure')
+        self.ranking_policy = get_ranking_policy('weighted_raw')
         
         # Initialize tasks if provided
         if tasks_data:
@@ -306,13 +314,7 @@ class TaskScheduler:
                 duration = float(task['duration'])
                 duration_left = max(0, duration - task.get('completed_work', 0))
                 
-                if time_to_deadline <= 0:
-                    urgency = 100  # Past deadline
-                elif duration_left <= 0:
-                    urgency = 0    # Task completed
-                else:
-                    # New urgency formula: 100 * (duration_left / (time_to_deadline + duration_left)) * (1 + duration_left)
-                    urgency = 100 * (duration_left / (time_to_deadline + duration_left)) * (1 + 1/duration_left)
+                urgency = self.urgency_policy.scalar(duration_left, time_to_deadline)
                 
                 task['urgency'] = urgency  # Keep as float for more precise sorting
                 task['duration_left'] = duration_left
@@ -400,7 +402,7 @@ class TaskScheduler:
             mood = float(task.get('mood', 5))  # Default to 5 if not provided
             
             # Calculate weighted score (adjust weights as needed)
-            weighted_score = 0.5 * urgency + 0.3 * importance + 0.2 * mood
+            weighted_score = self.ranking_policy.scalar(urgency, importance, mood, (0.5, 0.3, 0.2))
             task['weighted_score'] = weighted_score
         
         # Sort by weighted score and return top N
@@ -445,14 +447,8 @@ class TaskScheduler:
         task['duration_left'] = duration_left
         task['time_to_deadline'] = time_to_deadline
         
-        # Recalculate urgency with new formula
-        if time_to_deadline <= 0:
-            urgency = 100  # Past deadline
-        elif duration_left <= 0:
-            urgency = 0    # Task completed
-        else:
-            # New urgency formula: 100 * (duration_left / (time_to_deadline + duration_left)) * (1 + duration_left)
-            urgency = 100 * (duration_left / (time_to_deadline + duration_left)) * (1 + 1/duration_left)
+        # Recalculate urgency
+        urgency = self.urgency_policy.scalar(duration_left, time_to_deadline)
         
         task['urgency'] = urgency
         